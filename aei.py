@@ -0,0 +1,225 @@
+import sys
+import threading
+import time
+
+# AEI messages go to the real stdout; everything the engine prints while it
+# searches goes to stderr, where controllers log it
+protocol_out = sys.stdout
+sys.stdout = sys.stderr
+
+import god_heuristic as engine
+import selfplay
+
+ENGINE_NAME = "ARIMAA minimax"
+ENGINE_AUTHOR = "tripsycodes"
+DEFAULT_DEPTH = 3  # Deepest plan_turn refine depth when there is no time limit
+MAX_DEPTH = 8  # Deepest refine depth tried when the clock decides
+RESERVE_SHARE = 0.1  # Part of the reserve a single move may use
+TIME_MARGIN = 0.5  # Seconds kept back for sending the move
+
+# Setups played when the engine has to place its pieces (rank 1 or 8 first).
+# The engine's own starting board has extra elephants, which AEI controllers
+# would reject, so these use the standard sixteen pieces
+GOLD_SETUP = [["GD", "GH", "GT", "GC", "GE", "GT", "GH", "GD"], ["GR"] * 8]
+SILVER_SETUP = [["SD", "SH", "ST", "SE", "SC", "ST", "SH", "SD"], ["SR"] * 8]
+
+send_lock = threading.Lock()
+
+def send(message):
+    """Write one line of the protocol."""
+    with send_lock:
+        protocol_out.write(message + "\n")
+        protocol_out.flush()
+
+def parse_position(text):
+    """Board from setposition's 64 squares in brackets, rank 8 first (space = empty)."""
+    squares = text.strip()[1:-1] if text.strip().startswith("[") else text.strip()
+    if len(squares) != engine.BOARD_SIZE * engine.BOARD_SIZE:
+        raise ValueError("position needs 64 squares")
+    return [[" " if letter in " ." else engine.parse_piece(letter)
+             for letter in squares[row * engine.BOARD_SIZE:(row + 1) * engine.BOARD_SIZE]]
+            for row in range(engine.BOARD_SIZE)]
+
+def apply_steps(board, text):
+    """Play a move in AEI notation ('Ed2n Ed3n rc3x' or a setup like 'Ra1 Db1') on a copy of board."""
+    board = [row[:] for row in board]
+    for step in text.split():
+        piece = engine.parse_piece(step[0])
+        row, col = engine.parse_square(step[1:3])
+        if len(step) == 3:
+            # Setup: place the piece
+            board[row][col] = piece
+            continue
+        if step[3] == "x":
+            continue  # Captures follow from the steps; check_traps makes them
+        if board[row][col] != piece:
+            raise ValueError(f"no {step[0]} on {step[1:3]}")
+        dr, dc = engine.DIRECTIONS[engine.DIRECTION_NAMES.index(step[3])]
+        if not (0 <= row + dr < engine.BOARD_SIZE and 0 <= col + dc < engine.BOARD_SIZE) \
+                or board[row + dr][col + dc] != " ":
+            raise ValueError(f"{step} moves onto a piece or off the board")
+        board[row + dr][col + dc], board[row][col] = piece, " "
+        engine.check_traps(board)
+    return board
+
+def setup_notation(side):
+    """The setup move for side, e.g. 'Da1 Hb1 ... Ra2 ...' for Gold."""
+    rows = GOLD_SETUP if side == "Gold" else SILVER_SETUP
+    home = [engine.BOARD_SIZE - 1, engine.BOARD_SIZE - 2] if side == "Gold" else [0, 1]
+    return " ".join(engine.piece_letter(piece) + engine.square_name(row, col)
+                    for row, pieces in zip(home, rows) for col, piece in enumerate(pieces))
+
+class AEIEngine:
+    """State of one AEI session: the position, the clock options and the search thread.
+
+    Commands are read on the main thread. go starts the search on a worker
+    thread that deepens plan_turn until it runs out of depth or time; stop
+    sets engine.search_stop, which makes the search raise SearchStopped at
+    its next node, so the best turn found so far is sent straight away.
+    """
+
+    def __init__(self):
+        self.options = {}
+        self.stop_event = threading.Event()
+        engine.search_stop = self.stop_event
+        self.search_thread = None
+        self.timer = None
+        self.new_game()
+
+    def new_game(self):
+        self.board = [[" "] * engine.BOARD_SIZE for _ in range(engine.BOARD_SIZE)]
+        self.side = "Gold"
+        self.setup_left = {"Gold", "Silver"}
+        engine.game_history.clear()
+
+    def set_position(self, side, board):
+        self.board = board
+        self.side = "Gold" if side == "g" else "Silver"
+        self.setup_left = set()
+        engine.game_history.clear()
+        engine.game_history.push((engine.position_hash(board), self.side))
+
+    def make_move(self, text):
+        self.board = apply_steps(self.board, text)
+        self.setup_left.discard(self.side)
+        self.side = "Silver" if self.side == "Gold" else "Gold"
+        if not self.setup_left:
+            engine.game_history.push((engine.position_hash(self.board), self.side))
+
+    def time_budget(self):
+        """Seconds to spend on this move, or None to search to the depth limit."""
+        per_move = self.options.get("tcmove", 0.0)
+        reserve = self.options.get("greserve" if self.side == "Gold" else "sreserve",
+                                   self.options.get("tcreserve", 0.0))
+        if per_move <= 0 and reserve <= 0:
+            return None
+        budget = per_move + reserve * RESERVE_SHARE
+        if self.options.get("tcmax", 0.0) > 0:
+            budget = min(budget, self.options["tcmax"])
+        return max(budget - self.options.get("moveused", 0.0) - TIME_MARGIN, 0.1)
+
+    def go(self, ponder=False):
+        self.stop_search()
+        if self.side in self.setup_left:
+            if not ponder:
+                send(f"bestmove {setup_notation(self.side)}")
+            return
+        budget = None if ponder else self.time_budget()
+        if "depth" in self.options:
+            max_depth = int(self.options["depth"])
+        else:
+            max_depth = DEFAULT_DEPTH if budget is None and not ponder else MAX_DEPTH
+        self.stop_event.clear()
+        if budget is not None:
+            self.timer = threading.Timer(budget, self.stop_event.set)
+            self.timer.start()
+        self.search_thread = threading.Thread(target=self.search, args=([row[:] for row in self.board], self.side,
+                                                                       max_depth, ponder), daemon=True)
+        self.search_thread.start()
+
+    def search(self, board, side, max_depth, ponder):
+        """Iterative deepening over plan_turn's refine depth; sends bestmove unless pondering."""
+        sign = 1 if side == "Silver" else -1
+        start_time = time.time()
+
+        def report(depth, line, score):
+            score *= sign
+            send(f"info depth {depth}")
+            send(f"info score {score:.0f}" if abs(score) != float('inf') else f"info score {score}")
+            send(f"info time {time.time() - start_time:.1f}")
+
+        # A greedy turn first, so there is always something to play
+        best_line, _ = selfplay.greedy_turn(board, side)
+        line, _, _ = engine.deepen_turn(board, side, max_depth, report)
+        if self.timer is not None:
+            self.timer.cancel()
+        best_line = line or best_line
+        if ponder:
+            return
+        if best_line:
+            send(f"bestmove {engine.line_notation(board, best_line)}")
+        else:
+            send("log Error: no legal move")
+            send("bestmove")
+
+    def stop_search(self):
+        """Stop any running search and wait for its thread to finish."""
+        if self.search_thread is not None:
+            self.stop_event.set()
+            self.search_thread.join()
+            self.search_thread = None
+
+    def handle(self, line):
+        """Answer one command; returns False on quit."""
+        command, _, rest = line.strip().partition(" ")
+        if command == "aei":
+            send("protocol-version 1")
+            send(f"id name {ENGINE_NAME}")
+            send(f"id author {ENGINE_AUTHOR}")
+            send("aeiok")
+        elif command == "isready":
+            send("readyok")
+        elif command == "stop":
+            self.stop_search()
+        elif command == "quit":
+            self.stop_search()
+            return False
+        elif command == "go":
+            self.go(ponder=rest.strip() == "ponder")
+        elif command in ("newgame", "setposition", "makemove", "setoption"):
+            self.stop_search()
+            if command == "newgame":
+                self.new_game()
+            elif command == "setposition":
+                side, _, position = rest.partition(" ")
+                self.set_position(side, parse_position(position))
+            elif command == "makemove":
+                self.make_move(rest)
+            else:
+                self.set_option(rest)
+        elif command:
+            send(f"log Error: unknown command {command}")
+        return True
+
+    def set_option(self, text):
+        # setoption name <id> [value <x>]
+        words = text.split()
+        name = words[1] if len(words) > 1 else ""
+        value = words[3] if len(words) > 3 else ""
+        try:
+            self.options[name] = float(value)
+        except ValueError:
+            pass  # Options the engine has no use for, like the opponent's name
+
+def main():
+    session = AEIEngine()
+    for line in sys.stdin:
+        try:
+            if not session.handle(line):
+                break
+        except ValueError as error:
+            send(f"log Error: {error}")
+    session.stop_search()
+
+if __name__ == "__main__":
+    main()
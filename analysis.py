@@ -0,0 +1,85 @@
+import multiprocessing
+import os
+import sys
+
+import god_heuristic as engine
+
+HINT_MAX_DEPTH = 4  # Deepest plan_turn refine depth the analysis goes to
+
+def quick_turn(board, side, steps_taken):
+    """The rest of the turn picked one step at a time by the heuristic: a hint in milliseconds."""
+    line = []
+    while steps_taken < 4:
+        move = engine.find_best_move_heuristic(board, side, steps_taken)
+        if move is None or move == engine.PASS_MOVE:
+            break
+        line.append(move)
+        board = engine.make_move(board, move)
+        steps_taken += engine.move_steps(move)
+    return line
+
+def _analysis_worker(connection, stop):
+    # Each ("analyse", board, side, steps_taken) message is answered with a
+    # ("hint", position hash, line, depth) message per depth reached; a newer
+    # message interrupts it
+    sys.stdout = open(os.devnull, "w")  # The engine logs every search
+    engine.search_stop = stop
+    while True:
+        message = connection.recv()
+        while connection.poll():
+            message = connection.recv()  # Only the newest position matters
+        stop.clear()
+        if connection.poll():
+            continue  # Sent before the clear, so its stop was lost
+        if message[0] == "quit":
+            return
+
+        _, board, side, steps_taken = message
+        key = engine.position_hash(board)
+        connection.send(("hint", key, quick_turn(board, side, steps_taken), 0))
+        engine.deepen_turn(board, side, HINT_MAX_DEPTH, steps_taken=steps_taken,
+                           report=lambda depth, line, score: connection.send(("hint", key, line, depth)))
+
+class BackgroundAnalysis:
+    """Analyses positions in another process, deepening until a new position arrives.
+
+    analyse() hands over a position and returns at once; hint() gives the
+    best turn found so far for a position, with the depth it came from, as
+    soon as the first (heuristic) answer is in. Boards use god_heuristic's
+    piece names.
+    """
+
+    def __init__(self):
+        self.process = None
+        self.connection = None
+        self.stop = None
+        self.hints = {}  # Position hash -> (line, depth), the deepest so far
+
+    def analyse(self, board, side, steps_taken=0):
+        if self.process is None:
+            self.connection, child_connection = multiprocessing.Pipe()
+            self.stop = multiprocessing.Event()
+            self.process = multiprocessing.Process(target=_analysis_worker, args=(child_connection, self.stop),
+                                                   daemon=True)
+            self.process.start()
+        # Send first, then stop the old search, so the worker can't miss either
+        self.connection.send(("analyse", [row[:] for row in board], side, steps_taken))
+        self.stop.set()
+
+    def poll(self):
+        while self.connection is not None and self.connection.poll():
+            _, key, line, depth = self.connection.recv()
+            if line:
+                self.hints[key] = (line, depth)
+
+    def hint(self, board):
+        """(line, depth) for board, or None if the analysis hasn't answered yet."""
+        self.poll()
+        return self.hints.get(engine.position_hash(board))
+
+    def close(self):
+        if self.process is not None:
+            self.connection.send(("quit",))
+            self.stop.set()
+            self.process.join(timeout=2)
+            self.process = None
@@ -0,0 +1,69 @@
+import argparse
+import os
+import time
+
+import god_heuristic as engine
+
+# Fixed positions for timing the search: (name, side to move, board)
+BENCHMARK_POSITIONS = [
+    ("opening", "Gold", [row[:] for row in engine.board]),
+    ("early", "Gold", [
+        ["SE", "SH", "SC", " ", "SE", "SC", "SH", "SD"],
+        [" ", "SR", "ST", " ", " ", " ", "SR", " "],
+        [" ", " ", " ", "SR", " ", " ", "SR", "SR"],
+        [" ", " ", " ", " ", "SR", "GR", " ", " "],
+        ["SR", "GR", " ", " ", " ", " ", " ", " "],
+        [" ", " ", " ", "GR", " ", " ", " ", "GD"],
+        [" ", "GH", " ", "GR", "GR", " ", "GR", " "],
+        ["GD", " ", "GT", "GE", "GE", "GC", "GH", " "],
+    ]),
+    ("middlegame", "Silver", [
+        ["SE", "SH", "ST", " ", "SC", " ", "SH", "SD"],
+        [" ", "SR", " ", "SR", "SE", " ", " ", " "],
+        [" ", " ", " ", " ", " ", " ", " ", "SR"],
+        ["SR", " ", " ", " ", "SR", "GR", " ", " "],
+        ["GR", "GR", "SR", " ", "SR", " ", " ", "GR"],
+        [" ", " ", " ", " ", " ", " ", "GE", " "],
+        [" ", "GR", " ", " ", "GE", "GR", "GC", "GD"],
+        ["GD", "GH", " ", " ", " ", " ", " ", "GH"],
+    ]),
+]
+
+def timed_search(board, current_turn, depth, workers, seed):
+    """Run one root search from empty tables and return (seconds, score, move)."""
+    engine.transposition_table.clear()
+    engine.killer_moves.clear()
+    engine.history_table.clear()
+    engine.goal_distance_cache.clear()
+    engine.previous_pv = []
+    start_time = time.time()
+    score, move = engine.root_search(board, current_turn, depth, workers, seed)
+    return time.time() - start_time, score, move
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the parallel root search against the single-process search.")
+    parser.add_argument("--depths", type=int, nargs="+", default=[2, 3, 4])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"Parallel search with {args.workers} workers, seed {args.seed}")
+    print(f"{'position':<12}{'depth':>6}{'serial s':>10}{'parallel s':>12}{'speedup':>9}  moves")
+
+    # Start the workers before timing anything
+    engine.get_search_pool(args.workers)
+
+    for depth in args.depths:
+        for name, current_turn, board in BENCHMARK_POSITIONS:
+            serial_time, _, serial_move = timed_search(board, current_turn, depth, 1, args.seed)
+            parallel_time, _, parallel_move = timed_search(board, current_turn, depth, args.workers, args.seed)
+            moves = engine.move_notation(board, serial_move)
+            if parallel_move != serial_move:
+                moves += " / " + engine.move_notation(board, parallel_move)
+            print(f"{name:<12}{depth:>6}{serial_time:>10.2f}{parallel_time:>12.2f}"
+                  f"{serial_time / parallel_time:>8.2f}x  {moves}")
+
+    engine.shutdown_search_pool()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+import pygame
+
+TEXT_CACHE_SIZE = 256  # Rendered texts and arrows kept before the cache starts over
+
+# Events after which the window has to be drawn again in full
+EXPOSE_EVENTS = {pygame.VIDEOEXPOSE, getattr(pygame, "WINDOWEXPOSED", pygame.VIDEOEXPOSE)}
+
+class BoardRenderer:
+    """Draws the board by redrawing only what changed since the last frame.
+
+    The checkerboard and traps are rendered once into a background surface.
+    Each frame, draw() compares every square's piece and highlight with what
+    it drew last time and redraws just the squares that differ, plus any area
+    whose overlays (texts, hint arrows) appeared, changed or went away, then
+    pushes only those rectangles to the window with display.update. A frame
+    where nothing changed costs 64 comparisons.
+
+    Overlays are (key, surface, rect) tuples from text() and arrows(), which
+    cache their surfaces, so a text that stays the same is rendered once.
+    """
+
+    def __init__(self, screen, piece_images, traps, board_size, cell_size,
+                 light_color, dark_color, trap_color, highlight_color):
+        self.screen = screen
+        self.board_size = board_size
+        self.highlight_color = highlight_color
+
+        self.background = pygame.Surface(screen.get_size())
+        self.background.fill((0, 0, 0))
+        self.regions = []  # One rect per square (rank 8 first), then the window outside the board
+        for row in range(board_size):
+            for col in range(board_size):
+                rect = pygame.Rect(col * cell_size, row * cell_size, cell_size, cell_size)
+                if (row, col) in traps:
+                    color = trap_color
+                else:
+                    color = light_color if (row + col) % 2 == 0 else dark_color
+                self.background.fill(color, rect)
+                self.regions.append(rect)
+        width, height = screen.get_size()
+        board_pixels = board_size * cell_size
+        if height > board_pixels:
+            self.regions.append(pygame.Rect(0, board_pixels, width, height - board_pixels))
+        if width > board_pixels:
+            self.regions.append(pygame.Rect(board_pixels, 0, width - board_pixels, board_pixels))
+
+        # Where each piece's image goes on each square
+        self.piece_positions = {piece: [image.get_rect(center=rect.center) for rect in self.regions]
+                                for piece, image in piece_images.items()}
+        self.piece_images = piece_images
+        self.fonts = {}
+        self.cache = {}  # Overlay key -> (surface, rect)
+        self.invalidate()
+
+    def invalidate(self):
+        """Draw everything again next frame (after the window was covered, say)."""
+        self.drawn = [None] * (self.board_size * self.board_size)  # (piece, highlighted) last drawn on each square
+        self.overlays = None
+
+    def font(self, size, name=None):
+        """pygame.font.Font(None, size), or SysFont(name, size), loaded once."""
+        if (name, size) not in self.fonts:
+            self.fonts[name, size] = pygame.font.Font(None, size) if name is None else pygame.font.SysFont(name, size)
+        return self.fonts[name, size]
+
+    def _cached(self, key, build):
+        if key not in self.cache:
+            if len(self.cache) >= TEXT_CACHE_SIZE:
+                self.cache.clear()
+            self.cache[key] = build()
+        surface, rect = self.cache[key]
+        return key, surface, rect
+
+    def text(self, message, size, color, font_name=None, background=None, padding=(0, 0), **position):
+        """Overlay of one line of text, placed by get_rect keywords (center=..., topleft=...).
+
+        With a background color the text sits on a box padding pixels bigger.
+        """
+        def build():
+            surface = self.font(size, font_name).render(message, True, color)
+            if background is None:
+                return surface, surface.get_rect(**position)
+            text_rect = surface.get_rect(**position)
+            box = pygame.Surface(text_rect.inflate(*padding).size)
+            box.fill(background)
+            box.blit(surface, surface.get_rect(center=box.get_rect().center))
+            return box, box.get_rect(center=text_rect.center)
+        return self._cached(("text", message, size, color, font_name, background, padding,
+                             tuple(sorted(position.items()))), build)
+
+    def arrows(self, lines, color):
+        """Overlay of arrows, each ((x, y) start, (x, y) end, width), with a dot on every end."""
+        def build():
+            surface = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
+            for start, end, width in lines:
+                pygame.draw.line(surface, color, start, end, width)
+                pygame.draw.circle(surface, color, end, width + 4)
+            rect = surface.get_bounding_rect()
+            return surface.subsurface(rect).copy(), rect
+        return self._cached(("arrows", tuple(lines), color), build)
+
+    def draw(self, board, highlighted=(), overlays=()):
+        """Bring the window up to date with board, the highlighted squares and overlays."""
+        dirty = []
+        for index in range(len(self.drawn)):
+            row, col = divmod(index, self.board_size)
+            state = (board[row][col], (row, col) in highlighted)
+            if self.drawn[index] != state:
+                self.drawn[index] = state
+                dirty.append(index)
+
+        keys = [key for key, _, _ in overlays]
+        if self.overlays is None:
+            dirty = list(range(len(self.regions)))
+        elif keys != [key for key, _ in self.overlays]:
+            # Everything under an overlay that came, went or moved
+            changed = [rect for key, rect in self.overlays if key not in keys]
+            changed += [rect for key, _, rect in overlays if key not in dict(self.overlays)]
+            if not changed:
+                changed = [rect for _, _, rect in overlays]  # Same overlays, new order
+            dirty = sorted(set(dirty) | {index for index, region in enumerate(self.regions)
+                                         if region.collidelist(changed) != -1})
+        self.overlays = [(key, rect) for key, _, rect in overlays]
+        if not dirty:
+            return
+
+        # Each region is redrawn from the background up, with the part of every overlay over it
+        rects = []
+        for index in dirty:
+            region = self.regions[index]
+            self.screen.blit(self.background, region, region)
+            if index < len(self.drawn):
+                piece, lit = self.drawn[index]
+                if lit:
+                    self.screen.fill(self.highlight_color, region)
+                if piece in self.piece_images:
+                    self.screen.blit(self.piece_images[piece], self.piece_positions[piece][index])
+            for _, surface, rect in overlays:
+                part = region.clip(rect)
+                if part.width and part.height:
+                    self.screen.blit(surface, part, part.move(-rect.x, -rect.y))
+            rects.append(region)
+        pygame.display.update(rects)
@@ -0,0 +1,288 @@
+import argparse
+import asyncio
+import json
+import random
+import socket
+import time
+from collections import deque
+
+import god_heuristic as engine
+import selfplay
+
+DELTA_LOG = 64  # Recent deltas a game keeps for spectators that fall behind
+SPECTATOR_BUFFER = 2048  # Bytes buffered for a spectator (about 50 deltas) before it counts as slow
+KEYFRAME_SIZE = engine.BOARD_SIZE * engine.BOARD_SIZE
+SLOW_BUFFER = 1024  # Receive buffer of the load generator's slow spectators
+SLOW_DELAY = 0.05  # Seconds a slow spectator takes over each message
+
+# Spectators get one JSON object per line, with short keys since there are many:
+#   {"t": "k", "g": game, "s": seq, "b": 64 squares}  keyframe: the whole board, rank 8 first
+#   {"t": "d", "g": game, "s": seq, "c": changes}  delta: the squares one step changed
+#   {"t": "end", "g": game, "r": result}  the game is over or was closed
+# changes has three characters per square: its name and the piece now on it,
+# "." if it emptied, so "d2.d3E" is Gold's elephant stepping north and a capture
+# is just one more emptied square. A delta with a seq more than one past the
+# last one seen covers every step in between (the spectator was slow)
+
+def board_squares(board):
+    """The board as a list of 64 notation letters, "." for an empty square."""
+    return [engine.piece_letter(piece) if piece != " " else "." for row in board for piece in row]
+
+def square_changes(before, after):
+    """{square index: letter} for every square that differs between two board_squares lists."""
+    return {index: letter for index, (old, letter) in enumerate(zip(before, after)) if old != letter}
+
+def encode_changes(changes):
+    return "".join(engine.square_name(*divmod(index, engine.BOARD_SIZE)) + letter
+                   for index, letter in sorted(changes.items()))
+
+def decode_changes(text):
+    """{square index: letter} from a delta's changes string."""
+    changes = {}
+    for start in range(0, len(text), 3):
+        row, col = engine.parse_square(text[start:start + 2])
+        changes[row * engine.BOARD_SIZE + col] = text[start + 2]
+    return changes
+
+def _line(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+class BroadcastStats:
+    """Counts of what the broadcaster has sent, over every game."""
+
+    def __init__(self):
+        self.spectators = 0
+        self.messages = 0
+        self.bytes = 0
+        self.keyframes = 0
+        self.merged = 0  # Deltas that stood for several steps, sent to slow spectators
+        self.start_time = time.time()
+
+    def as_dict(self):
+        elapsed = max(time.time() - self.start_time, 1e-9)
+        return {"spectators": self.spectators, "messages": self.messages, "bytes": self.bytes,
+                "keyframes": self.keyframes, "merged": self.merged,
+                "messages_per_second": self.messages / elapsed}
+
+class GameChannel:
+    """Step-by-step updates of one game, for any number of spectators.
+
+    Each step is encoded once and the same bytes go to every spectator that
+    is keeping up. Spectators hold no queue of their own: each just
+    remembers the last seq it was sent. One that falls behind (its socket
+    buffer is full) gets the steps it missed merged into a single delta, or
+    a keyframe if that is smaller or the steps have left the log, so memory
+    stays bounded however slow it is.
+    """
+
+    def __init__(self, game_id, board, stats):
+        self.game_id = game_id
+        self.squares = board_squares(board)
+        self.seq = 0
+        self.log = deque(maxlen=DELTA_LOG)  # (seq, changes, encoded delta)
+        self.stats = stats
+        self.updated = asyncio.Event()
+        self.end_message = None  # Encoded "end" message once the game is closed
+
+    def publish(self, board):
+        """Send the position after a step to every spectator."""
+        squares = board_squares(board)
+        changes = square_changes(self.squares, squares)
+        if not changes:
+            return
+        self.squares = squares
+        self.seq += 1
+        self.log.append((self.seq, changes, _line({"t": "d", "g": self.game_id, "s": self.seq,
+                                                   "c": encode_changes(changes)})))
+        self._wake()
+
+    def publish_turn(self, board, moves):
+        """Publish every step of a turn of move codes played from board."""
+        for move in moves:
+            board = engine.make_move(board, move)
+            self.publish(board)
+
+    def close(self, result=None):
+        if self.end_message is not None:
+            return
+        self.end_message = _line({"t": "end", "g": self.game_id, "r": result})
+        self._wake()
+
+    def _wake(self):
+        # Every waiting spectator holds the old event; the next wait gets a fresh one
+        self.updated.set()
+        self.updated = asyncio.Event()
+
+    def keyframe(self):
+        self.stats.keyframes += 1
+        return _line({"t": "k", "g": self.game_id, "s": self.seq, "b": "".join(self.squares)})
+
+    def catch_up(self, sent):
+        """The message that brings a spectator from seq sent up to date."""
+        missed = self.seq - sent
+        if not self.log or missed > len(self.log):
+            return self.keyframe()
+        if missed == 1:
+            return self.log[-1][2]
+        changes = {}
+        for _, step_changes, _ in list(self.log)[-missed:]:
+            changes.update(step_changes)
+        if 3 * len(changes) >= KEYFRAME_SIZE:
+            return self.keyframe()
+        self.stats.merged += 1
+        return _line({"t": "d", "g": self.game_id, "s": self.seq, "c": encode_changes(changes)})
+
+    async def watch(self, writer):
+        """Stream the game to one spectator until it ends or the spectator goes away."""
+        # Small buffers, in the kernel too, so a slow spectator blocks drain()
+        # early and is caught up with merged deltas rather than a backlog
+        writer.transport.set_write_buffer_limits(high=SPECTATOR_BUFFER)
+        connection = writer.get_extra_info("socket")
+        if connection is not None:
+            connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SPECTATOR_BUFFER)
+        self.stats.spectators += 1
+        try:
+            # Late joiners start from a keyframe
+            message, sent = self.keyframe(), self.seq
+            while True:
+                writer.write(message)
+                self.stats.messages += 1
+                self.stats.bytes += len(message)
+                if message is self.end_message:
+                    await writer.drain()
+                    return
+                # Steps published while this drains are merged into the next message
+                await writer.drain()
+                while self.seq == sent and self.end_message is None:
+                    await self.updated.wait()
+                if self.seq > sent:
+                    message, sent = self.catch_up(sent), self.seq
+                else:
+                    message = self.end_message
+        except ConnectionError:
+            pass
+        finally:
+            self.stats.spectators -= 1
+
+class Broadcaster:
+    """The channels of every game being played."""
+
+    def __init__(self):
+        self.channels = {}
+        self.stats = BroadcastStats()
+
+    def open(self, game_id, board):
+        self.channels[game_id] = GameChannel(game_id, board, self.stats)
+        return self.channels[game_id]
+
+    def close(self, game_id, result=None):
+        channel = self.channels.pop(game_id, None)
+        if channel is not None:
+            channel.close(result)
+
+def recorded_games(count, turns, seed):
+    """Boards after every step of a few random games, for the load generator to replay."""
+    random.seed(seed)
+    games = []
+    for _ in range(count):
+        engine.game_history.clear()
+        board, side, steps = [row[:] for row in engine.board], "Gold", []
+        for _ in range(turns):
+            line, _ = selfplay.random_turn(board, side)
+            if not line:
+                break
+            for move in line:
+                board = engine.make_move(board, move)
+                steps.append(board)
+            side = "Silver" if side == "Gold" else "Gold"
+            engine.game_history.push((engine.position_hash(board), side))
+        games.append(steps)
+    return games
+
+async def load_test(games, spectators, slow_share, steps_per_second, seconds, seed):
+    """Play recorded games to spectators over loopback TCP and count what arrives."""
+    broadcaster = Broadcaster()
+    recordings = recorded_games(4, 60, seed)
+    channels = [broadcaster.open(game, engine.board) for game in range(games)]
+
+    async def handle(reader, writer):
+        request = json.loads(await reader.readline())
+        await broadcaster.channels[request["game"]].watch(writer)
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    received = {"messages": 0, "bytes": 0}
+
+    async def spectator(game, slow):
+        if slow:
+            # A slow link: tiny receive buffers, so the server's side fills up
+            connection = socket.socket()
+            connection.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SLOW_BUFFER)
+            connection.setblocking(False)
+            await asyncio.get_running_loop().sock_connect(connection, ("127.0.0.1", port))
+            reader, writer = await asyncio.open_connection(sock=connection, limit=SLOW_BUFFER)
+        else:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(_line({"game": game}))
+        squares = None
+        while line := await reader.readline():
+            message = json.loads(line)
+            received["messages"] += 1
+            received["bytes"] += len(line)
+            # Rebuild the board, as a real viewer would
+            if message["t"] == "k":
+                squares = list(message["b"])
+            elif message["t"] == "d":
+                for index, letter in decode_changes(message["c"]).items():
+                    squares[index] = letter
+            else:
+                break
+            if slow:
+                await asyncio.sleep(SLOW_DELAY)
+        writer.close()
+        return squares
+
+    async def player(game):
+        steps = recordings[game % len(recordings)]
+        for step in range(int(seconds * steps_per_second)):
+            channels[game].publish(steps[step % len(steps)])
+            await asyncio.sleep(1 / steps_per_second)
+        broadcaster.close(game)
+
+    rng = random.Random(seed)
+    watchers = [asyncio.create_task(spectator(game, rng.random() < slow_share))
+                for game in range(games) for _ in range(spectators)]
+    await asyncio.sleep(0.5)  # Let everyone connect
+    start_time = time.time()
+    await asyncio.gather(*(player(game) for game in range(games)))
+    final_boards = await asyncio.gather(*watchers)
+    elapsed = time.time() - start_time
+    server.close()
+
+    wrong = sum(board != channels[index // spectators].squares for index, board in enumerate(final_boards))
+    full_boards = len(_line({"t": "k", "g": 0, "s": 0, "b": "." * KEYFRAME_SIZE}))
+    stats = broadcaster.stats
+    steps_sent = games * int(seconds * steps_per_second)
+    print(f"{games} games x {spectators} spectators ({slow_share:.0%} slow), "
+          f"{steps_sent / elapsed:.0f} steps/s published")
+    print(f"delivered {received['messages']} messages in {elapsed:.1f} s: "
+          f"{received['messages'] / elapsed:.0f} messages/s, {received['bytes'] / elapsed / 1024:.0f} KiB/s")
+    print(f"{stats.keyframes} keyframes, {stats.merged} merged deltas; "
+          f"{received['bytes'] / max(received['messages'], 1):.0f} bytes per message "
+          f"against {full_boards} for a full board")
+    print(f"spectators with the wrong final board: {wrong}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the spectator broadcast over local TCP.")
+    parser.add_argument("--games", type=int, default=20)
+    parser.add_argument("--spectators", type=int, default=50, help="spectators per game")
+    parser.add_argument("--slow", type=float, default=0.1, help="share of spectators that read slowly")
+    parser.add_argument("--steps-per-second", type=float, default=10.0, help="steps each game plays per second")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(load_test(args.games, args.spectators, args.slow, args.steps_per_second, args.seconds, args.seed))
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,19 @@
 import pygame
 import os
+import sys
 import random
 import math
 from copy import deepcopy
 import time
+import heapq
+import json
+import multiprocessing
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+
+import board_renderer
 
 # Set up the game window
 WINDOW_WIDTH = 600
@@ -55,17 +65,339 @@ piece_strength = {
     " ": -1  # Empty space
 }
 
+# Moves are packed into one integer:
+#   bits 0-5   from-square (row * 8 + col)
+#   bits 6-7   direction to the destination (step) or to the enemy piece (push/pull)
+#   bits 8-9   kind: step, push, pull or pass
+#   bits 10-11 second direction: where the enemy goes (push) or where we go (pull)
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+DIRECTION_NAMES = "nswe"  # Gold moves up the screen, toward rank 8
+MOVE_STEP, MOVE_PUSH, MOVE_PULL, MOVE_PASS = 0, 1, 2, 3
+PASS_MOVE = MOVE_PASS << 8
+
+# Arimaa notation letter for each piece type (upper case Gold, lower case Silver)
+NOTATION_LETTERS = {"E": "E", "C": "M", "H": "H", "D": "D", "T": "C", "R": "R"}
+
+def encode_move(row, col, direction, kind=MOVE_STEP, second_direction=0):
+    """Pack a move into an integer (see the layout above)."""
+    return (row << 3 | col) | direction << 6 | kind << 8 | second_direction << 10
+
+def _unpack_move(move):
+    kind = move >> 8 & 3
+    row, col = move >> 3 & 7, move & 7
+    dr, dc = DIRECTIONS[move >> 6 & 3]
+    dir_row, dir_col = DIRECTIONS[move >> 10 & 3] if kind in (MOVE_PUSH, MOVE_PULL) else (0, 0)
+    return kind, row, col, row + dr, col + dc, dir_row, dir_col
+
+# Every possible move code decoded ahead of time so decode_move is a list lookup
+MOVE_TABLE = [_unpack_move(move) for move in range(1 << 12)]
+
+def decode_move(move):
+    """Unpack a move into (kind, row, col, target_row, target_col, dir_row, dir_col).
+
+    target is the destination of a step or the enemy piece of a push/pull, and
+    dir is the second direction of a push/pull.
+    """
+    return MOVE_TABLE[move]
+
+def move_kind(move):
+    """Kind of a move: MOVE_STEP, MOVE_PUSH, MOVE_PULL or MOVE_PASS."""
+    return move >> 8 & 3
+
+def move_steps(move):
+    """Number of steps a move uses (pass uses none)."""
+    kind = move >> 8 & 3
+    return 0 if kind == MOVE_PASS else 1 if kind == MOVE_STEP else 2
+
+def square_name(row, col):
+    """Name a square in Arimaa notation, e.g. (7, 0) -> 'a1'."""
+    return "abcdefgh"[col] + str(BOARD_SIZE - row)
+
+def parse_square(name):
+    """(row, col) of a square in Arimaa notation, e.g. 'a1' -> (7, 0)."""
+    col = "abcdefgh".find(name[:1])
+    if col < 0 or len(name) != 2 or not "1" <= name[1] <= str(BOARD_SIZE):
+        raise ValueError(f"bad square {name}")
+    return BOARD_SIZE - int(name[1]), col
+
+def parse_piece(letter):
+    """Piece for an Arimaa notation letter, e.g. 'M' -> 'GC', 'r' -> 'SR'."""
+    for piece, notation in NOTATION_LETTERS.items():
+        if notation == letter.upper():
+            return ("G" if letter.isupper() else "S") + piece
+    raise ValueError(f"bad piece {letter}")
+
+def piece_letter(piece):
+    """Arimaa notation letter for a piece, upper case for Gold and lower case for Silver."""
+    letter = NOTATION_LETTERS[piece[1:]]
+    return letter if piece[0] == 'G' else letter.lower()
+
+def move_notation(board, move):
+    """Format a move in Arimaa step notation for logging, e.g. 'Ed2n' or 'rd3e Ed2n'."""
+    if move == PASS_MOVE:
+        return "pass"
+    kind, row, col, target_row, target_col, dir_row, dir_col = decode_move(move)
+    
+    def step(r, c, dr, dc):
+        return piece_letter(board[r][c]) + square_name(r, c) + DIRECTION_NAMES[DIRECTIONS.index((dr, dc))]
+    
+    if kind == MOVE_STEP:
+        steps = [step(row, col, target_row - row, target_col - col)]
+    elif kind == MOVE_PUSH:
+        # The enemy piece moves first, then ours takes its place
+        steps = [step(target_row, target_col, dir_row, dir_col),
+                 step(row, col, target_row - row, target_col - col)]
+    else:
+        # Our piece moves first, then the enemy piece follows
+        steps = [step(row, col, dir_row, dir_col),
+                 step(target_row, target_col, row - target_row, col - target_col)]
+    
+    # Mark pieces captured in traps, e.g. 'rc3x'
+    new_board = [r[:] for r in board]
+    apply_move(new_board, move)
+    before_traps = [new_board[trap_row][trap_col] for trap_row, trap_col in TRAPS]
+    check_traps(new_board)
+    for (trap_row, trap_col), piece in zip(TRAPS, before_traps):
+        if piece != " " and new_board[trap_row][trap_col] == " ":
+            steps.append(piece_letter(piece) + square_name(trap_row, trap_col) + "x")
+    return " ".join(steps)
+
+# Zobrist keys for hashing positions (fixed seed so hashes are stable between runs)
+_zobrist_random = random.Random(20250331)
+ZOBRIST_KEYS = {
+    piece: [[_zobrist_random.getrandbits(64) for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+    for piece in piece_strength if piece != " "
+}
+
+# Goal distance settings
+GOAL_DISTANCE_LIMIT = 8  # Rabbits further than this are treated as unable to reach the goal
+GOAL_SEARCH_DISTANCE = 4  # Run the full goal search only when a rabbit is this close
+MAX_GOAL_CACHE_SIZE = 100000  # Clear the goal distance cache when it grows past this
+goal_distance_cache = {}  # Position hash -> goal distance of every rabbit
+
+# Evaluation weights used by heuristic, in the order of the vector the tuner fits
+HEURISTIC_PARAM_NAMES = [
+    "elephant", "camel", "horse", "dog", "cat", "rabbit",  # Material per piece
+    "rabbit_advance",  # Times the squared rows a rabbit has advanced
+    "goal_threat_1", "goal_threat_2", "goal_threat_3", "goal_threat_4",  # Closest rabbit this many
+    "goal_threat_5", "goal_threat_6", "goal_threat_7", "goal_threat_8",  # steps from the goal
+    "center",  # Times the centre value of every square held
+    "trap_control",  # Per piece of advantage next to each trap
+    "trap_hanging",  # Unsupported piece standing on a trap
+    "file_control",  # Per piece of advantage in each file
+    "mobility",  # Per empty square next to an unfrozen piece
+]
+DEFAULT_HEURISTIC_PARAMS = [100, 50, 30, 20, 15, 10, 1, 300, 200, 100, 60, 30, 15, 8, 4, 2, 15, 50, 10, 2]
+HEURISTIC_PARAMS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "heuristic_params.json")
+heuristic_params = dict(zip(HEURISTIC_PARAM_NAMES, DEFAULT_HEURISTIC_PARAMS))
+piece_values = {}  # Piece -> material score (Silver-positive), rebuilt from heuristic_params
+goal_threat_bonus = []  # Bonus for the closest rabbit by goal distance (index = steps to goal)
+
+# Centre value of each square
+CENTER_VALUE = [
+    [1, 1, 2, 2, 2, 2, 1, 1],
+    [1, 2, 3, 3, 3, 3, 2, 1],
+    [2, 3, 4, 4, 4, 4, 3, 2],
+    [2, 3, 4, 5, 5, 4, 3, 2],
+    [2, 3, 4, 5, 5, 4, 3, 2],
+    [2, 3, 4, 4, 4, 4, 3, 2],
+    [1, 2, 3, 3, 3, 3, 2, 1],
+    [1, 1, 2, 2, 2, 2, 1, 1]
+]
+
+def set_heuristic_params(values):
+    """Use a new weight vector (in HEURISTIC_PARAM_NAMES order) in heuristic."""
+    global goal_threat_bonus
+    heuristic_params.update(zip(HEURISTIC_PARAM_NAMES, values))
+    for letter, name in zip("ECHDTR", HEURISTIC_PARAM_NAMES):
+        piece_values["S" + letter] = heuristic_params[name]
+        piece_values["G" + letter] = -heuristic_params[name]
+    piece_values[" "] = 0
+    goal_threat_bonus = [0] + [heuristic_params[f"goal_threat_{d}"] for d in range(1, GOAL_DISTANCE_LIMIT + 1)]
+
+def heuristic_param_vector():
+    """The current weights in HEURISTIC_PARAM_NAMES order."""
+    return [heuristic_params[name] for name in HEURISTIC_PARAM_NAMES]
+
+def load_heuristic_params(path=HEURISTIC_PARAMS_FILE):
+    """Read weights saved by save_heuristic_params; names missing from the file keep their value."""
+    with open(path) as params_file:
+        saved = json.load(params_file)
+    set_heuristic_params([saved.get(name, heuristic_params[name]) for name in HEURISTIC_PARAM_NAMES])
+    print(f"Loaded heuristic weights from {path}")
+
+def save_heuristic_params(values, path=HEURISTIC_PARAMS_FILE):
+    with open(path, "w") as params_file:
+        json.dump(dict(zip(HEURISTIC_PARAM_NAMES, values)), params_file, indent=2)
+
+set_heuristic_params(DEFAULT_HEURISTIC_PARAMS)
+if os.path.exists(HEURISTIC_PARAMS_FILE):
+    load_heuristic_params()
+
+# Search tables, kept for the whole game and aged between searches
+MAX_TT_SIZE = 200000  # Drop the oldest generations of entries when the table grows past this
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2  # How a stored score bounds the true score
+transposition_table = {}  # (position hash, side to move) -> (depth, best move, score, bound, generation)
+killer_moves = {}  # Depth -> up to two quiet moves that caused a cutoff, newest first
+history_table = {}  # Move -> cutoff score, halved before every search
+search_generation = 0  # Bumped by every search (see age_search_tables)
+previous_pv = []  # (key, move) pairs along the last search's principal variation
+
+# Parallel search
+ROOT_EPSILON = 1e-6  # Root moves are searched just below the shared bound so equal scores come back exact
+search_seed = None  # Seeds the evaluation noise from the position hash when set, so results are repeatable
+search_pool = None  # Worker processes for root splitting, started on first use
+search_pool_workers = 0
+shared_bound = None  # Best root score found so far, from the root player's point of view
+
+# Stopping a search from another thread (aei.py): set search_stop and the search raises SearchStopped
+search_stop = None  # threading.Event, or None when searches can't be stopped
+
+class SearchStopped(Exception):
+    """Raised inside minimax and plan_turn once search_stop is set."""
+
+# Live progress of the search, read by main's thinking indicator
+search_nodes = 0  # Positions visited; reset by whoever starts the search
+search_depth = 0  # Depth plan_turn is searching the opponent's answers to
+
+# Engine for the Gold AI: "minimax" plans each turn with plan_turn, "mcts" asks mcts.py for every step
+GOLD_ENGINE = "minimax"
+
+# Position evaluation: "heuristic", or "net" for a value network from valuenet.py (needs NumPy)
+EVALUATOR = "heuristic"
+value_net = None  # The loaded ValueNet when EVALUATOR is "net"
+value_net_path = None  # Where it came from, so search workers can load it too
+
+# Turn planning
+TURN_BEAM_WIDTH = 12  # Positions kept after each step while planning a turn
+TURN_REFINE_COUNT = 6  # Best turn ends that are searched again with minimax
+
+# A turn may not create the same position, with the same side to move, for the third time
+REPETITION_LIMIT = 3
+
+class GameHistory:
+    """Counts of every (position hash, side to move) seen at the end of a turn.
+
+    push and pop are O(1), so the search can add the positions along its
+    current line and take them off again on the way back.
+    """
+    
+    def __init__(self):
+        self.counts = {}
+        self.keys = []
+    
+    def push(self, key):
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.keys.append(key)
+    
+    def pop(self):
+        key = self.keys.pop()
+        if self.counts[key] == 1:
+            del self.counts[key]
+        else:
+            self.counts[key] -= 1
+    
+    def clear(self):
+        self.counts.clear()
+        self.keys.clear()
+    
+    def is_forbidden(self, key):
+        """Check if reaching key again would repeat it for the third time."""
+        return self.counts.get(key, 0) >= REPETITION_LIMIT - 1
+
+# Adjudication ends AI games that are already decided
+ADJUDICATE = True  # Used by main; --no-adjudicate turns it off
+ADJUDICATE_SCORE = 800  # A search score at least this far from 0 counts as decided...
+ADJUDICATE_TURNS = 4  # ...once it has held for this many scored turns in a row
+ADJUDICATE_MATERIAL = 0.6  # Material lead, (ahead - behind) / (ahead + behind), that decides a game
+
+class Adjudicator:
+    """Decides games early from search scores, material and goals that can't be stopped.
+
+    Call update after every turn. The goal rule is exact (the side to move
+    can reach the goal this turn); the score and material rules are
+    judgements, so their false-adjudication rate should be measured (see
+    selfplay.py --adjudicate shadow).
+    """
+    
+    def __init__(self, score=ADJUDICATE_SCORE, turns=ADJUDICATE_TURNS, material=ADJUDICATE_MATERIAL, goal=True):
+        self.score = score  # None turns the score rule off
+        self.turns = turns
+        self.material = material  # None turns the material rule off
+        self.goal = goal
+        self.reset()
+    
+    def reset(self):
+        self.leader = None  # Side the scores have favoured in the current streak
+        self.streak = 0
+    
+    def update(self, board, current_turn, score=None):
+        """Check the position after a turn; current_turn is the side about to move.
+
+        score is the search score (Silver-positive) the last mover gave its
+        turn, or None if its engine doesn't report one. Returns (winner,
+        reason) once the game counts as decided, otherwise None.
+        """
+        if self.goal and goal_distance(board, current_turn) <= 4 and find_goal(board, current_turn):
+            return current_turn, "unstoppable goal"
+        
+        if self.score is not None and score is not None:
+            leader = "Silver" if score > 0 else "Gold"
+            if abs(score) < self.score:
+                self.reset()
+            elif leader == self.leader:
+                self.streak += 1
+            else:
+                self.leader, self.streak = leader, 1
+            if self.streak >= self.turns:
+                return self.leader, "score"
+        
+        if self.material is not None:
+            gold, silver = material(board)
+            if abs(silver - gold) >= self.material * (silver + gold):
+                leader = "Silver" if silver > gold else "Gold"
+                trailing = "Gold" if leader == "Silver" else "Silver"
+                # A side with a rabbit close to the goal can still turn it around
+                if goal_distance(board, trailing) > GOAL_SEARCH_DISTANCE:
+                    return leader, "material"
+        return None
+
+def material(board):
+    """Total material of each side by the heuristic's piece values, as (gold, silver)."""
+    gold = silver = 0
+    for row in board:
+        for piece in row:
+            if piece[0] == 'G':
+                gold -= piece_values[piece]
+            elif piece[0] == 'S':
+                silver += piece_values[piece]
+    return gold, silver
+
 # Game variables
 whose_turn = "Gold"  # Gold goes first
 move_count = 0  # How many moves made this turn
 game_finished = False  # Is the game over?
-move_history = []  # Store previous board states to detect loops
-max_history_length = 10  # Keep the last 10 board states for loop detection
+game_history = GameHistory()  # Positions at the end of every turn this game
+planned_turn = []  # Steps of the minimax AI's turn still to be played
+adjudicator = Adjudicator()  # For the game shown by main
+adjudication_reason = None  # Why the current game was adjudicated, if it was
+last_plan_score = None  # Score (Silver-positive) of the turn plan_turn chose last, None if it found none
+ai_thread = None  # Worker thread playing the AI's current step, so the window keeps responding
+
+# Display, set up by init_display so the engine can be imported without a window
+screen = None
+piece_images = {}
+renderer = None  # board_renderer.BoardRenderer for the window
 
-# Initialize pygame
-pygame.init()
-screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-pygame.display.set_caption("Arimaa: Minimax vs Heuristic")
+def init_display():
+    """Initialize pygame, open the window and load the piece images."""
+    global screen, piece_images, renderer
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption("Arimaa: Minimax vs Heuristic")
+    piece_images = load_images()
+    renderer = board_renderer.BoardRenderer(screen, piece_images, TRAPS, BOARD_SIZE, CELL_SIZE,
+                                            LIGHT_COLOR, DARK_COLOR, TRAP_COLOR, HIGHLIGHT_COLOR)
 
 def load_images():
     """Load images for each piece."""
@@ -89,96 +421,76 @@ def load_images():
             images[piece] = img
     return images
 
-# Load piece images
-piece_images = load_images()
+def draw_board(end_message=None):
+    """Draw the board, the turn info and end_message (the game over line, if any).
 
-def draw_board():
-    """Draw the board and all pieces on it."""
-    global board, piece_images
+    The renderer only redraws the squares and texts that changed since the
+    last frame.
+    """
+    # Turn info, or how far the search has got while the AI thinks
+    if ai_thread is not None and search_nodes:
+        info_text = f"{whose_turn} thinking... depth {search_depth}, {search_nodes:,} nodes"
+    else:
+        info_text = f"Turn: {whose_turn} ({'Minimax AI' if whose_turn == 'Gold' else 'Heuristic AI'}) - Moves: {move_count}/4"
+    overlays = [
+        renderer.text(info_text, 14, (255, 255, 255), font_name='Arial', topleft=(10, BOARD_SIZE * CELL_SIZE + 10)),
+        renderer.text("Controls: SPACE to advance, R to restart, ESC to quit", 14, (200, 200, 200), font_name='Arial',
+                      topleft=(WINDOW_WIDTH - 400, BOARD_SIZE * CELL_SIZE + 10)),
+    ]
     
-    # Draw the board squares
+    # Show win message if game is over
+    if game_finished:
+        overlays.append(renderer.text(f"{whose_turn} Wins!", 48, (255, 255, 255), background=(0, 0, 0),
+                                      padding=(20, 20), center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)))
+    if end_message is not None:
+        overlays.append(renderer.text(end_message, 36, (255, 255, 0), font_name='Arial', background=(0, 0, 0),
+                                      padding=(20, 10), center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 20)))
+    renderer.draw(board, (), overlays)
+
+def compute_piece_maps(board):
+    """Build the frozen map and friendly support counts for a board in one pass.
+
+    support['G'][row][col] and support['S'][row][col] count the Gold and
+    Silver pieces next to a square, and frozen[row][col] is True for a piece
+    with a stronger enemy beside it and no friend.
+    """
+    support = {'G': [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)],
+               'S': [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)]}
+    strongest = {'G': [[-1] * BOARD_SIZE for _ in range(BOARD_SIZE)],
+                 'S': [[-1] * BOARD_SIZE for _ in range(BOARD_SIZE)]}
+    
+    # Each piece adds itself to the counts of its neighbours
     for row in range(BOARD_SIZE):
         for col in range(BOARD_SIZE):
-            # Set color: light or dark checkerboard pattern
-            if (row + col) % 2 == 0:
-                color = LIGHT_COLOR
-            else:
-                color = DARK_COLOR
-            
-            # Traps get a special highlight
-            if (row, col) in TRAPS:
-                color = TRAP_COLOR
-                # Make trap squares slightly red-tinted
-                # if (row + col) % 2 == 0:
-                #     color = (min(255, LIGHT_COLOR[0] + 20), max(0, LIGHT_COLOR[1] - 30), max(0, LIGHT_COLOR[2] - 30))
-                # else:
-                #     color = (min(255, DARK_COLOR[0] + 20), max(0, DARK_COLOR[1] - 30), max(0, DARK_COLOR[2] - 30))
-            
-            # Draw the square
-            pygame.draw.rect(screen, color, (col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-            
-            # if (row, col) in TRAPS:
-            #     pygame.draw.circle(screen, TRAP_COLOR, 
-            #                       (col * CELL_SIZE + CELL_SIZE // 2, 
-            #                        row * CELL_SIZE + CELL_SIZE // 2), 
-            #                       8, 2)  # Outlined circle
-            
-            # Draw the piece if present
             piece = board[row][col]
-            if piece != "  " and piece in piece_images:
-                img_rect = piece_images[piece].get_rect(
-                    center=(col * CELL_SIZE + CELL_SIZE // 2, 
-                           row * CELL_SIZE + CELL_SIZE // 2))
-                screen.blit(piece_images[piece], img_rect)
-    
-    # Draw the grid lines
-    # grid_color = (50, 50, 50)
-    # for i in range(BOARD_SIZE + 1):
-    #     # Horizontal lines
-    #     pygame.draw.line(screen, grid_color, 
-    #                     (0, i * CELL_SIZE), 
-    #                     (WINDOW_WIDTH, i * CELL_SIZE), 1)
-    #     # Vertical lines
-    #     pygame.draw.line(screen, grid_color, 
-    #                     (i * CELL_SIZE, 0), 
-    #                     (i * CELL_SIZE, BOARD_SIZE * CELL_SIZE), 1)
-    
-    # Add row and column labels
-    font = pygame.font.SysFont('Arial', 14)
-    # for i in range(BOARD_SIZE):
-    #     # Row labels (numbers)
-    #     label = font.render(str(BOARD_SIZE - i), True, (150, 150, 150))
-    #     screen.blit(label, (5, i * CELL_SIZE + 5))
-        
-    #     # Column labels (letters)
-    #     label = font.render(chr(65 + i), True, (150, 150, 150))
-    #     screen.blit(label, (i * CELL_SIZE + CELL_SIZE - 15, BOARD_SIZE * CELL_SIZE - 20))
-
-    # # Display turn information and controls at bottom
-    # font = pygame.font.SysFont('Arial', 18)
-    
-    # Turn info
-    info_text = f"Turn: {whose_turn} ({'Minimax AI' if whose_turn == 'Gold' else 'Heuristic AI'}) - Moves: {move_count}/4"
-    info_surface = font.render(info_text, True, (255, 255, 255))
-    screen.blit(info_surface, (10, BOARD_SIZE * CELL_SIZE + 10))
-    
-    # Controls
-    controls_text = "Controls: SPACE to advance, R to restart, ESC to quit"
-    controls_surface = font.render(controls_text, True, (200, 200, 200))
-    screen.blit(controls_surface, (WINDOW_WIDTH - 400, BOARD_SIZE * CELL_SIZE + 10))
+            if piece == " ":
+                continue
+            player_support = support[piece[0]]
+            player_strongest = strongest[piece[0]]
+            strength = piece_strength[piece]
+            for dr, dc in [(0, 1), (1, 0), (0, -1), (-1, 0)]:
+                adj_row, adj_col = row + dr, col + dc
+                if 0 <= adj_row < BOARD_SIZE and 0 <= adj_col < BOARD_SIZE:
+                    player_support[adj_row][adj_col] += 1
+                    if strength > player_strongest[adj_row][adj_col]:
+                        player_strongest[adj_row][adj_col] = strength
     
-    # Show win message if game is over
-    if game_finished:
-        font = pygame.font.Font(None, 48)
-        win_message = f"{whose_turn} Wins!"
-        text = font.render(win_message, True, (255, 255, 255))
-        text_pos = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
-        pygame.draw.rect(screen, (0, 0, 0), text_pos.inflate(20, 20))  # Black background
-        screen.blit(text, text_pos)
+    frozen = [[False] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            piece = board[row][col]
+            if piece == " ":
+                continue
+            enemy_prefix = 'S' if piece[0] == 'G' else 'G'
+            if (strongest[enemy_prefix][row][col] > piece_strength[piece]
+                    and support[piece[0]][row][col] == 0):
+                frozen[row][col] = True
+    
+    return frozen, support
 
 def is_frozen(board, row, col):
     """Check if a piece is frozen (surrounded by stronger enemy pieces)."""
-    if board[row][col] == "  ":
+    if board[row][col] == " ":
         return False
         
     piece = board[row][col]
@@ -191,7 +503,7 @@ def is_frozen(board, row, col):
         adj_row, adj_col = row + dr, col + dc
         if 0 <= adj_row < BOARD_SIZE and 0 <= adj_col < BOARD_SIZE:
             adj_piece = board[adj_row][adj_col]
-            if adj_piece != "  " and adj_piece[0] != player_prefix:
+            if adj_piece != " " and adj_piece[0] != player_prefix:
                 if piece_strength[adj_piece] > strength:
                     has_stronger_enemy = True
                     break
@@ -204,13 +516,16 @@ def is_frozen(board, row, col):
         adj_row, adj_col = row + dr, col + dc
         if 0 <= adj_row < BOARD_SIZE and 0 <= adj_col < BOARD_SIZE:
             adj_piece = board[adj_row][adj_col]
-            if adj_piece != "  " and adj_piece[0] == player_prefix:
+            if adj_piece != " " and adj_piece[0] == player_prefix:
                 return False  # Not frozen, has friendly support
     
     return True  # Frozen: has stronger enemy and no friendly support
 
-def can_move(board, start_row, start_col, end_row, end_col):
-    """Check if a piece can legally move from start to end."""
+def can_move(board, start_row, start_col, end_row, end_col, frozen=None):
+    """Check if a piece can legally move from start to end.
+
+    frozen is an optional map from compute_piece_maps for this board.
+    """
     # Check if coordinates are valid
     if not (0 <= start_row < BOARD_SIZE and 0 <= start_col < BOARD_SIZE):
         return False
@@ -219,11 +534,11 @@ def can_move(board, start_row, start_col, end_row, end_col):
     
     # Check if there's a piece at the start
     piece = board[start_row][start_col]
-    if piece == "  ":
+    if piece == " ":
         return False
     
     # Check if the destination is empty
-    if board[end_row][end_col] != "  ":
+    if board[end_row][end_col] != " ":
         return False
     
     # Check if move is orthogonal (no diagonals)
@@ -235,7 +550,10 @@ def can_move(board, start_row, start_col, end_row, end_col):
         return False
     
     # Check if the piece is frozen
-    if is_frozen(board, start_row, start_col):
+    if frozen is not None:
+        if frozen[start_row][start_col]:
+            return False
+    elif is_frozen(board, start_row, start_col):
         return False
     
     # Special rule for rabbits: cannot move backward
@@ -247,8 +565,11 @@ def can_move(board, start_row, start_col, end_row, end_col):
     
     return True
 
-def can_push_pull(board, piece_row, piece_col, target_row, target_col):
-    """Check if a piece can push or pull the target piece."""
+def can_push_pull(board, piece_row, piece_col, target_row, target_col, frozen=None):
+    """Check if a piece can push or pull the target piece.
+
+    frozen is an optional map from compute_piece_maps for this board.
+    """
     # Check if coordinates are valid
     if not (0 <= piece_row < BOARD_SIZE and 0 <= piece_col < BOARD_SIZE):
         return False
@@ -258,7 +579,7 @@ def can_push_pull(board, piece_row, piece_col, target_row, target_col):
     # Check if there's a piece at both positions
     piece = board[piece_row][piece_col]
     target = board[target_row][target_col]
-    if piece == "  " or target == "  ":
+    if piece == " " or target == " ":
         return False
     
     # Check if they're different colors
@@ -274,10 +595,9 @@ def can_push_pull(board, piece_row, piece_col, target_row, target_col):
         return False
     
     # Check if the piece is frozen
-    if is_frozen(board, piece_row, piece_col):
-        return False
-    
-    return True
+    if frozen is not None:
+        return not frozen[piece_row][piece_col]
+    return not is_frozen(board, piece_row, piece_col)
 
 def check_traps(board):
     """Check all trap squares and remove pieces without adjacent friendly pieces."""
@@ -287,7 +607,7 @@ def check_traps(board):
     # Check each trap
     for trap_row, trap_col in traps:
         # If there's a piece on a trap
-        if board[trap_row][trap_col] != "  ":
+        if board[trap_row][trap_col] != " ":
             piece = board[trap_row][trap_col]
             player_prefix = piece[0]  # 'G' or 'S'
             
@@ -297,70 +617,357 @@ def check_traps(board):
                 adj_row, adj_col = trap_row + dr, trap_col + dc
                 if 0 <= adj_row < BOARD_SIZE and 0 <= adj_col < BOARD_SIZE:
                     adj_piece = board[adj_row][adj_col]
-                    if adj_piece != "  " and adj_piece[0] == player_prefix:
+                    if adj_piece != " " and adj_piece[0] == player_prefix:
                         has_friendly_support = True
                         break
             
             # If no friendly support, the piece is captured
             if not has_friendly_support:
                 #print(f"Piece {piece} captured at trap ({trap_row}, {trap_col})")
-                board[trap_row][trap_col] = "  "  # Remove the piece
+                board[trap_row][trap_col] = " "  # Remove the piece
     
     return board
 
-def check_winner(board):
-    """Check if the game is won and set the winner."""
+class GameResult(Enum):
+    """Result of a position as reported by terminal_result."""
+    ONGOING = "ongoing"
+    GOLD_GOAL = "Gold rabbit reached the goal row"
+    SILVER_GOAL = "Silver rabbit reached the goal row"
+    GOLD_ELIMINATION = "All Silver rabbits eliminated"
+    SILVER_ELIMINATION = "All Gold rabbits eliminated"
+    GOLD_IMMOBILIZATION = "Silver has no legal moves"
+    SILVER_IMMOBILIZATION = "Gold has no legal moves"
+    
+    @property
+    def winner(self):
+        """'Gold', 'Silver', or None while the game is still going."""
+        if self is GameResult.ONGOING:
+            return None
+        return "Gold" if self.name.startswith("GOLD") else "Silver"
+
+def rabbit_counts(board):
+    """Count rabbits and rabbits on the goal row for each side.
+
+    Returns (gold_rabbits, silver_rabbits, gold_on_goal, silver_on_goal).
+    Searches keep this up to date with update_rabbit_counts instead of
+    rescanning the board.
+    """
+    gold_rabbits = sum(row.count("GR") for row in board)
+    silver_rabbits = sum(row.count("SR") for row in board)
+    return gold_rabbits, silver_rabbits, board[0].count("GR"), board[BOARD_SIZE - 1].count("SR")
+
+def _rabbit_square_counts(board, squares):
+    # Rabbit and goal-row counts over a few squares, in the same order as rabbit_counts
+    gold_rabbits = silver_rabbits = gold_on_goal = silver_on_goal = 0
+    for row, col in squares:
+        piece = board[row][col]
+        if piece == "GR":
+            gold_rabbits += 1
+            gold_on_goal += row == 0
+        elif piece == "SR":
+            silver_rabbits += 1
+            silver_on_goal += row == BOARD_SIZE - 1
+    return gold_rabbits, silver_rabbits, gold_on_goal, silver_on_goal
+
+def update_rabbit_counts(counts, board, new_board, move):
+    """Update rabbit_counts for board to new_board = make_move(board, move).
+
+    Only the squares the move touches and the four traps (where captures
+    happen) can change, so this looks at no more than seven squares.
+    """
+    if move == PASS_MOVE:
+        return counts
+    kind, row, col, target_row, target_col, dir_row, dir_col = decode_move(move)
+    squares = {(row, col), (target_row, target_col)}
+    if kind == MOVE_PUSH:
+        squares.add((target_row + dir_row, target_col + dir_col))
+    elif kind == MOVE_PULL:
+        squares.add((row + dir_row, col + dir_col))
+    squares.update(TRAPS)
+    
+    before = _rabbit_square_counts(board, squares)
+    after = _rabbit_square_counts(new_board, squares)
+    return tuple(total - old + new for total, old, new in zip(counts, before, after))
+
+def has_legal_move(board, current_turn, frozen=None):
+    """Check if the side to move has at least one legal step, push or pull.
+
+    Stops at the first move it finds, so it is cheap in normal positions.
+    """
+    player_prefix = current_turn[0]
+    backward = 1 if player_prefix == 'G' else -1
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            piece = board[row][col]
+            if piece[0] != player_prefix:
+                continue
+            if frozen[row][col] if frozen is not None else is_frozen(board, row, col):
+                continue
+            for dr, dc in DIRECTIONS:
+                adj_row, adj_col = row + dr, col + dc
+                if not (0 <= adj_row < BOARD_SIZE and 0 <= adj_col < BOARD_SIZE):
+                    continue
+                target = board[adj_row][adj_col]
+                if target == " ":
+                    if piece[1] != 'R' or dr != backward:
+                        return True
+                elif target[0] != player_prefix and piece_strength[piece] > piece_strength[target]:
+                    # A pull needs an empty square next to us, which already counts
+                    # as a step above, so only pushes are left to check
+                    for pdr, pdc in DIRECTIONS:
+                        push_row, push_col = adj_row + pdr, adj_col + pdc
+                        if 0 <= push_row < BOARD_SIZE and 0 <= push_col < BOARD_SIZE and board[push_row][push_col] == " ":
+                            return True
+    return False
+
+def terminal_result(board, current_turn, counts=None, frozen=None, check_immobilization=True):
+    """Work out whether the game is over, without printing or touching any globals.
+
+    current_turn is the side about to move, so the other side moved last and
+    wins if both sides reach the goal or lose every rabbit. counts comes from
+    rabbit_counts or update_rabbit_counts and is computed if not given.
+    """
+    gold_rabbits, silver_rabbits, gold_on_goal, silver_on_goal = counts if counts is not None else rabbit_counts(board)
+    gold_moved_last = current_turn == "Silver"
+    
+    # Goal
+    if gold_on_goal and (gold_moved_last or not silver_on_goal):
+        return GameResult.GOLD_GOAL
+    if silver_on_goal:
+        return GameResult.SILVER_GOAL
+    
+    # Elimination
+    if silver_rabbits == 0 and (gold_moved_last or gold_rabbits > 0):
+        return GameResult.GOLD_ELIMINATION
+    if gold_rabbits == 0:
+        return GameResult.SILVER_ELIMINATION
+    
+    # Immobilization
+    if check_immobilization and not has_legal_move(board, current_turn, frozen):
+        return GameResult.SILVER_IMMOBILIZATION if current_turn == "Gold" else GameResult.GOLD_IMMOBILIZATION
+    
+    return GameResult.ONGOING
+
+def check_winner(board, current_turn=None):
+    """Check if the game is won and set the winner.
+
+    Pass current_turn at the start of a turn to also check whether that side
+    is immobilized. Without it, this checks the middle of whose_turn's turn.
+    """
     global game_finished, whose_turn
     
-    # Check for rabbit elimination
-    gr_count = 0
-    sr_count = 0
+    if current_turn is None:
+        opponent = "Silver" if whose_turn == "Gold" else "Gold"
+        result = terminal_result(board, opponent, check_immobilization=False)
+    else:
+        result = terminal_result(board, current_turn)
+    
+    if result is GameResult.ONGOING:
+        return False
+    
+    print(f"{result.value} - {result.winner} wins!")
+    whose_turn = result.winner
+    game_finished = True
+    return True
+
+def position_hash(board):
+    """Compute the Zobrist hash of a board."""
+    h = 0
     for row in range(BOARD_SIZE):
         for col in range(BOARD_SIZE):
-            if board[row][col] == 'GR':
-                gr_count += 1
-            if board[row][col] == 'SR':
-                sr_count += 1
-    
-    # If all rabbits of one side are eliminated
-    if gr_count == 0:
-        print("All Gold rabbits eliminated - Silver wins!")
-        whose_turn = 'Silver'
-        game_finished = True
-        return True
-    elif sr_count == 0:
-        print("All Silver rabbits eliminated - Gold wins!")
-        whose_turn = 'Gold'
-        game_finished = True
-        return True
+            piece = board[row][col]
+            if piece in ZOBRIST_KEYS:
+                h ^= ZOBRIST_KEYS[piece][row][col]
+    return h
+
+def rabbit_goal_distance(board, row, col):
+    """Find the minimum number of steps the rabbit at (row, col) needs to reach its goal row.
+
+    Empty squares cost one step. A square held by a friendly piece that is
+    not frozen and has somewhere to go costs two (the friend steps aside
+    first). Frozen squares cost an extra step because a friend has to come
+    and unfreeze the rabbit. Enemy pieces block the way and traps without
+    friendly support are avoided. Returns GOAL_DISTANCE_LIMIT + 1 when the
+    goal can't be reached within GOAL_DISTANCE_LIMIT steps.
+    """
+    rabbit = board[row][col]
+    player_prefix = rabbit[0]
+    goal_row = 0 if player_prefix == 'G' else BOARD_SIZE - 1
+    forward = -1 if player_prefix == 'G' else 1
+    unreachable = GOAL_DISTANCE_LIMIT + 1
+    
+    def has_friend(r, c):
+        # Friendly support at (r, c), ignoring the rabbit's own starting square
+        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            adj_row, adj_col = r + dr, c + dc
+            if (adj_row, adj_col) == (row, col):
+                continue
+            if 0 <= adj_row < BOARD_SIZE and 0 <= adj_col < BOARD_SIZE:
+                if board[adj_row][adj_col][0] == player_prefix:
+                    return True
+        return False
     
-    # Check for rabbit reaching goal row
-    for col in range(BOARD_SIZE):
-        if board[0][col] == "GR":  # Gold rabbit at top row
-            print("Gold rabbit reached the goal row - Gold wins!")
-            print(col)
-            whose_turn = "Gold"
-            game_finished = True
-            return True
-        if board[7][col] == "SR":  # Silver rabbit at bottom row
-            print("Silver rabbit reached the goal row - Silver wins!")
-            print(col)
-            whose_turn = "Silver"
-            game_finished = True
-            return True
+    def has_stronger_enemy(r, c):
+        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            adj_row, adj_col = r + dr, c + dc
+            if 0 <= adj_row < BOARD_SIZE and 0 <= adj_col < BOARD_SIZE:
+                adj_piece = board[adj_row][adj_col]
+                if adj_piece[0] not in (player_prefix, " ") and piece_strength[adj_piece] > 0:
+                    return True
+        return False
     
-    return False
+    def can_step_aside(r, c):
+        # A friendly piece can make room if it isn't frozen and has an empty neighbour
+        if is_frozen(board, r, c):
+            return False
+        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            adj_row, adj_col = r + dr, c + dc
+            if 0 <= adj_row < BOARD_SIZE and 0 <= adj_col < BOARD_SIZE:
+                if board[adj_row][adj_col] == " ":
+                    return True
+        return False
+    
+    start_cost = 1 if is_frozen(board, row, col) else 0
+    if row == goal_row:
+        return 0
+    
+    best = {(row, col): start_cost}
+    queue = [(start_cost, row, col)]
+    while queue:
+        cost, r, c = heapq.heappop(queue)
+        if cost > best.get((r, c), unreachable):
+            continue
+        if r == goal_row:
+            return cost
+        
+        for dr, dc in [(forward, 0), (0, -1), (0, 1)]:
+            new_row, new_col = r + dr, c + dc
+            if not (0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE):
+                continue
+            
+            target = board[new_row][new_col]
+            if target == " " or (new_row, new_col) == (row, col):
+                step_cost = 1
+            elif target[0] == player_prefix and can_step_aside(new_row, new_col):
+                step_cost = 2
+            else:
+                continue  # Enemy piece or a friend that can't make room
+            
+            supported = has_friend(new_row, new_col)
+            if (new_row, new_col) in TRAPS and not supported:
+                continue  # The rabbit would be captured
+            if new_row != goal_row and not supported and has_stronger_enemy(new_row, new_col):
+                step_cost += 1  # Frozen on arrival, needs a friend to come over
+            
+            # Every remaining row costs at least a step, so hopeless squares are never queued
+            new_cost = cost + step_cost
+            if new_cost + abs(goal_row - new_row) <= GOAL_DISTANCE_LIMIT and \
+                    new_cost < best.get((new_row, new_col), unreachable):
+                best[(new_row, new_col)] = new_cost
+                heapq.heappush(queue, (new_cost, new_row, new_col))
+    
+    return unreachable
 
-def heuristic(board, add_noise=False):
-    """Evaluate the board position from Gold's perspective."""
-    h = 0
+def rabbit_goal_distances(board):
+    """Return a dict of (row, col) -> goal distance for every rabbit, cached by position hash."""
+    key = position_hash(board)
+    distances = goal_distance_cache.get(key)
+    if distances is not None:
+        return distances
+    
+    distances = {}
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            if board[row][col] in ("GR", "SR"):
+                distances[(row, col)] = rabbit_goal_distance(board, row, col)
     
-    # Piece value weights
-    piece_values = {
-        'SE': 100, 'SC': 50, 'SH': 30, 'SD': 20, 'ST': 15, 'SR': 10,
-        'GE': -100, 'GC': -50, 'GH': -30, 'GD': -20, 'GT': 15, 'GR': -10,
-        ' ': 0
-    }
+    if len(goal_distance_cache) >= MAX_GOAL_CACHE_SIZE:
+        goal_distance_cache.clear()
+    goal_distance_cache[key] = distances
+    return distances
+
+def goal_distance(board, player):
+    """Return the smallest goal distance among the player's rabbits."""
+    distances = rabbit_goal_distances(board)
+    return min((d for (row, col), d in distances.items() if board[row][col][0] == player[0]),
+               default=GOAL_DISTANCE_LIMIT + 1)
+
+def find_goal(board, player, steps_left=4):
+    """Search for steps that get one of the player's rabbits to the goal this turn.
+
+    Returns the list of moves, or None if there is no goal. Positions whose
+    goal distance is more than the remaining steps are skipped without
+    searching.
+    """
+    goal_row = 0 if player == "Gold" else BOARD_SIZE - 1
+    rabbit = player[0] + "R"
+    if rabbit in board[goal_row]:
+        return []
+    if steps_left <= 0 or goal_distance(board, player) > steps_left:
+        return None
+    
+    # Rabbit steps toward the goal come out of the generator early
+    for move in staged_moves(board, player, 4 - steps_left):
+        cost = move_steps(move)
+        if cost == 0 or cost > steps_left:
+            continue
+        line = find_goal(make_move(board, move), player, steps_left - cost)
+        if line is not None:
+            return [move] + line
+    return None
+
+def line_notation(board, line):
+    """Format a line of moves (a goal line or a principal variation) for logging."""
+    steps = []
+    for move in line:
+        steps.append(move_notation(board, move))
+        board = make_move(board, move)
+    return " ".join(steps)
+
+def parse_turn(board, current_turn, text, history=None):
+    """Turn a turn in Arimaa step notation ('Ed2n Ed3n rc3x ...') into legal move codes.
+
+    Each step (or pair of steps for a push or pull) has to match one of
+    generate_moves' moves; capture steps are optional. Raises ValueError for
+    an illegal step, a turn that changes nothing, or one that repeats a
+    position for the third time (checked against history, by default the
+    current game's).
+    """
+    history = history if history is not None else game_history
+    steps = [step for step in text.split() if not step.endswith("x")]
+    moves, position, steps_taken = [], board, 0
+    while steps:
+        legal = {}
+        for move in generate_moves(position, current_turn, steps_taken):
+            if move != PASS_MOVE:
+                legal[" ".join(step for step in move_notation(position, move).split() if not step.endswith("x"))] = move
+        # Two steps that make a push or pull come before a single step
+        move = legal.get(" ".join(steps[:2])) if len(steps) > 1 else None
+        if move is None:
+            move = legal.get(steps[0])
+        if move is None:
+            raise ValueError(f"illegal step {steps[0]}")
+        steps = steps[move_steps(move):]
+        moves.append(move)
+        position = make_move(position, move)
+        steps_taken += move_steps(move)
+    if not moves or position == board:
+        raise ValueError("a turn has to change the position")
+    opponent = "Silver" if current_turn == "Gold" else "Gold"
+    if history.is_forbidden((position_hash(position), opponent)):
+        raise ValueError("the turn repeats a position for the third time")
+    return moves
+
+def heuristic(board, add_noise=False, maps=None, noise_seed=None):
+    """Evaluate the board position from Gold's perspective.
+
+    maps is an optional (frozen, support) pair from compute_piece_maps for this board.
+    With a noise_seed the noise is worked out from the position hash instead
+    of drawn at random, so the same position always gets the same score.
+    """
+    h = 0
+    frozen, support = maps if maps is not None else compute_piece_maps(board)
+    params = heuristic_params
     
     # Count material
     for row in range(BOARD_SIZE):
@@ -374,68 +981,51 @@ def heuristic(board, add_noise=False):
             piece = board[row][col]
             if piece == 'SR':
                 # Exponential reward for advancement
-                h += (row + 1) ** 2
-                # Extra bonus for being close to the goal row
+                h += params["rabbit_advance"] * (row + 1) ** 2
                 if row == 7:
                     h = float('inf')  # Win condition
-                elif row >= 6:  # One step away from winning
-                    h += 200
-                elif row >= 5:  # Two steps away
-                    h += 100
                 
             elif piece == 'GR':
                 # Penalize Gold rabbit advancement (since this is from Silver's perspective)
-                h -= (8 - row) ** 2
+                h -= params["rabbit_advance"] * (8 - row) ** 2
                 if row == 0:
                     h = -float('inf')  # Loss condition
     
-    # Control of center - pieces in the center have more influence
-    center_value = [
-        [1, 1, 2, 2, 2, 2, 1, 1],
-        [1, 2, 3, 3, 3, 3, 2, 1],
-        [2, 3, 4, 4, 4, 4, 3, 2],
-        [2, 3, 4, 5, 5, 4, 3, 2],
-        [2, 3, 4, 5, 5, 4, 3, 2],
-        [2, 3, 4, 4, 4, 4, 3, 2],
-        [1, 2, 3, 3, 3, 3, 2, 1],
-        [1, 1, 2, 2, 2, 2, 1, 1]
-    ]
+    # Goal threats - reward rabbits with a short, unblocked path to the goal
+    silver_distance = goal_distance(board, "Silver")
+    gold_distance = goal_distance(board, "Gold")
+    if silver_distance <= GOAL_DISTANCE_LIMIT:
+        h += goal_threat_bonus[silver_distance]
+    if gold_distance <= GOAL_DISTANCE_LIMIT:
+        h -= goal_threat_bonus[gold_distance]
     
+    # Control of center - pieces in the center have more influence
     for row in range(BOARD_SIZE):
         for col in range(BOARD_SIZE):
             piece = board[row][col]
             if piece.startswith('S'):
-                h += center_value[row][col] * 2
+                h += CENTER_VALUE[row][col] * params["center"]
             elif piece.startswith('G'):
-                h -= center_value[row][col] * 2
+                h -= CENTER_VALUE[row][col] * params["center"]
     
     # Trap control and piece safety
     for trap_row, trap_col in TRAPS:
-        silver_adjacent = 0
-        gold_adjacent = 0
-        
-        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            r, c = trap_row + dr, trap_col + dc
-            if 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE:
-                piece = board[r][c]
-                if piece.startswith('S'):
-                    silver_adjacent += 1
-                elif piece.startswith('G'):
-                    gold_adjacent += 1
+        silver_adjacent = support['S'][trap_row][trap_col]
+        gold_adjacent = support['G'][trap_row][trap_col]
         
         # Reward for controlling trap
         if silver_adjacent > gold_adjacent:
-            h += 15 * (silver_adjacent - gold_adjacent)
+            h += params["trap_control"] * (silver_adjacent - gold_adjacent)
         elif gold_adjacent > silver_adjacent:
-            h -= 15 * (gold_adjacent - silver_adjacent)
+            h -= params["trap_control"] * (gold_adjacent - silver_adjacent)
         
         # Check pieces in traps
         piece_in_trap = board[trap_row][trap_col]
         if piece_in_trap != " ":
             if piece_in_trap.startswith('S') and silver_adjacent == 0:
-                h -= 50  # Severe penalty for unsupported piece in trap
+                h -= params["trap_hanging"]  # Severe penalty for unsupported piece in trap
             elif piece_in_trap.startswith('G') and gold_adjacent == 0:
-                h += 50  # Reward for enemy piece about to be captured
+                h += params["trap_hanging"]  # Reward for enemy piece about to be captured
     
     # File control - reward controlling files (columns)
     for col in range(BOARD_SIZE):
@@ -450,9 +1040,9 @@ def heuristic(board, add_noise=False):
         
         # Reward for controlling files
         if silver_count > gold_count:
-            h += 10 * (silver_count - gold_count)
+            h += params["file_control"] * (silver_count - gold_count)
         elif gold_count > silver_count:
-            h -= 10 * (gold_count - silver_count)
+            h -= params["file_control"] * (gold_count - silver_count)
     
     # Piece mobility and safety
     for row in range(BOARD_SIZE):
@@ -461,35 +1051,71 @@ def heuristic(board, add_noise=False):
             if piece != " ":
                 # Count possible moves for this piece
                 moves = 0
-                for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                    r, c = row + dr, col + dc
-                    if 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE:
-                        if board[r][c] == " " and not is_frozen(board, row, col):
+                if not frozen[row][col]:
+                    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                        r, c = row + dr, col + dc
+                        if 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE and board[r][c] == " ":
                             moves += 1
                 
                 # Reward mobility
                 if piece.startswith('S'):
-                    h += moves * 2
+                    h += moves * params["mobility"]
                 else:
-                    h -= moves * 2
+                    h -= moves * params["mobility"]
     
     # Add a small amount of noise to prevent repetitive patterns
     if add_noise:
-        h += random.uniform(-20, 20)
+        h += evaluation_noise(board, noise_seed)
     
     return h
 
+def evaluation_noise(board, noise_seed=None):
+    """Noise between -20 and 20, random or (with a seed) fixed by the position hash."""
+    if noise_seed is None:
+        return random.uniform(-20, 20)
+    mixed = ((position_hash(board) ^ noise_seed) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+    return (mixed >> 11) / (1 << 53) * 40 - 20
+
+def load_value_net(path):
+    """Load a value network from an .npz file and evaluate positions with it from now on."""
+    global EVALUATOR, value_net, value_net_path
+    import valuenet  # NumPy is only needed for the network
+    value_net = valuenet.ValueNet.load(path)
+    value_net_path = path
+    EVALUATOR = "net"
+    print(f"Evaluating positions with the value network from {path}")
+
+def evaluate(board, add_noise=False, maps=None, noise_seed=None):
+    """Score board (Silver-positive) with the selected evaluator: heuristic or value network."""
+    if EVALUATOR != "net":
+        return heuristic(board, add_noise, maps, noise_seed)
+    score = value_net.evaluate(board)
+    if add_noise:
+        score += evaluation_noise(board, noise_seed)
+    return score
+
+def evaluate_boards(boards, add_noise=False):
+    """Score a list of boards; the value network scores them all in one batch."""
+    if EVALUATOR != "net":
+        return [heuristic(board, add_noise) for board in boards]
+    scores = value_net.evaluate_boards(boards).tolist()
+    if add_noise:
+        scores = [score + evaluation_noise(board) for score, board in zip(scores, boards)]
+    return scores
+
 def debug_moves(board, player):
     """Debug function to print available moves."""
-    moves = generate_moves(board, player)
+    maps = compute_piece_maps(board)
+    frozen = maps[0]
+    moves = generate_moves(board, player, maps=maps)
     print(f"\nMoves available for {player}: {len(moves)}")
     
     if len(moves) > 0:
         print("First 10 moves:")
         count = 0
         for move in moves:
-            if move[0] != "pass":
-                print(f" - {move}")
+            if move != PASS_MOVE:
+                print(f" - {move_notation(board, move)}")
                 count += 1
                 if count >= 10:
                     break
@@ -501,7 +1127,7 @@ def debug_moves(board, player):
         for col in range(BOARD_SIZE):
             piece = board[row][col]
             if piece != " " and piece[0] == player[0]:
-                if is_frozen(board, row, col):
+                if frozen[row][col]:
                     print(f" - {piece} at ({row}, {col}) is FROZEN")
                     frozen_count += 1
     
@@ -510,78 +1136,12 @@ def debug_moves(board, player):
     
     return moves
 
-def generate_moves(board, current_turn, move_count=0):
-    """Generate all possible moves for the current player."""
-    moves = []
-    
-    # Only generate moves if we haven't used all 4 moves
-    if move_count < 4:
-        # Generate regular moves
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                piece = board[row][col]
-                if piece != " " and piece[0] == current_turn[0]:
-                    # Check normal moves
-                    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                        new_row = row + dr
-                        new_col = col + dc
-                        if can_move(board, row, col, new_row, new_col):
-                            moves.append((row, col, new_row, new_col, "move"))
-                    
-                    # Push/pull moves - require 2 moves so only if < 3 moves used
-                    if move_count < 3:
-                        # Check for adjacent enemy pieces that can be pushed/pulled
-                        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                            adj_row = row + dr
-                            adj_col = col + dc
-                            if can_push_pull(board, row, col, adj_row, adj_col):
-                                # Try push directions
-                                for pdr, pdc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                                    push_row = adj_row + pdr
-                                    push_col = adj_col + pdc
-                                    if 0 <= push_row < BOARD_SIZE and 0 <= push_col < BOARD_SIZE:
-                                        if board[push_row][push_col] == " ":
-                                            # Check if push would create a trap capture
-                                            temp_board = [row[:] for row in board]
-                                            temp_board[push_row][push_col] = temp_board[adj_row][adj_col]
-                                            temp_board[adj_row][adj_col] = temp_board[row][col]
-                                            temp_board[row][col] = " "
-                                            check_traps(temp_board)
-                                            
-                                            # If push would capture a piece, prioritize it
-                                            if temp_board[push_row][push_col] == " ":
-                                                moves.append((row, col, adj_row, adj_col, "push", pdr, pdc))
-                                            else:
-                                                # Add with higher priority
-                                                moves.append((row, col, adj_row, adj_col, "push", pdr, pdc))
-                                
-                                # Try pull directions
-                                for pdr, pdc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                                    # Skip direction toward the enemy piece
-                                    if pdr == dr and pdc == dc:
-                                        continue
-                                    
-                                    pull_row = row + pdr
-                                    pull_col = col + pdc
-                                    if 0 <= pull_row < BOARD_SIZE and 0 <= pull_col < BOARD_SIZE:
-                                        if board[pull_row][pull_col] == " ":
-                                            # Check if pull would create a trap capture
-                                            temp_board = [row[:] for row in board]
-                                            temp_board[pull_row][pull_col] = temp_board[row][col]
-                                            temp_board[row][col] = temp_board[adj_row][adj_col]
-                                            temp_board[adj_row][adj_col] = " "
-                                            check_traps(temp_board)
-                                            
-                                            # If pull would capture a piece, prioritize it
-                                            if temp_board[row][col] == " ":
-                                                moves.append((row, col, adj_row, adj_col, "pull", pdr, pdc))
-                                            else:
-                                                # Add with higher priority
-                                                moves.append((row, col, adj_row, adj_col, "pull", pdr, pdc))
-        
-        # Add "pass" move if at least one move was made
-        if move_count >= 1:
-            moves.append(("pass", None, None, None, None))
+def generate_moves(board, current_turn, move_count=0, maps=None):
+    """Generate all possible moves for the current player as an array of encoded moves.
+
+    maps is an optional (frozen, support) pair from compute_piece_maps for this board.
+    """
+    moves = array('I', staged_moves(board, current_turn, move_count, maps))
     
     # Debug information
     if len(moves) == 0:
@@ -589,113 +1149,228 @@ def generate_moves(board, current_turn, move_count=0):
     
     return moves
 
-def make_move(board, move):
-    """Apply a move to the board and return the new board."""
-    if move[0] == "pass":
-        return [row[:] for row in board]  # Return a copy of the board
+def is_legal_move(board, current_turn, move, move_count=0, frozen=None):
+    """Check if a move (e.g. from the transposition or killer tables) is legal on this board."""
+    if move == PASS_MOVE:
+        return 1 <= move_count < 4
+    if move_count >= 4:
+        return False
     
-    # Create a copy of the board to modify
-    new_board = [row[:] for row in board]
+    kind, row, col, target_row, target_col, dir_row, dir_col = decode_move(move)
+    piece = board[row][col]
+    if piece == " " or piece[0] != current_turn[0]:
+        return False
+    if kind == MOVE_STEP:
+        return can_move(board, row, col, target_row, target_col, frozen)
+    
+    # Push/pull moves take two steps
+    if move_count >= 3 or not can_push_pull(board, row, col, target_row, target_col, frozen):
+        return False
+    if kind == MOVE_PUSH:
+        dest_row, dest_col = target_row + dir_row, target_col + dir_col
+    else:
+        dest_row, dest_col = row + dir_row, col + dir_col
+    return 0 <= dest_row < BOARD_SIZE and 0 <= dest_col < BOARD_SIZE and board[dest_row][dest_col] == " "
+
+def dislodge_captures(board, support, enemy_prefix, from_row, from_col, to_row, to_col):
+    """Check if dislodging an enemy piece from one square to another gets an enemy piece captured."""
+    # The dislodged piece lands on a trap and its only neighbour was itself
+    if (to_row, to_col) in TRAPS and support[enemy_prefix][to_row][to_col] == 1:
+        return True
+    # The dislodged piece was the last friend of an enemy piece sitting on a trap
+    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+        trap = (from_row + dr, from_col + dc)
+        if trap in TRAPS and trap != (to_row, to_col) and board[trap[0]][trap[1]][0] == enemy_prefix \
+                and support[enemy_prefix][trap[0]][trap[1]] == 1:
+            return True
+    return False
+
+def staged_moves(board, current_turn, move_count=0, maps=None, tt_move=None, killers=(), history=None):
+    """Yield moves lazily, one stage at a time, so work after a cutoff is never done.
+
+    Stages: the transposition table move, captures, rabbit steps toward the
+    goal, the other steps (killer moves first), the remaining pushes and
+    pulls, then pass. Within the last two stages, moves with a higher
+    history score come first.
+    """
+    if move_count >= 4:
+        return
+    
+    frozen, support = maps if maps is not None else compute_piece_maps(board)
+    player_prefix = current_turn[0]
+    enemy_prefix = 'S' if player_prefix == 'G' else 'G'
+    forward = -1 if player_prefix == 'G' else 1
+    yielded = set()
+    
+    # Stage 1: the best move found for this position last time
+    if tt_move is not None and is_legal_move(board, current_turn, tt_move, move_count, frozen):
+        yielded.add(tt_move)
+        yield tt_move
+    
+    # Pieces that are free to move
+    pieces = [(row, col) for row in range(BOARD_SIZE) for col in range(BOARD_SIZE)
+              if board[row][col][0] == player_prefix and not frozen[row][col]]
+    
+    # Stage 2: pushes and pulls that capture; the rest are kept for stage 5
+    push_pulls = []
+    if move_count < 3:
+        for row, col in pieces:
+            for direction, (dr, dc) in enumerate(DIRECTIONS):
+                adj_row = row + dr
+                adj_col = col + dc
+                if not can_push_pull(board, row, col, adj_row, adj_col, frozen):
+                    continue
+                
+                # Try push directions
+                for push_direction, (pdr, pdc) in enumerate(DIRECTIONS):
+                    push_row = adj_row + pdr
+                    push_col = adj_col + pdc
+                    if 0 <= push_row < BOARD_SIZE and 0 <= push_col < BOARD_SIZE and board[push_row][push_col] == " ":
+                        move = encode_move(row, col, direction, MOVE_PUSH, push_direction)
+                        if dislodge_captures(board, support, enemy_prefix, adj_row, adj_col, push_row, push_col):
+                            if move not in yielded:
+                                yielded.add(move)
+                                yield move
+                        else:
+                            push_pulls.append(move)
+                
+                # Try pull directions (skipping the direction toward the enemy piece)
+                for pull_direction, (pdr, pdc) in enumerate(DIRECTIONS):
+                    if pull_direction == direction:
+                        continue
+                    pull_row = row + pdr
+                    pull_col = col + pdc
+                    if 0 <= pull_row < BOARD_SIZE and 0 <= pull_col < BOARD_SIZE and board[pull_row][pull_col] == " ":
+                        move = encode_move(row, col, direction, MOVE_PULL, pull_direction)
+                        if dislodge_captures(board, support, enemy_prefix, adj_row, adj_col, row, col):
+                            if move not in yielded:
+                                yielded.add(move)
+                                yield move
+                        else:
+                            push_pulls.append(move)
+    
+    # Stage 3: rabbits stepping toward the goal
+    forward_direction = 0 if player_prefix == 'G' else 1
+    for row, col in pieces:
+        if board[row][col][1] == 'R' and can_move(board, row, col, row + forward, col, frozen):
+            move = encode_move(row, col, forward_direction)
+            if move not in yielded:
+                yielded.add(move)
+                yield move
+    
+    # Stage 4: killer moves, then the remaining steps
+    for move in killers:
+        if move not in yielded and move_kind(move) == MOVE_STEP and \
+                is_legal_move(board, current_turn, move, move_count, frozen):
+            yielded.add(move)
+            yield move
+    steps = []
+    for row, col in pieces:
+        for direction, (dr, dc) in enumerate(DIRECTIONS):
+            if can_move(board, row, col, row + dr, col + dc, frozen):
+                move = encode_move(row, col, direction)
+                if move not in yielded:
+                    steps.append(move)
+    if history:
+        steps.sort(key=lambda move: history.get(move, 0), reverse=True)
+    yield from steps
+    
+    # Stage 5: pushes and pulls that don't capture
+    if history:
+        push_pulls.sort(key=lambda move: history.get(move, 0), reverse=True)
+    for move in push_pulls:
+        if move not in yielded:
+            yield move
+    
+    # Add "pass" move if at least one move was made
+    if move_count >= 1:
+        yield PASS_MOVE
+
+def apply_move(board, move):
+    """Move the pieces for a move in place, without checking traps."""
+    kind, start_row, start_col, end_row, end_col, dir_row, dir_col = decode_move(move)
     
-    if move[4] == "move":
-        start_row, start_col, end_row, end_col, _ = move
-        new_board[end_row][end_col] = new_board[start_row][start_col]
-        new_board[start_row][start_col] = " "
+    if kind == MOVE_STEP:
+        board[end_row][end_col] = board[start_row][start_col]
+        board[start_row][start_col] = " "
     
-    elif move[4] == "push":
-        start_row, start_col, end_row, end_col, _, dir_row, dir_col = move
+    elif kind == MOVE_PUSH:
         push_row, push_col = end_row + dir_row, end_col + dir_col
         
         # Move the opponent's piece first
-        new_board[push_row][push_col] = new_board[end_row][end_col]
+        board[push_row][push_col] = board[end_row][end_col]
         # Then move our piece to opponent's previous spot
-        new_board[end_row][end_col] = new_board[start_row][start_col]
+        board[end_row][end_col] = board[start_row][start_col]
         # Empty our original position
-        new_board[start_row][start_col] = " "
+        board[start_row][start_col] = " "
     
-    elif move[4] == "pull":
-        start_row, start_col, end_row, end_col, _, dir_row, dir_col = move
+    elif kind == MOVE_PULL:
         pull_row, pull_col = start_row + dir_row, start_col + dir_col
         
         # Move our piece first
-        new_board[pull_row][pull_col] = new_board[start_row][start_col]
+        board[pull_row][pull_col] = board[start_row][start_col]
         # Then move opponent's piece to our original spot
-        new_board[start_row][start_col] = new_board[end_row][end_col]
+        board[start_row][start_col] = board[end_row][end_col]
         # Empty opponent's original position
-        new_board[end_row][end_col] = " "
+        board[end_row][end_col] = " "
+
+def make_move(board, move):
+    """Apply a move to the board and return the new board."""
+    # Create a copy of the board to modify
+    new_board = [row[:] for row in board]
+    if move == PASS_MOVE:
+        return new_board
+    
+    apply_move(new_board, move)
     
     # Check traps after any move
     check_traps(new_board)
     
     return new_board
 
-def board_to_string(board):
-    """Convert a board to a string representation for loop detection."""
-    return "".join("".join(row) for row in board)
-
-def is_loop_detected(board_history):
-    """Check if the current board state has appeared multiple times."""
-    if len(board_history) < 6:
+def repeats_position(board, current_turn, move, steps_taken):
+    """Check if move ends the turn on a position that has already occurred twice."""
+    if move != PASS_MOVE and steps_taken + move_steps(move) < 4:
         return False
-    
-    # Get the last board state
-    last_state = board_history[-1]
-    
-    # Count occurrences of this board state in history
-    occurrences = sum(1 for state in board_history if state == last_state)
-    
-    # If this board state has appeared 3+ times, it's a loop
-    return occurrences >= 3
-
-def add_to_history(board):
-    """Add the current board state to history."""
-    global move_history
-    board_str = board_to_string(board)
-    move_history.append(board_str)
-    # Keep only the last max_history_length states
-    if len(move_history) > max_history_length:
-        move_history.pop(0)
+    next_turn = "Silver" if current_turn == "Gold" else "Gold"
+    return game_history.is_forbidden((position_hash(make_move(board, move)), next_turn))
 
 def handle_ai_turn():
     """Handle the AI's turn (up to 4 moves)."""
-    global whose_turn, move_count, game_finished, board, move_history
+    global whose_turn, move_count, game_finished, board, planned_turn, adjudication_reason
     
     # Print debug info
     print(f"\n{whose_turn}'s turn (move {move_count}/4):")
     debug_moves(board, whose_turn)
     
-    # Check if game is already finished
-    if check_winner(board):
+    # Check if game is already finished (and, at the start of a turn, if we can move at all)
+    if check_winner(board, whose_turn if move_count == 0 else None):
         return
     
-    # Track board states to detect loops
-    board_str = board_to_string(board)
-    if board_str not in move_history:
-        move_history.append(board_str)
-        if len(move_history) > max_history_length:
-            move_history.pop(0)
-    
-    # Check for loops in game
-    if is_loop_detected(move_history):
-        print("Loop detected! Introducing randomness in move selection.")
-        # Reset history to break the loop
-        move_history = []
-    
-    # Get the AI's move (Gold = Minimax, Silver = Heuristic)
-    if whose_turn == "Gold":
-        best_move = get_best_move(board, "Gold")
+    # Get the AI's move (Gold = Minimax or MCTS, Silver = Heuristic). Minimax plans
+    # the whole turn when it starts and then plays it out one step per call
+    if whose_turn == "Gold" and GOLD_ENGINE == "mcts":
+        import mcts  # Imported here because mcts imports this module
+        mcts.engine.EVALUATOR, mcts.engine.value_net = EVALUATOR, value_net  # Run as a script, mcts has its own copy
+        best_move = mcts.get_best_move(board, "Gold", move_count, history=game_history)
+    elif whose_turn == "Gold":
+        if move_count == 0:
+            planned_turn = plan_turn(board, "Gold")
+            if sum(move_steps(move) for move in planned_turn) < 4:
+                planned_turn.append(PASS_MOVE)
+        best_move = planned_turn.pop(0) if planned_turn else None
     else:
         best_move = find_best_move_heuristic(board)
     
     # If no valid move or pass, end turn
-    if best_move is None or best_move[0] == "pass":
+    if best_move is None or best_move == PASS_MOVE:
         print(f"{whose_turn} passes their turn")
         move_count = 4  # Force end of turn
     else:
         # Apply the move
-        print(f"{whose_turn} makes move: {best_move}")
+        print(f"{whose_turn} makes move: {move_notation(board, best_move)}")
         board = make_move(board, best_move)
-        move_count += 1
+        move_count += move_steps(best_move)
         
         # Check if game is over after the move
         if check_winner(board):
@@ -705,74 +1380,353 @@ def handle_ai_turn():
     if move_count >= 4:
         move_count = 0
         whose_turn = "Silver" if whose_turn == "Gold" else "Gold"
+        game_history.push((position_hash(board), whose_turn))
         
-        # Check if game is over
-        check_winner(board)
+        # Check if game is over, or decided enough to stop here
+        if not check_winner(board, whose_turn) and ADJUDICATE:
+            score = last_plan_score if whose_turn == "Silver" and GOLD_ENGINE == "minimax" else None
+            verdict = adjudicator.update(board, whose_turn, score)
+            if verdict is not None:
+                whose_turn, adjudication_reason = verdict
+                game_finished = True
+                print(f"Adjudicated ({adjudication_reason}) - {whose_turn} wins!")
 
-def minimax(board, depth, alpha, beta, maximizing_player, current_turn):
-    """Minimax algorithm with alpha-beta pruning."""
-    # Base case: depth limit reached or terminal node
-    if depth == 0 or check_winner(board):
-        return heuristic(board, add_noise=(depth == 0)), None
-    
-    # Generate all possible moves
-    moves = generate_moves(board, current_turn)
-    
-    # No valid moves
-    if not moves:
-        return heuristic(board), None
-    
-    # Shuffle moves for more variety when scores are equal
-    random.shuffle(moves)                                                                          ################## Anchor
-    
-    if maximizing_player == current_turn:  # (maximizing)                                           ############## Anchor
-        max_eval = float('-inf')
-        best_move = None
+def _ai_turn_worker():
+    try:
+        handle_ai_turn()
+    except SearchStopped:
+        print("AI search cancelled")
+
+def start_ai_turn():
+    """Play the AI's next step on a worker thread; main polls ai_thread for the end."""
+    global ai_thread, search_nodes, search_depth
+    search_nodes = search_depth = 0
+    search_stop.clear()
+    ai_thread = threading.Thread(target=_ai_turn_worker, daemon=True)
+    ai_thread.start()
+
+def cancel_ai_turn():
+    """Stop the AI's search (on quit or restart) and wait for its thread to finish."""
+    global ai_thread
+    if ai_thread is not None:
+        search_stop.set()
+        ai_thread.join()
+        ai_thread = None
+
+def minimax(board, depth, alpha, beta, maximizing_player, current_turn, counts=None):
+    """Minimax algorithm with alpha-beta pruning.
+
+    counts are the rabbit_counts for board, kept up to date move by move.
+    """
+    global search_nodes
+    if search_stop is not None and search_stop.is_set():
+        raise SearchStopped
+    search_nodes += 1
+    if counts is None:
+        counts = rabbit_counts(board)
+    
+    # Frozen pieces and support counts are shared by move generation and evaluation
+    maps = compute_piece_maps(board)
+    
+    # Base case: terminal node or depth limit reached
+    result = terminal_result(board, current_turn, counts, maps[0])
+    if result is not GameResult.ONGOING:
+        return (float('inf') if result.winner == "Silver" else float('-inf')), None
+    if depth == 0:
+        return evaluate(board, add_noise=True, maps=maps, noise_seed=search_seed), None
+    
+    # A deep enough result from an earlier search (or an earlier step) settles this node
+    key = (position_hash(board), current_turn)
+    entry = transposition_table.get(key)
+    tt_move = None
+    if entry is not None:
+        tt_depth, tt_move, tt_score, tt_bound, _ = entry
+        if tt_depth >= depth and (tt_bound == TT_EXACT or
+                                  (tt_bound == TT_LOWER and tt_score >= beta) or
+                                  (tt_bound == TT_UPPER and tt_score <= alpha)):
+            return tt_score, tt_move
+    alpha_orig, beta_orig = alpha, beta
+    
+    # Rabbits close to the goal trigger a full goal search, distant ones skip it
+    if goal_distance(board, current_turn) <= GOAL_SEARCH_DISTANCE:
+        goal_line = find_goal(board, current_turn)
+        if goal_line:
+            return (float('inf') if current_turn == "Silver" else float('-inf')), goal_line[0]
+    
+    # Moves are generated lazily, best candidates first
+    moves = staged_moves(board, current_turn, maps=maps, tt_move=tt_move,
+                         killers=killer_moves.get(depth, ()), history=history_table)
+    
+    best_move = None
+    repetitions = 0
+    if maximizing_player:  # Silver's turn (maximizing)
+        best_eval = float('-inf')
         
         for move in moves:
-            # Make the move
+            # Make the move, skipping it if it repeats a position for the third time
             new_board = make_move(board, move)
+            child_key = (position_hash(new_board), "Gold")
+            if game_history.is_forbidden(child_key):
+                repetitions += 1
+                continue
             
             # Recursively evaluate
-            eval_score, _ = minimax(new_board, depth - 1, alpha, beta, False, "Gold")
+            game_history.push(child_key)
+            eval_score, _ = minimax(new_board, depth - 1, alpha, beta, False, "Gold",
+                                    update_rabbit_counts(counts, board, new_board, move))
+            game_history.pop()
             
             # Update best move if this is better
-            if eval_score > max_eval:
-                max_eval = eval_score
+            if best_move is None or eval_score > best_eval:
+                best_eval = eval_score
                 best_move = move
             
             # Alpha-beta pruning
             alpha = max(alpha, eval_score)
             if beta <= alpha:
+                record_cutoff(depth, move)
                 break
-        
-        return max_eval, best_move
     
     else:  # Gold's turn (minimizing)
-        min_eval = float('inf')
-        best_move = None
+        best_eval = float('inf')
         
         for move in moves:
-            # Make the move
+            # Make the move, skipping it if it repeats a position for the third time
             new_board = make_move(board, move)
+            child_key = (position_hash(new_board), "Silver")
+            if game_history.is_forbidden(child_key):
+                repetitions += 1
+                continue
             
             # Recursively evaluate
-            eval_score, _ = minimax(new_board, depth - 1, alpha, beta, True, "Silver")
+            game_history.push(child_key)
+            eval_score, _ = minimax(new_board, depth - 1, alpha, beta, True, "Silver",
+                                    update_rabbit_counts(counts, board, new_board, move))
+            game_history.pop()
             
             # Update best move if this is better
-            if eval_score < min_eval:
-                min_eval = eval_score
+            if best_move is None or eval_score < best_eval:
+                best_eval = eval_score
                 best_move = move
             
             # Alpha-beta pruning
             beta = min(beta, eval_score)
             if beta <= alpha:
+                record_cutoff(depth, move)
                 break
-        
-        return min_eval, best_move
+    
+    # No valid moves
+    if best_move is None:
+        if repetitions:  # Every move repeats a position, which loses like having no moves
+            return (float('-inf') if current_turn == "Silver" else float('inf')), None
+        return evaluate(board, maps=maps), None
+    
+    if best_eval <= alpha_orig:
+        bound = TT_UPPER
+    elif best_eval >= beta_orig:
+        bound = TT_LOWER
+    else:
+        bound = TT_EXACT
+    store_tt(key, depth, best_move, best_eval, bound)
+    return best_eval, best_move
+
+def record_cutoff(depth, move):
+    """Remember a quiet move that caused a cutoff so it's tried early next time.
+
+    It becomes a killer at the same depth and its history score goes up by
+    depth squared, so cutoffs near the root count for more.
+    """
+    if move_kind(move) != MOVE_STEP:
+        return
+    killers = killer_moves.setdefault(depth, [])
+    if move not in killers:
+        killers.insert(0, move)
+        del killers[2:]
+    history_table[move] = history_table.get(move, 0) + depth * depth
+
+def store_tt(key, depth, move, score, bound):
+    """Store a search result, keeping a deeper entry from the current search."""
+    entry = transposition_table.get(key)
+    if entry is None:
+        if len(transposition_table) >= MAX_TT_SIZE:
+            return
+    elif entry[4] == search_generation and entry[0] > depth:
+        return
+    transposition_table[key] = (depth, move, score, bound, search_generation)
+
+def age_search_tables():
+    """Start a new search generation instead of clearing the search tables.
+
+    History scores are halved, and once the transposition table is full the
+    oldest generations are dropped until a quarter of it is free again.
+    Killers are kept by remaining depth rather than position, so only the
+    newest one at each depth survives, and this search's first cutoff there
+    puts it second.
+    """
+    global search_generation
+    search_generation += 1
+    for killers in killer_moves.values():
+        del killers[1:]
+    
+    for move in list(history_table):
+        history_table[move] //= 2
+        if history_table[move] == 0:
+            del history_table[move]
+    
+    if len(transposition_table) >= MAX_TT_SIZE:
+        sizes = {}
+        for entry in transposition_table.values():
+            sizes[entry[4]] = sizes.get(entry[4], 0) + 1
+        size = len(transposition_table)
+        oldest_kept = search_generation
+        for generation in sorted(sizes):
+            if size <= MAX_TT_SIZE * 3 // 4:
+                oldest_kept = generation
+                break
+            size -= sizes[generation]
+        for key in [key for key, entry in transposition_table.items() if entry[4] < oldest_kept]:
+            del transposition_table[key]
+    
+    # Put the last principal variation back if its entries were dropped; depth -1
+    # means the move is only used for ordering
+    for key, move in previous_pv:
+        if key not in transposition_table:
+            transposition_table[key] = (-1, move, 0, TT_EXACT, search_generation)
+
+def principal_variation(board, current_turn, max_length):
+    """Follow the best moves stored in the transposition table from board."""
+    pv = []
+    for _ in range(max_length):
+        key = (position_hash(board), current_turn)
+        entry = transposition_table.get(key)
+        if entry is None or not is_legal_move(board, current_turn, entry[1]):
+            break
+        pv.append((key, entry[1]))
+        board = make_move(board, entry[1])
+        current_turn = "Silver" if current_turn == "Gold" else "Gold"
+    return pv
+
+def root_search(board, current_turn, depth, workers=1, seed=None):
+    """Search board to depth and return (score, best move).
+
+    With more than one worker the root moves are split across the search
+    pool. A seed fixes the evaluation noise, which makes the parallel result
+    independent of how the work is scheduled.
+    """
+    global search_seed
+    search_seed = seed
+    age_search_tables()
+    if workers <= 1:
+        return minimax(board, depth, float('-inf'), float('inf'), current_turn == "Silver", current_turn)
+    return parallel_root_search(board, current_turn, depth, workers, seed)
+
+def parallel_root_search(board, current_turn, depth, workers, seed):
+    """Split the root moves across the search pool (young brothers wait).
+
+    The first move is searched on its own to get a good bound, then the rest
+    run in parallel. Every worker starts its move from the best score found so
+    far, less ROOT_EPSILON, so moves that tie the best come back with exact
+    scores; ties go to the lowest move code.
+    """
+    # A goal at the root settles the search before any work is handed out, as in minimax
+    if goal_distance(board, current_turn) <= GOAL_SEARCH_DISTANCE:
+        goal_line = find_goal(board, current_turn)
+        if goal_line:
+            return (float('inf') if current_turn == "Silver" else float('-inf')), goal_line[0]
+    
+    pool = get_search_pool(workers)
+    shared_bound.value = float('-inf')
+    
+    key = (position_hash(board), current_turn)
+    entry = transposition_table.get(key)
+    root_moves = list(staged_moves(board, current_turn, tt_move=entry[1] if entry is not None else None,
+                                   killers=killer_moves.get(depth, ()), history=history_table))
+    if not root_moves:
+        return minimax(board, depth, float('-inf'), float('inf'), current_turn == "Silver", current_turn)
+    
+    history_counts = dict(game_history.counts)
+    eldest = pool.submit(_search_root_move, board, current_turn, root_moves[0], depth, seed, history_counts)
+    scores = [eldest.result()]
+    younger = [pool.submit(_search_root_move, board, current_turn, move, depth, seed, history_counts)
+               for move in root_moves[1:]]
+    scores.extend(future.result() for future in younger)
+    
+    sign = 1 if current_turn == "Silver" else -1
+    searched = [(score, move) for score, move in zip(scores, root_moves) if score is not None]
+    if not searched:  # Every move repeats a position
+        return -sign * float('inf'), None
+    score, best_move = max(searched, key=lambda item: (sign * item[0], -item[1]))
+    store_tt(key, depth, best_move, score, TT_EXACT)
+    return score, best_move
+
+def get_search_pool(workers):
+    """Return the pool of search workers, starting it if needed."""
+    global search_pool, search_pool_workers, shared_bound
+    if search_pool is None or search_pool_workers != workers:
+        shutdown_search_pool()
+        shared_bound = multiprocessing.Value('d', float('-inf'))
+        search_pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_search_worker,
+                                          initargs=(shared_bound, value_net_path))
+        search_pool_workers = workers
+    return search_pool
+
+def shutdown_search_pool():
+    """Stop the search workers, if any are running."""
+    global search_pool, search_pool_workers
+    if search_pool is not None:
+        search_pool.shutdown()
+        search_pool = None
+        search_pool_workers = 0
+
+def _init_search_worker(bound, net_path):
+    # Runs once in every worker: keep the shared bound, load the value network
+    # if the parent uses one, and warm up the engine
+    global shared_bound
+    shared_bound = bound
+    if net_path is not None:
+        load_value_net(net_path)
+    evaluate(board, maps=compute_piece_maps(board))
+
+def _search_root_move(root_board, current_turn, move, depth, seed, history_counts):
+    # Runs in a worker: search one root move with fresh tables and return its
+    # score, or None if the move repeats a position for the third time
+    global search_seed
+    search_seed = seed
+    transposition_table.clear()
+    killer_moves.clear()
+    history_table.clear()
+    game_history.clear()
+    game_history.counts.update(history_counts)
+    
+    opponent = "Silver" if current_turn == "Gold" else "Gold"
+    new_board = make_move(root_board, move)
+    child_key = (position_hash(new_board), opponent)
+    if game_history.is_forbidden(child_key):
+        return None
+    
+    sign = 1 if current_turn == "Silver" else -1
+    window = shared_bound.value - ROOT_EPSILON
+    if current_turn == "Silver":
+        alpha, beta = window, float('inf')
+    else:
+        alpha, beta = float('-inf'), -window
+    
+    game_history.push(child_key)
+    score, _ = minimax(new_board, depth - 1, alpha, beta, opponent == "Silver", opponent)
+    game_history.pop()
+    
+    with shared_bound.get_lock():
+        if sign * score > shared_bound.value:
+            shared_bound.value = sign * score
+    return score
+
+def get_best_move(board, current_turn, workers=1, seed=None):
+    """Find the best move using minimax with alpha-beta pruning.
 
-def get_best_move(board, current_turn):
-    """Find the best move using minimax with alpha-beta pruning."""
+    workers > 1 splits the root moves across processes; see root_search.
+    """
+    global previous_pv
+    
     # Get all available moves
     moves = generate_moves(board, current_turn)
     
@@ -781,14 +1735,22 @@ def get_best_move(board, current_turn):
         return None if len(moves) == 0 else moves[0]
     
     # Filter out pass move unless it's the only option
-    non_pass_moves = [m for m in moves if m[0] != "pass"]
+    non_pass_moves = [m for m in moves if m != PASS_MOVE]
     if len(non_pass_moves) == 0:
         return moves[0]  # Only pass move available
     
-    # If loop is detected, choose a random move
-    if is_loop_detected([board_to_string(board)]):
-        print("Loop detected in minimax - choosing random move")
-        return random.choice(non_pass_moves)
+    # Drop moves that would end the turn on a position for the third time
+    non_pass_moves = [m for m in non_pass_moves if not repeats_position(board, current_turn, m, move_count)]
+    if len(non_pass_moves) == 0:
+        return None
+    
+    # Take a goal straight away if one can be reached with the steps left this turn
+    steps_left = 4 - move_count
+    if goal_distance(board, current_turn) <= steps_left:
+        goal_line = find_goal(board, current_turn, steps_left)
+        if goal_line:
+            print(f"Goal found in {len(goal_line)} moves: {line_notation(board, goal_line)}")
+            return goal_line[0]
     
     # Adjust search depth based on game complexity
     piece_count = sum(1 for row in board for piece in row if piece != " ")
@@ -799,70 +1761,193 @@ def get_best_move(board, current_turn):
         depth = 3
     
     start_time = time.time()
-    score, best_move = minimax(board, depth, float('-inf'), float('inf'), current_turn == "Silver", current_turn)
+    score, best_move = root_search(board, current_turn, depth, workers, seed)
     end_time = time.time()
     
-    print(f"Minimax search (depth {depth}) took {end_time - start_time:.2f} seconds, score: {score}")
+    previous_pv = principal_variation(board, current_turn, depth)
+    pv_line = line_notation(board, [move for _, move in previous_pv])
+    print(f"Minimax search (depth {depth}) took {end_time - start_time:.2f} seconds, score: {score}, pv: {pv_line}")
     
-    # If minimax fails to find a move or returns pass, pick a random non-pass move
-    if best_move is None or best_move[0] == "pass":
+    # If minimax fails to find a playable move or returns pass, pick a random non-pass move
+    if best_move not in non_pass_moves:
         if len(non_pass_moves) > 0:
             print("Minimax defaulting to random non-pass move")
             best_move = random.choice(non_pass_moves)
     
     return best_move
 
-def find_best_move_heuristic(board):
-    """Find the best move using a simple heuristic evaluation."""
+def plan_turn(board, current_turn, steps_taken=0, depth=None):
+    """Choose the rest of a turn (up to 4 steps) in a single search.
+
+    A beam search over our own steps collects every distinct position the turn
+    can end on, reached by the first line that gets there. These are ranked
+    with the heuristic, and the best few are searched again with minimax to see
+    how the opponent can answer. Returns the list of moves, which is empty if
+    there is nothing to play. The chosen turn's score is left in last_plan_score.
+    depth is the minimax depth for the opponent's answers (by default 1, or 2
+    with few pieces left).
+    """
+    global last_plan_score, search_nodes, search_depth
+    steps_left = 4 - steps_taken
+    sign = 1 if current_turn == "Silver" else -1
+    last_plan_score = None
+    
+    # Take a goal straight away if one can be reached this turn
+    if goal_distance(board, current_turn) <= steps_left:
+        goal_line = find_goal(board, current_turn, steps_left)
+        if goal_line:
+            print(f"Goal found in {len(goal_line)} moves: {line_notation(board, goal_line)}")
+            last_plan_score = sign * float('inf')
+            return goal_line
+    
+    start_time = time.time()
+    opponent = "Silver" if current_turn == "Gold" else "Gold"
+    
+    # layers[n] holds (score, line, board) for positions reached after n steps
+    seen = {position_hash(board)}
+    layers = [[] for _ in range(5)]
+    layers[steps_taken].append((0, [], board))
+    turn_ends = []
+    for steps in range(steps_taken, 4):
+        layers[steps].sort(key=lambda item: item[0], reverse=True)
+        for _, line, position in layers[steps][:TURN_BEAM_WIDTH]:
+            if search_stop is not None and search_stop.is_set():
+                raise SearchStopped
+            children = []
+            for move in staged_moves(position, current_turn, steps):
+                if move == PASS_MOVE:
+                    continue
+                new_board = make_move(position, move)
+                new_hash = position_hash(new_board)
+                if new_hash in seen:
+                    continue
+                seen.add(new_hash)
+                
+                # A turn that already wins (e.g. by capturing the last rabbit) needs no search
+                if terminal_result(new_board, opponent, check_immobilization=False).winner == current_turn:
+                    print(f"Winning turn found: {line_notation(board, line + [move])}")
+                    last_plan_score = sign * float('inf')
+                    return line + [move]
+                children.append((move, new_board, new_hash))
+            
+            # Score all of this position's children together (one batch for the value network)
+            scores = evaluate_boards([new_board for _, new_board, _ in children])
+            search_nodes += len(children)
+            for (move, new_board, new_hash), score in zip(children, scores):
+                score = sign * score
+                layers[steps + move_steps(move)].append((score, line + [move], new_board))
+                if not game_history.is_forbidden((new_hash, opponent)):
+                    turn_ends.append((score, line + [move], new_board, new_hash))
+    
+    if not turn_ends:
+        return []
+    
+    # Look at the opponent's answers to the most promising turn ends
+    turn_ends.sort(key=lambda item: item[0], reverse=True)
+    piece_count = sum(1 for row in board for piece in row if piece != " ")
+    if depth is None:
+        depth = 2 if piece_count < 10 else 1
+    search_depth = depth
+    age_search_tables()
+    best_score, best_line = None, None
+    for _, line, final_board, final_hash in turn_ends[:TURN_REFINE_COUNT]:
+        game_history.push((final_hash, opponent))
+        score, _ = minimax(final_board, depth, float('-inf'), float('inf'), opponent == "Silver", opponent)
+        game_history.pop()
+        if best_line is None or sign * score > best_score:
+            best_score, best_line = sign * score, line
+    
+    last_plan_score = sign * best_score
+    end_time = time.time()
+    print(f"Planned {current_turn}'s turn from {len(seen) - 1} positions in {end_time - start_time:.2f} seconds, "
+          f"score: {sign * best_score}: {line_notation(board, best_line)}")
+    return best_line
+
+def deepen_turn(board, current_turn, max_depth, report=None, steps_taken=0):
+    """Plan the rest of the turn at refine depths 1, 2, ... max_depth until search_stop is set.
+
+    Returns (line, score, depth) from the deepest plan that finished, or
+    (None, None, 0) if none did. report(depth, line, score) is called after
+    every depth. Stops early once a plan wins or loses outright.
+    """
+    history_length = len(game_history.keys)
+    best = None, None, 0
+    try:
+        for depth in range(1, max_depth + 1):
+            line = plan_turn(board, current_turn, steps_taken, depth)
+            if not line:
+                break
+            best = line, last_plan_score, depth
+            if report is not None:
+                report(depth, line, last_plan_score)
+            if abs(last_plan_score) == float('inf'):
+                break
+    except SearchStopped:
+        pass
+    finally:
+        # A stopped search leaves its line's positions in the history
+        while len(game_history.keys) > history_length:
+            game_history.pop()
+    return best
+
+def find_best_move_heuristic(board, current_turn="Silver", steps_taken=None):
+    """Find the best move using a simple heuristic evaluation.
+
+    steps_taken defaults to the current game's move_count.
+    """
+    if steps_taken is None:
+        steps_taken = move_count
+    sign = 1 if current_turn == "Silver" else -1
+    
     # Get all available moves
-    moves = generate_moves(board, "Silver")
+    moves = generate_moves(board, current_turn, steps_taken)
     
     # If no valid moves, return None
     if len(moves) <= 1:  # Only pass or no moves
         return None if len(moves) == 0 else moves[0]
     
     # Filter out pass move unless it's the only option
-    non_pass_moves = [m for m in moves if m[0] != "pass"]
+    non_pass_moves = [m for m in moves if m != PASS_MOVE]
     if len(non_pass_moves) == 0:
         return moves[0]  # Only pass move available
     
-    # If loop is detected, choose a random move
-    if is_loop_detected([board_to_string(board)]):
-        print("Loop detected in heuristic - choosing random move")
-        return random.choice(non_pass_moves)
+    # Drop moves that would end the turn on a position for the third time
+    non_pass_moves = [m for m in non_pass_moves if not repeats_position(board, current_turn, m, steps_taken)]
+    if len(non_pass_moves) == 0:
+        return None
     
     # Group moves by score for random selection among equal scores
     move_scores = {}
     
-    # Evaluate each move
-    for move in non_pass_moves:
-        # Make the move
-        new_board = make_move(board, move)
-        
-        # Evaluate position with some noise for variety
-        score = heuristic(new_board, add_noise=True)
-        
-        # Store by score
+    # Evaluate every move's position in one go, with some noise for variety
+    new_boards = [make_move(board, move) for move in non_pass_moves]
+    scores = evaluate_boards(new_boards, add_noise=True)
+    
+    for move, score in zip(non_pass_moves, scores):
+        # Store by score, from the side to move's point of view
+        score = sign * score
         if score not in move_scores:
             move_scores[score] = []
         move_scores[score].append(move)
     
-    # Find the best score (highest for Silver)
+    # Find the best score
     best_score = max(move_scores.keys())
     
     # Choose randomly from the moves with the best score
     best_move = random.choice(move_scores[best_score])
-    print(f"Heuristic selected move with score {best_score}")
+    print(f"Heuristic selected move with score {sign * best_score}")
     
     return best_move
 
 def main():
     """Main game loop."""
-    global whose_turn, move_count, game_finished, board, move_history
+    global whose_turn, move_count, game_finished, board, planned_turn, adjudication_reason, ai_thread, search_stop
     
     # For debugging: print initial state
     print("\n=== Starting Arimaa AI vs AI game ===")
-    print("Gold = Minimax AI, Silver = Heuristic AI")
+    print(f"Gold = {'MCTS' if GOLD_ENGINE == 'mcts' else 'Minimax'} AI, Silver = Heuristic AI")
+    game_history.push((position_hash(board), whose_turn))
+    init_display()
     
     running = True
     clock = pygame.time.Clock()
@@ -873,23 +1958,28 @@ def main():
     # Add a delay between turns for better visualization
     turn_delay = 1000  # 1 second delay between turns
     
-    # Flag to control when to process the next turn
-    next_turn_ready = True
+    # The AI plays on a worker thread; the next step starts once this time (in ticks) has come
+    search_stop = threading.Event()
+    next_turn_time = 0
+    turn_side = whose_turn
     
     while running:
         # Process events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type in board_renderer.EXPOSE_EVENTS:
+                renderer.invalidate()
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     running = False
                 # Spacebar to advance turns quickly
                 elif event.key == pygame.K_SPACE and not game_finished:
-                    next_turn_ready = True
+                    next_turn_time = 0
                 # R key to restart the game
                 elif event.key == pygame.K_r:
-                    # Reset game state
+                    # Stop the AI's search, then reset game state
+                    cancel_ai_turn()
                     board = [
                         ["SE", "SH", "ST", "SC", "SE", "SC", "SH", "SD"],
                         ["SR", "SR", "SR", "SR", "SR", "SR", "SR", "SR"],
@@ -904,71 +1994,69 @@ def main():
                     move_count = 0
                     game_finished = False
                     turn_counter = 1
-                    move_history = []
-                    next_turn_ready = True
+                    planned_turn = []
+                    adjudicator.reset()
+                    adjudication_reason = None
+                    game_history.clear()
+                    game_history.push((position_hash(board), whose_turn))
+                    next_turn_time = 0
                     print("\n=== Game restarted ===")
         
-        # Clear screen and draw board
-        screen.fill((0, 0, 0))
-        draw_board()
-        
-        # AI gameplay
-        if not game_finished and next_turn_ready:
-            next_turn_ready = False  # Mark turn as in progress
-            
-            # Track whose turn it was
-            current_turn = whose_turn
-            
-            # Let the AI play its turn
-            handle_ai_turn()
+        # AI gameplay: check whether the worker has finished its step
+        if ai_thread is not None and not ai_thread.is_alive():
+            ai_thread = None
             
             # If the turn changed, increment counter
-            if whose_turn != current_turn:
+            if whose_turn != turn_side:
                 turn_counter += 1
                 # Add delay between turns for better visualization
-                pygame.time.delay(turn_delay)
-            
-            # Mark next turn as ready
-            next_turn_ready = True
+                next_turn_time = pygame.time.get_ticks() + turn_delay
             
             # If we've been playing for a long time with no winner (200+ turns), declare a draw
             if turn_counter > 200:
                 print("Game ended in a draw after 200 turns")
                 game_finished = True
         
+        # Start the next step once the delay is over
+        if not game_finished and ai_thread is None and pygame.time.get_ticks() >= next_turn_time:
+            turn_side = whose_turn
+            start_ai_turn()
+        
         # Game over display
+        message = None
         if game_finished:
-            # Draw a centered game over message
-            font = pygame.font.SysFont('Arial', 36)
             if turn_counter > 200:
                 message = "Game ended in a draw!"
+            elif adjudication_reason is not None:
+                message = f"{whose_turn} wins ({adjudication_reason})"
             else:
                 message = f"{whose_turn} wins!"
-            
-            text = font.render(message, True, (255, 255, 0))
-            text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 20))
-            
-            # Draw a background for the text
-            pygame.draw.rect(screen, (0, 0, 0), text_rect.inflate(20, 10))
-            screen.blit(text, text_rect)
         
-        # Update display
-        pygame.display.flip()
+        # Update the parts of the window that changed
+        draw_board(message)
         
         # Cap the frame rate
         clock.tick(30)
     
     # Clean up
+    cancel_ai_turn()
     pygame.quit()
+    shutdown_search_pool()
     print("\n=== Game ended ===")
     if game_finished:
         if turn_counter > 200:
             print("Game ended in a draw")
         else:
-            print(f"Winner: {whose_turn}")
+            print(f"Winner: {whose_turn}" + (f" (adjudicated: {adjudication_reason})" if adjudication_reason else ""))
     else:
         print("Game closed without finishing")
 
 # Start the game
 if __name__ == "__main__":
+    if "--mcts" in sys.argv[1:]:
+        GOLD_ENGINE = "mcts"
+    if "--net" in sys.argv[1:-1]:
+        load_value_net(sys.argv[sys.argv.index("--net") + 1])
+    if "--no-adjudicate" in sys.argv[1:]:
+        ADJUDICATE = False
     main()
\ No newline at end of file
@@ -1,9 +1,17 @@
 import pygame
 import os
+import sys
 import random
 import math
 from copy import deepcopy
 import time
+import multiprocessing
+import threading
+from array import array
+from enum import Enum
+
+import board_renderer
+import mcts
 
 # Set up the game window
 WINDOW_WIDTH = 600
@@ -16,6 +24,7 @@ LIGHT_COLOR = (240, 217, 181)  # Beige
 DARK_COLOR = (181, 136, 99)    # Brown
 TRAP_COLOR = (255, 180, 60)    # Amber
 HIGHLIGHT_COLOR = (200, 200, 100)  # Yellow
+HINT_COLOR = (40, 140, 230)    # Blue
 
 # Trap squares where pieces can be captured
 TRAPS = [(2, 2), (2, 5), (5, 2), (5, 5)]
@@ -54,6 +63,140 @@ piece_strength = {
     " ": -1  # Empty space
 }
 
+# Moves are packed into one int:
+#   bits 0-5 = from-square (row * 8 + col), bits 6-7 = direction (to the destination,
+#   or to the enemy piece for push/pull), bits 8-9 = kind, bits 10-11 = second direction
+#   (where the pushed piece goes / where the puller goes)
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+DIRECTION_NAMES = "nswe"
+MOVE_STEP, MOVE_PUSH, MOVE_PULL, MOVE_PASS = 0, 1, 2, 3
+PASS_MOVE = MOVE_PASS << 8
+
+# Letters used in Arimaa notation (upper case Gold, lower case Silver)
+NOTATION_LETTERS = {"E": "E", "C": "M", "H": "H", "D": "D", "CT": "C", "R": "R"}
+
+def encode_move(row, col, direction, kind=MOVE_STEP, second_direction=0):
+    return (row << 3 | col) | direction << 6 | kind << 8 | second_direction << 10
+
+def _unpack_move(move):
+    kind = move >> 8 & 3
+    row, col = move >> 3 & 7, move & 7
+    dr, dc = DIRECTIONS[move >> 6 & 3]
+    dir_row, dir_col = DIRECTIONS[move >> 10 & 3] if kind in (MOVE_PUSH, MOVE_PULL) else (0, 0)
+    return kind, row, col, row + dr, col + dc, dir_row, dir_col
+
+# Decode every possible move once so decode_move is just a list lookup
+MOVE_TABLE = [_unpack_move(move) for move in range(1 << 12)]
+
+def decode_move(move):
+    # -> (kind, row, col, target_row, target_col, dir_row, dir_col)
+    return MOVE_TABLE[move]
+
+def move_kind(move):
+    return move >> 8 & 3
+
+def move_steps(move):
+    kind = move >> 8 & 3
+    return 0 if kind == MOVE_PASS else 1 if kind == MOVE_STEP else 2
+
+def piece_letter(piece):
+    letter = NOTATION_LETTERS[piece[1:]]
+    return letter if piece[0] == 'G' else letter.lower()
+
+def move_notation(board, move):
+    # Arimaa step notation for printing, e.g. "Ed2n" or "rd3e Ed2n rc3x"
+    if move == PASS_MOVE:
+        return "pass"
+    kind, row, col, target_row, target_col, dir_row, dir_col = decode_move(move)
+    
+    def step(r, c, dr, dc):
+        square = "abcdefgh"[c] + str(BOARD_SIZE - r)
+        return piece_letter(board[r][c]) + square + DIRECTION_NAMES[DIRECTIONS.index((dr, dc))]
+    
+    if kind == MOVE_STEP:
+        steps = [step(row, col, target_row - row, target_col - col)]
+    elif kind == MOVE_PUSH:
+        steps = [step(target_row, target_col, dir_row, dir_col),
+                 step(row, col, target_row - row, target_col - col)]
+    else:
+        steps = [step(row, col, dir_row, dir_col),
+                 step(target_row, target_col, row - target_row, col - target_col)]
+    
+    # Add captures
+    new_board = [r[:] for r in board]
+    apply_move(new_board, move)
+    before_traps = [new_board[trap_row][trap_col] for trap_row, trap_col in TRAPS]
+    check_traps(new_board)
+    for (trap_row, trap_col), piece in zip(TRAPS, before_traps):
+        if piece != " " and new_board[trap_row][trap_col] == " ":
+            steps.append(piece_letter(piece) + "abcdefgh"[trap_col] + str(BOARD_SIZE - trap_row) + "x")
+    return " ".join(steps)
+
+# Zobrist keys for hashing board positions
+_zobrist_random = random.Random(20250331)
+ZOBRIST_KEYS = {
+    piece: [[_zobrist_random.getrandbits(64) for _ in range(BOARD_SIZE)] for _ in range(BOARD_SIZE)]
+    for piece in piece_strength if piece != " "
+}
+
+# Search tables, kept for the whole game and aged between searches
+MAX_TT_SIZE = 200000  # Drop the oldest generations of entries when the table gets bigger than this
+TT_EXACT, TT_LOWER, TT_UPPER = 0, 1, 2  # How a stored score bounds the true score
+transposition_table = {}  # (position hash, side to move) -> (depth, best move, score, bound, generation)
+killer_moves = {}  # depth -> up to two quiet moves that caused a cutoff, newest first
+history_table = {}  # move -> cutoff score, halved before every search
+search_generation = 0  # bumped by every get_best_move call
+previous_pv = []  # (key, move) pairs along the last search's principal variation
+
+# Engine for the AI: "minimax" plans each turn with plan_turn, "mcts" asks mcts.py for every step
+AI_ENGINE = "minimax"
+
+# Position evaluation: "heuristic", or "net" for a value network from valuenet.py (--net weights.npz)
+EVALUATOR = "heuristic"
+value_net = None
+
+# Turn planning
+TURN_BEAM_WIDTH = 12  # positions kept after each step while planning a turn
+TURN_REFINE_COUNT = 6  # best turn ends that get searched again with minimax
+
+# Pondering: while the human thinks, a background process plans the AI's reply
+# to the human's most likely turns and keeps what its searches find
+PONDER = True  # --no-ponder turns it off
+PONDER_TURN_ENDS = 8  # likely human turn ends answered in advance
+ponder_process = None
+ponder_connection = None  # our end of the pipe to the ponder process
+ponder_signal = None  # multiprocessing.Event the ponder process stops on
+reply_cache = {}  # position hash (Silver to move) -> Silver's planned turn, from the ponder process
+
+# Hints: the ponder process also plans the rest of the human's turn, first from the
+# heuristic alone and then at deeper refine depths, so 'H' has an answer straight away
+# that gets better the longer the human thinks. Its searches end up in the
+# transposition table handed to the AI, and the hinted turn is answered first
+HINT_MAX_DEPTH = 4  # deepest refine depth the hint is searched to
+hints = {}  # position hash (Gold to move) -> (rest of Gold's turn, depth it was searched to)
+show_hint = False  # 'H' toggles it
+
+# Stopping searches: when search_stop is set, minimax and the turn planner raise
+# SearchStopped. In the game it cancels the AI's thread; in the ponder process it's
+# ponder_signal
+search_stop = None
+
+class SearchStopped(Exception):
+    pass
+
+# Live progress of the AI's search, for the thinking indicator
+search_nodes = 0  # positions visited this turn
+search_depth = 0  # depth plan_turn searches the opponent's answers to
+ai_thread = None  # worker thread playing the AI's turn, so the window keeps responding
+
+def line_notation(board, line):
+    # A line of moves (e.g. a principal variation) in notation, for logging
+    steps = []
+    for move in line:
+        steps.append(move_notation(board, move))
+        board = make_move(board, move)
+    return " ".join(steps)
+
 def load_images():
     images = {}
     for piece, filename in PIECE_IMAGES.items():
@@ -62,11 +205,15 @@ def load_images():
         images[piece] = pygame.transform.scale(images[piece], (CELL_SIZE - 10, CELL_SIZE - 10))
     return images
 
-# Start the game
-pygame.init()
-piece_images = load_images()
-screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-pygame.display.set_caption("Arimaa: Human vs Minimax AI")
+# Start the game. The ponder process doesn't need a window (where processes are
+# spawned rather than forked, it imports this file again under another name)
+if __name__ == "__main__":
+    pygame.init()
+    piece_images = load_images()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption("Arimaa: Human vs Minimax AI")
+    renderer = board_renderer.BoardRenderer(screen, piece_images, TRAPS, BOARD_SIZE, CELL_SIZE,
+                                            LIGHT_COLOR, DARK_COLOR, TRAP_COLOR, HIGHLIGHT_COLOR)
 
 # Game variables
 selected = None  # What's clicked: None, (row, col), or ((r1, c1), (r2, c2))
@@ -75,47 +222,59 @@ move_count = 0  # How many moves made this turn
 game_finished = False  # Is the game over?
 
 def draw_board():
-    # Loop through each square
+    # Draw the board, the AI's progress or the hint, and the win message. The renderer
+    # only redraws the squares and texts that changed since the last frame
+    
+    # Highlight selected squares if game isn't over: one piece, or two for push/pull
+    highlighted = ()
+    if selected and not game_finished:
+        highlighted = (selected,) if type(selected[0]) == int else selected
+    
+    overlays = []
+    if ai_thread is not None:
+        overlays.append(thinking_overlay())
+    elif show_hint and whose_turn == "Gold" and not game_finished:
+        overlays += hint_overlays()
+    # Show win message if game is over
+    if game_finished:
+        overlays.append(renderer.text(f"{whose_turn} Wins!", 48, (255, 255, 255), background=(0, 0, 0),
+                                      padding=(20, 20), center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)))
+    renderer.draw(board, highlighted, overlays)
+
+def compute_piece_maps(board):
+    # Work out frozen pieces and friendly support for the whole board in one pass
+    # support['G'][row][col] / support['S'][row][col] = Gold / Silver pieces next to the square
+    support = {'G': [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)],
+               'S': [[0] * BOARD_SIZE for _ in range(BOARD_SIZE)]}
+    strongest = {'G': [[-1] * BOARD_SIZE for _ in range(BOARD_SIZE)],
+                 'S': [[-1] * BOARD_SIZE for _ in range(BOARD_SIZE)]}
+    
     for row in range(BOARD_SIZE):
         for col in range(BOARD_SIZE):
-            # Set color: light or dark checkerboard pattern
-            if (row + col) % 2 == 0:
-                color = LIGHT_COLOR
-            else:
-                color = DARK_COLOR
-            
-            # Traps get a special color
-            if (row, col) in TRAPS:
-                color = TRAP_COLOR
-
-            # Highlight selected squares if game isn't over
-            if selected and not game_finished:
-                # Single piece selected
-                if type(selected) == tuple and len(selected) == 2 and type(selected[0]) == int:
-                    if (row, col) == selected:
-                        color = HIGHLIGHT_COLOR
-                # Two pieces selected for push/pull
-                elif type(selected) == tuple and len(selected) == 2 and type(selected[0]) == tuple:
-                    if (row, col) == selected[0] or (row, col) == selected[1]:
-                        color = HIGHLIGHT_COLOR
-            
-            # Draw the square
-            pygame.draw.rect(screen, color, (col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-            
-            # Draw the piece
             piece = board[row][col]
-            if piece in piece_images:
-                img_rect = piece_images[piece].get_rect(center=(col * CELL_SIZE + CELL_SIZE / 2, row * CELL_SIZE + CELL_SIZE / 2))
-                screen.blit(piece_images[piece], img_rect)
+            if piece == " ":
+                continue
+            strength = piece_strength[piece]
+            for dir_row, dir_col in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                new_row = row + dir_row
+                new_col = col + dir_col
+                if 0 <= new_row < BOARD_SIZE and 0 <= new_col < BOARD_SIZE:
+                    support[piece[0]][new_row][new_col] += 1
+                    if strength > strongest[piece[0]][new_row][new_col]:
+                        strongest[piece[0]][new_row][new_col] = strength
     
-    # Show win message if game is over
-    if game_finished:
-        font = pygame.font.Font(None, 48)
-        win_message = f"{whose_turn} Wins!"
-        text = font.render(win_message, True, (255, 255, 255))
-        text_pos = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
-        pygame.draw.rect(screen, (0, 0, 0), text_pos.inflate(20, 20))  # Black background
-        screen.blit(text, text_pos)
+    # Frozen = stronger enemy next to it and no friends
+    frozen = [[False] * BOARD_SIZE for _ in range(BOARD_SIZE)]
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            piece = board[row][col]
+            if piece == " ":
+                continue
+            enemy = 'S' if piece[0] == 'G' else 'G'
+            if strongest[enemy][row][col] > piece_strength[piece] and support[piece[0]][row][col] == 0:
+                frozen[row][col] = True
+    
+    return frozen, support
 
 def is_frozen(row, col, board):
     piece = board[row][col]
@@ -144,11 +303,14 @@ def is_frozen(row, col, board):
     # Frozen only if there's a stronger enemy and no friends
     return frozen and not has_friend
 
-def can_move(start_row, start_col, end_row, end_col, board = board):
+def can_move(start_row, start_col, end_row, end_col, board = board, frozen = None):
     # Must be on the board and to an empty space
     if not (0 <= end_row < BOARD_SIZE and 0 <= end_col < BOARD_SIZE):
         return False
-    if board[end_row][end_col] != " " or is_frozen(start_row, start_col, board):
+    if board[end_row][end_col] != " ":
+        return False
+    # Use the frozen map if the caller already built one for this board
+    if frozen[start_row][start_col] if frozen is not None else is_frozen(start_row, start_col, board):
         return False
     
     piece = board[start_row][start_col]
@@ -253,43 +415,127 @@ def check_traps(board = board):
         if not has_friend:
             board[trap_row][trap_col] = " "
 
-def check_winner(board = board):
-    global game_finished, whose_turn
-    gr_count = 0
-    sr_count = 0
+# Result of a position as reported by terminal_result
+class GameResult(Enum):
+    ONGOING = "ongoing"
+    GOLD_GOAL = "Gold rabbit reached the goal row"
+    SILVER_GOAL = "Silver rabbit reached the goal row"
+    GOLD_ELIMINATION = "All Silver rabbits eliminated"
+    SILVER_ELIMINATION = "All Gold rabbits eliminated"
+    GOLD_IMMOBILIZATION = "Silver has no legal moves"
+    SILVER_IMMOBILIZATION = "Gold has no legal moves"
+    
+    @property
+    def winner(self):
+        if self is GameResult.ONGOING:
+            return None
+        return "Gold" if self.name.startswith("GOLD") else "Silver"
+
+def rabbit_counts(board):
+    # (gold_rabbits, silver_rabbits, gold_on_goal, silver_on_goal)
+    gold_rabbits = sum(row.count("GR") for row in board)
+    silver_rabbits = sum(row.count("SR") for row in board)
+    return gold_rabbits, silver_rabbits, board[0].count("GR"), board[BOARD_SIZE - 1].count("SR")
+
+def _rabbit_square_counts(board, squares):
+    # Rabbit and goal-row counts over a few squares, in the same order as rabbit_counts
+    gold_rabbits = silver_rabbits = gold_on_goal = silver_on_goal = 0
+    for row, col in squares:
+        piece = board[row][col]
+        if piece == "GR":
+            gold_rabbits += 1
+            gold_on_goal += row == 0
+        elif piece == "SR":
+            silver_rabbits += 1
+            silver_on_goal += row == BOARD_SIZE - 1
+    return gold_rabbits, silver_rabbits, gold_on_goal, silver_on_goal
+
+def update_rabbit_counts(counts, board, new_board, move):
+    # new_board = make_move(board, move); only the squares the move touches and
+    # the traps (where captures happen) can change
+    if move == PASS_MOVE:
+        return counts
+    kind, row, col, target_row, target_col, dir_row, dir_col = decode_move(move)
+    squares = {(row, col), (target_row, target_col)}
+    if kind == MOVE_PUSH:
+        squares.add((target_row + dir_row, target_col + dir_col))
+    elif kind == MOVE_PULL:
+        squares.add((row + dir_row, col + dir_col))
+    squares.update(TRAPS)
+    
+    before = _rabbit_square_counts(board, squares)
+    after = _rabbit_square_counts(new_board, squares)
+    return tuple(total - old + new for total, old, new in zip(counts, before, after))
+
+def has_legal_move(board, current_turn, frozen=None):
+    # Stops at the first step, push or pull it finds
+    player_prefix = current_turn[0]
+    backward = 1 if player_prefix == 'G' else -1
     for row in range(BOARD_SIZE):
         for col in range(BOARD_SIZE):
-            if board[row][col] == 'GR':
-                gr_count += 1
-            if board[row][col] == 'SR':
-                sr_count += 1
-    if gr_count == 0:
-        whose_turn = 'Silver'
-        print("Silver Wins")
-        game_finished = True
-        return True
+            piece = board[row][col]
+            if piece[0] != player_prefix:
+                continue
+            if frozen[row][col] if frozen is not None else is_frozen(row, col, board):
+                continue
+            for dr, dc in DIRECTIONS:
+                adj_row, adj_col = row + dr, col + dc
+                if not (0 <= adj_row < BOARD_SIZE and 0 <= adj_col < BOARD_SIZE):
+                    continue
+                target = board[adj_row][adj_col]
+                if target == " ":
+                    if piece[1] != 'R' or dr != backward:
+                        return True
+                elif target[0] != player_prefix and piece_strength[piece] > piece_strength[target]:
+                    # A pull needs an empty square next to us, which already counts
+                    # as a step above, so only pushes are left to check
+                    for pdr, pdc in DIRECTIONS:
+                        push_row, push_col = adj_row + pdr, adj_col + pdc
+                        if 0 <= push_row < BOARD_SIZE and 0 <= push_col < BOARD_SIZE and board[push_row][push_col] == " ":
+                            return True
+    return False
+
+def terminal_result(board, current_turn, counts=None, frozen=None, check_immobilization=True):
+    # No printing and no globals. current_turn is the side about to move, so the
+    # other side moved last and wins if both sides reach the goal or lose every rabbit
+    gold_rabbits, silver_rabbits, gold_on_goal, silver_on_goal = counts if counts is not None else rabbit_counts(board)
+    gold_moved_last = current_turn == "Silver"
     
-    elif sr_count == 0:
-        whose_turn = 'Gold'
-        print("Gold wins")
-        game_finished = True
-        return True
+    # Goal
+    if gold_on_goal and (gold_moved_last or not silver_on_goal):
+        return GameResult.GOLD_GOAL
+    if silver_on_goal:
+        return GameResult.SILVER_GOAL
+    
+    # Elimination
+    if silver_rabbits == 0 and (gold_moved_last or gold_rabbits > 0):
+        return GameResult.GOLD_ELIMINATION
+    if gold_rabbits == 0:
+        return GameResult.SILVER_ELIMINATION
+    
+    # Immobilization
+    if check_immobilization and not has_legal_move(board, current_turn, frozen):
+        return GameResult.SILVER_IMMOBILIZATION if current_turn == "Gold" else GameResult.GOLD_IMMOBILIZATION
+    
+    return GameResult.ONGOING
 
-    # Gold wins if a rabbit reaches row 0
-    for col in range(BOARD_SIZE):
-        if board[0][col] == "GR":
-            whose_turn = "Gold"
-            print("Gold Wins")
-            game_finished = True
-            return True
-    # Silver wins if a rabbit reaches row 7
-    for col in range(BOARD_SIZE):
-        if board[7][col] == "SR":
-            whose_turn = "Silver"
-            print("Silver Wins")
-            game_finished = True
-            return True
-    return False
+def check_winner(board = board, current_turn = None):
+    global game_finished, whose_turn
+    # Pass current_turn at the start of a turn to also check whether that side can move;
+    # without it this checks the middle of whose_turn's turn
+    if current_turn is None:
+        opponent = "Silver" if whose_turn == "Gold" else "Gold"
+        result = terminal_result(board, opponent, check_immobilization=False)
+    else:
+        result = terminal_result(board, current_turn)
+    
+    if result is GameResult.ONGOING:
+        return False
+    
+    print(f"{result.value} - {result.winner} wins!")
+    whose_turn = result.winner
+    game_finished = True
+    return True
 
 def handle_push_pull(start, end, click, board = board):
     sr, sc = start
@@ -306,8 +552,19 @@ def handle_push_pull(start, end, click, board = board):
         success = push(sr,sc,er,ec,dr,dc)
     return success
 
-def heuristic(board, add_noise=False):
+def position_hash(board):
+    h = 0
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            piece = board[row][col]
+            if piece != " ":
+                h ^= ZOBRIST_KEYS[piece][row][col]
+    return h
+
+def heuristic(board, add_noise=False, maps=None):
     h = 0
+    # maps = (frozen, support) from compute_piece_maps, built here if not passed in
+    frozen, support = maps if maps is not None else compute_piece_maps(board)
     
     # Piece value weights
     piece_values = {
@@ -361,17 +618,8 @@ def heuristic(board, add_noise=False):
     
     # Trap control
     for trap_row, trap_col in TRAPS:
-        silver_adjacent = 0
-        gold_adjacent = 0
-        
-        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            r, c = trap_row + dr, trap_col + dc
-            if 0 <= r < BOARD_SIZE and 0 <= c < BOARD_SIZE:
-                piece = board[r][c]
-                if piece.startswith('S'):
-                    silver_adjacent += 1
-                elif piece.startswith('G'):
-                    gold_adjacent += 1
+        silver_adjacent = support['S'][trap_row][trap_col]
+        gold_adjacent = support['G'][trap_row][trap_col]
         
         if silver_adjacent > gold_adjacent:
             h += 15 * (silver_adjacent - gold_adjacent)
@@ -391,7 +639,7 @@ def heuristic(board, add_noise=False):
     for row in range(BOARD_SIZE):
         for col in range(BOARD_SIZE):
             piece = board[row][col]
-            if piece == " ":
+            if piece == " " or frozen[row][col]:
                 continue
                 
             moves = 0
@@ -402,9 +650,7 @@ def heuristic(board, add_noise=False):
                         continue
                     if piece == "GR" and dr == -1:
                         continue
-                    
-                    if not is_frozen(row, col, board):
-                        moves += 1
+                    moves += 1
             
             if piece.startswith('S'):
                 silver_mobility += moves
@@ -458,135 +704,353 @@ def heuristic(board, add_noise=False):
     
     return h
 
-def generate_moves(board, current_turn, move_count=0):
-    moves = []
-    
-    if move_count < 4:
-        for row in range(BOARD_SIZE):
-            for col in range(BOARD_SIZE):
-                piece = board[row][col]
-                if piece != " " and piece[0] == current_turn[0]:
-                    # Regular moves
-                    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                        new_row = row + dr
-                        new_col = col + dc
-                        if can_move(row, col, new_row, new_col, board):
-                            moves.append((row, col, new_row, new_col, "move"))
-                    
-                    # Push/pull moves
-                    if move_count < 3:
-                        for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                            adj_row = row + dr
-                            adj_col = col + dc
-                            if can_push_or_pull(row, col, adj_row, adj_col, board):
-                                # Push directions
-                                for pdr, pdc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                                    push_row = adj_row + pdr
-                                    push_col = adj_col + pdc
-                                    if 0 <= push_row < BOARD_SIZE and 0 <= push_col < BOARD_SIZE:
-                                        if board[push_row][push_col] == " ":
-                                            moves.append((row, col, adj_row, adj_col, "push", pdr, pdc))
-                                
-                                # Pull directions
-                                for pdr, pdc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                                    pull_row = row + pdr
-                                    pull_col = col + pdc
-                                    if 0 <= pull_row < BOARD_SIZE and 0 <= pull_col < BOARD_SIZE:
-                                        if board[pull_row][pull_col] == " ":
-                                            moves.append((row, col, adj_row, adj_col, "pull", pdr, pdc))
-        
-        if move_count >= 1:
-            moves.append(("pass", None, None, None, None))
+def load_value_net(path):
+    # Evaluate with a value network saved as .npz instead of the heuristic
+    global EVALUATOR, value_net
+    import valuenet
+    value_net = valuenet.ValueNet.load(path)
+    EVALUATOR = "net"
+    mcts.engine.load_value_net(path)  # mcts evaluates through god_heuristic
+    print(f"Evaluating positions with the value network from {path}")
+
+def evaluate(board, add_noise=False, maps=None):
+    # Score a board (positive is good for Silver) with whichever evaluator is selected
+    if EVALUATOR != "net":
+        return heuristic(board, add_noise, maps)
+    score = value_net.evaluate(board)
+    if add_noise:
+        score += random.uniform(-20, 20)
+    return score
+
+def evaluate_boards(boards):
+    # Score several boards at once; the value network takes them as one batch
+    if EVALUATOR != "net":
+        return [heuristic(board) for board in boards]
+    return value_net.evaluate_boards(boards).tolist()
+
+def generate_moves(board, current_turn, move_count=0, maps=None):
+    return array('I', staged_moves(board, current_turn, move_count, maps))
+
+def is_legal_move(board, current_turn, move, move_count=0, frozen=None):
+    # Check a stored move (transposition table / killer) still works on this board
+    if move == PASS_MOVE:
+        return 1 <= move_count < 4
+    if move_count >= 4:
+        return False
     
-    return moves
+    kind, row, col, target_row, target_col, dir_row, dir_col = decode_move(move)
+    piece = board[row][col]
+    if piece == " " or piece[0] != current_turn[0]:
+        return False
+    if frozen is None:
+        frozen = compute_piece_maps(board)[0]
+    if kind == MOVE_STEP:
+        return can_move(row, col, target_row, target_col, board, frozen)
+    
+    # Push/pull takes two steps
+    if move_count >= 3 or frozen[row][col] or not can_push_or_pull(row, col, target_row, target_col, board):
+        return False
+    if kind == MOVE_PUSH:
+        dest_row, dest_col = target_row + dir_row, target_col + dir_col
+    else:
+        dest_row, dest_col = row + dir_row, col + dir_col
+    return 0 <= dest_row < BOARD_SIZE and 0 <= dest_col < BOARD_SIZE and board[dest_row][dest_col] == " "
 
-def make_move(board, move):
-    if move[0] == "pass":
-        return [row[:] for row in board]
+def dislodge_captures(board, support, enemy, from_row, from_col, to_row, to_col):
+    # Does moving an enemy piece from (from_row, from_col) to (to_row, to_col) capture something?
+    # The piece lands on a trap where it was its own only neighbour
+    if (to_row, to_col) in TRAPS and support[enemy][to_row][to_col] == 1:
+        return True
+    # The piece was the last friend of an enemy piece sitting on a trap
+    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+        trap = (from_row + dr, from_col + dc)
+        if trap in TRAPS and trap != (to_row, to_col) and board[trap[0]][trap[1]][0] == enemy \
+                and support[enemy][trap[0]][trap[1]] == 1:
+            return True
+    return False
+
+def staged_moves(board, current_turn, move_count=0, maps=None, tt_move=None, killers=(), history=None):
+    # Yield moves one stage at a time so nothing after a cutoff gets generated:
+    # TT move, captures, rabbits toward the goal, other steps (killers first), other push/pulls, pass.
+    # The last two stages are sorted by history score when a history table is given
+    if move_count >= 4:
+        return
     
-    new_board = [row[:] for row in board]
+    frozen, support = maps if maps is not None else compute_piece_maps(board)
+    team = current_turn[0]
+    enemy = 'S' if team == 'G' else 'G'
+    forward = -1 if team == 'G' else 1
+    yielded = set()
+    
+    # Stage 1: best move from the last search of this position
+    if tt_move is not None and is_legal_move(board, current_turn, tt_move, move_count, frozen):
+        yielded.add(tt_move)
+        yield tt_move
+    
+    pieces = [(row, col) for row in range(BOARD_SIZE) for col in range(BOARD_SIZE)
+              if board[row][col][0] == team and not frozen[row][col]]
+    
+    # Stage 2: captures (non-capturing push/pulls are saved for stage 5)
+    push_pulls = []
+    if move_count < 3:
+        for row, col in pieces:
+            for direction, (dr, dc) in enumerate(DIRECTIONS):
+                adj_row = row + dr
+                adj_col = col + dc
+                if not can_push_or_pull(row, col, adj_row, adj_col, board):
+                    continue
+                
+                # Push directions
+                for push_direction, (pdr, pdc) in enumerate(DIRECTIONS):
+                    push_row = adj_row + pdr
+                    push_col = adj_col + pdc
+                    if 0 <= push_row < BOARD_SIZE and 0 <= push_col < BOARD_SIZE and board[push_row][push_col] == " ":
+                        move = encode_move(row, col, direction, MOVE_PUSH, push_direction)
+                        if dislodge_captures(board, support, enemy, adj_row, adj_col, push_row, push_col):
+                            if move not in yielded:
+                                yielded.add(move)
+                                yield move
+                        else:
+                            push_pulls.append(move)
+                
+                # Pull directions
+                for pull_direction, (pdr, pdc) in enumerate(DIRECTIONS):
+                    pull_row = row + pdr
+                    pull_col = col + pdc
+                    if 0 <= pull_row < BOARD_SIZE and 0 <= pull_col < BOARD_SIZE and board[pull_row][pull_col] == " ":
+                        move = encode_move(row, col, direction, MOVE_PULL, pull_direction)
+                        if dislodge_captures(board, support, enemy, adj_row, adj_col, row, col):
+                            if move not in yielded:
+                                yielded.add(move)
+                                yield move
+                        else:
+                            push_pulls.append(move)
+    
+    # Stage 3: rabbits stepping toward the goal
+    forward_direction = 0 if team == 'G' else 1
+    for row, col in pieces:
+        if board[row][col][1] == 'R' and can_move(row, col, row + forward, col, board, frozen):
+            move = encode_move(row, col, forward_direction)
+            if move not in yielded:
+                yielded.add(move)
+                yield move
+    
+    # Stage 4: killer moves, then every other step
+    for move in killers:
+        if move not in yielded and move_kind(move) == MOVE_STEP and \
+                is_legal_move(board, current_turn, move, move_count, frozen):
+            yielded.add(move)
+            yield move
+    steps = []
+    for row, col in pieces:
+        for direction, (dr, dc) in enumerate(DIRECTIONS):
+            if can_move(row, col, row + dr, col + dc, board, frozen):
+                move = encode_move(row, col, direction)
+                if move not in yielded:
+                    steps.append(move)
+    if history:
+        steps.sort(key=lambda move: history.get(move, 0), reverse=True)
+    yield from steps
+    
+    # Stage 5: push/pulls that don't capture
+    if history:
+        push_pulls.sort(key=lambda move: history.get(move, 0), reverse=True)
+    for move in push_pulls:
+        if move not in yielded:
+            yield move
     
-    if move[4] == "move":
-        start_row, start_col, end_row, end_col, _ = move
-        new_board[end_row][end_col] = new_board[start_row][start_col]
-        new_board[start_row][start_col] = " "
+    if move_count >= 1:
+        yield PASS_MOVE
+
+def apply_move(board, move):
+    # Move the pieces in place (traps are checked separately)
+    kind, start_row, start_col, end_row, end_col, dir_row, dir_col = decode_move(move)
+    
+    if kind == MOVE_STEP:
+        board[end_row][end_col] = board[start_row][start_col]
+        board[start_row][start_col] = " "
     
-    elif move[4] == "push":
-        start_row, start_col, end_row, end_col, _, dir_row, dir_col = move
+    elif kind == MOVE_PUSH:
         push_row, push_col = end_row + dir_row, end_col + dir_col
         
-        new_board[push_row][push_col] = new_board[end_row][end_col]
-        new_board[end_row][end_col] = new_board[start_row][start_col]
-        new_board[start_row][start_col] = " "
+        board[push_row][push_col] = board[end_row][end_col]
+        board[end_row][end_col] = board[start_row][start_col]
+        board[start_row][start_col] = " "
     
-    elif move[4] == "pull":
-        start_row, start_col, end_row, end_col, _, dir_row, dir_col = move
+    elif kind == MOVE_PULL:
         pull_row, pull_col = start_row + dir_row, start_col + dir_col
         
-        new_board[pull_row][pull_col] = new_board[start_row][start_col]
-        new_board[start_row][start_col] = new_board[end_row][end_col]
-        new_board[end_row][end_col] = " "
+        board[pull_row][pull_col] = board[start_row][start_col]
+        board[start_row][start_col] = board[end_row][end_col]
+        board[end_row][end_col] = " "
+
+def make_move(board, move):
+    new_board = [row[:] for row in board]
+    if move == PASS_MOVE:
+        return new_board
     
+    apply_move(new_board, move)
     check_traps(new_board)
     return new_board
 
-def minimax(board, depth, alpha, beta, maximizing_player, current_turn):
-    if depth == 0 or check_winner(board):
-        # Negate the evaluation for Silver's perspective
-        eval_score = heuristic(board, add_noise=(depth == 0))
-        if current_turn == "Silver":
-            eval_score = -eval_score  # Invert the score for Silver
-        return eval_score, None
+def minimax(board, depth, alpha, beta, maximizing_player, current_turn, counts=None):
+    # Scores are from Silver's point of view: Silver maximizes, Gold minimizes.
+    # counts are the rabbit_counts for board, kept up to date move by move
+    global search_nodes
+    if search_stop is not None and search_stop.is_set():
+        raise SearchStopped
+    search_nodes += 1
+    if counts is None:
+        counts = rabbit_counts(board)
     
-    moves = generate_moves(board, current_turn)
+    # Frozen pieces and support counts are shared by move generation and evaluation
+    maps = compute_piece_maps(board)
     
-    if not moves:
-        eval_score = heuristic(board)
-        if current_turn == "Silver":
-            eval_score = -eval_score  # Invert the score for Silver
-        return eval_score, None
+    result = terminal_result(board, current_turn, counts, maps[0])
+    if result is not GameResult.ONGOING:
+        return (float('inf') if result.winner == "Silver" else float('-inf')), None
+    if depth == 0:
+        return evaluate(board, add_noise=True, maps=maps), None
     
-    random.shuffle(moves)
+    # A deep enough result from an earlier search (or an earlier step) settles this node
+    key = (position_hash(board), current_turn)
+    entry = transposition_table.get(key)
+    tt_move = None
+    if entry is not None:
+        tt_depth, tt_move, tt_score, tt_bound, _ = entry
+        if tt_depth >= depth and (tt_bound == TT_EXACT or
+                                  (tt_bound == TT_LOWER and tt_score >= beta) or
+                                  (tt_bound == TT_UPPER and tt_score <= alpha)):
+            return tt_score, tt_move
+    alpha_orig, beta_orig = alpha, beta
     
-    if maximizing_player == current_turn:
-        max_eval = float('-inf')
-        best_move = None
+    # Moves come out lazily, most promising first
+    moves = staged_moves(board, current_turn, maps=maps, tt_move=tt_move,
+                         killers=killer_moves.get(depth, ()), history=history_table)
+    
+    best_move = None
+    if maximizing_player:
+        best_eval = float('-inf')
         
         for move in moves:
             new_board = make_move(board, move)
-            eval_score, _ = minimax(new_board, depth - 1, alpha, beta, False, "Gold")
+            eval_score, _ = minimax(new_board, depth - 1, alpha, beta, False, "Gold",
+                                    update_rabbit_counts(counts, board, new_board, move))
             
-            if eval_score > max_eval:
-                max_eval = eval_score
+            if best_move is None or eval_score > best_eval:
+                best_eval = eval_score
                 best_move = move
             alpha = max(alpha, eval_score)
             if beta <= alpha:
+                record_cutoff(depth, move)
                 break
-        return max_eval, best_move
     
     else:
-        min_eval = float('inf')
-        best_move = None
+        best_eval = float('inf')
         
         for move in moves:
             new_board = make_move(board, move)
-            eval_score, _ = minimax(new_board, depth - 1, alpha, beta, True, "Silver")
+            eval_score, _ = minimax(new_board, depth - 1, alpha, beta, True, "Silver",
+                                    update_rabbit_counts(counts, board, new_board, move))
             
-            if eval_score < min_eval:
-                min_eval = eval_score
+            if best_move is None or eval_score < best_eval:
+                best_eval = eval_score
                 best_move = move
             beta = min(beta, eval_score)
             if beta <= alpha:
+                record_cutoff(depth, move)
                 break
-        return min_eval, best_move
+    
+    if best_move is None:  # No moves at all
+        return evaluate(board, maps=maps), None
+    
+    if best_eval <= alpha_orig:
+        bound = TT_UPPER
+    elif best_eval >= beta_orig:
+        bound = TT_LOWER
+    else:
+        bound = TT_EXACT
+    store_tt(key, depth, best_move, best_eval, bound)
+    return best_eval, best_move
+
+def record_cutoff(depth, move):
+    # Keep the last two quiet moves that caused a cutoff at this depth, and raise
+    # their history score by depth squared so cutoffs near the root count for more
+    if move_kind(move) != MOVE_STEP:
+        return
+    killers = killer_moves.setdefault(depth, [])
+    if move not in killers:
+        killers.insert(0, move)
+        del killers[2:]
+    history_table[move] = history_table.get(move, 0) + depth * depth
+
+def store_tt(key, depth, move, score, bound):
+    # Don't let a shallower result replace a deeper one from the current search
+    entry = transposition_table.get(key)
+    if entry is None:
+        if len(transposition_table) >= MAX_TT_SIZE:
+            return
+    elif entry[4] == search_generation and entry[0] > depth:
+        return
+    transposition_table[key] = (depth, move, score, bound, search_generation)
+
+def age_search_tables():
+    # Start a new search generation instead of clearing: halve the history scores,
+    # and once the table is full drop the oldest generations until a quarter is free.
+    # Killers are kept by remaining depth rather than position, so only the newest
+    # at each depth is kept, behind whatever this search finds there
+    global search_generation
+    search_generation += 1
+    for killers in killer_moves.values():
+        del killers[1:]
+    
+    for move in list(history_table):
+        history_table[move] //= 2
+        if history_table[move] == 0:
+            del history_table[move]
+    
+    if len(transposition_table) >= MAX_TT_SIZE:
+        sizes = {}
+        for entry in transposition_table.values():
+            sizes[entry[4]] = sizes.get(entry[4], 0) + 1
+        size = len(transposition_table)
+        oldest_kept = search_generation
+        for generation in sorted(sizes):
+            if size <= MAX_TT_SIZE * 3 // 4:
+                oldest_kept = generation
+                break
+            size -= sizes[generation]
+        for key in [key for key, entry in transposition_table.items() if entry[4] < oldest_kept]:
+            del transposition_table[key]
+    
+    # Put the last principal variation back if its entries were dropped;
+    # depth -1 means the move is only used for ordering
+    for key, move in previous_pv:
+        if key not in transposition_table:
+            transposition_table[key] = (-1, move, 0, TT_EXACT, search_generation)
+
+def principal_variation(board, current_turn, max_length):
+    # Follow the best moves stored in the transposition table from board
+    pv = []
+    for _ in range(max_length):
+        key = (position_hash(board), current_turn)
+        entry = transposition_table.get(key)
+        if entry is None or not is_legal_move(board, current_turn, entry[1]):
+            break
+        pv.append((key, entry[1]))
+        board = make_move(board, entry[1])
+        current_turn = "Silver" if current_turn == "Gold" else "Gold"
+    return pv
 
 def get_best_move(board, current_turn):
+    global previous_pv
+    
     moves = generate_moves(board, current_turn)
     
     if len(moves) <= 1:
         return None if len(moves) == 0 else moves[0]
     
-    non_pass_moves = [m for m in moves if m[0] != "pass"]
+    non_pass_moves = [m for m in moves if m != PASS_MOVE]
     if len(non_pass_moves) == 0:
         return moves[0]
     
@@ -596,79 +1060,322 @@ def get_best_move(board, current_turn):
     if piece_count < 10:
         depth = 3
     
+    age_search_tables()
     start_time = time.time()
     score, best_move = minimax(board, depth, float('-inf'), float('inf'), current_turn == "Silver", current_turn)
     end_time = time.time()
     
-    print(f"Minimax search (depth {depth}) took {end_time - start_time:.2f} seconds, score: {score}")
+    previous_pv = principal_variation(board, current_turn, depth)
+    pv_line = line_notation(board, [move for _, move in previous_pv])
+    print(f"Minimax search (depth {depth}) took {end_time - start_time:.2f} seconds, score: {score}, pv: {pv_line}")
     
-    if best_move is None or best_move[0] == "pass":
+    if best_move not in non_pass_moves:
         if len(non_pass_moves) > 0:
             print("Minimax defaulting to random non-pass move")
             best_move = random.choice(non_pass_moves)
     
     return best_move
 
+def collect_turn_ends(board, current_turn, steps_taken=0):
+    # Beam search over our own steps for every distinct position the turn can end on:
+    # returns [(score, line, board)] best first for current_turn, and how many positions
+    # were looked at. A turn that already wins comes back on its own with score inf
+    global search_nodes
+    sign = 1 if current_turn == "Silver" else -1
+    opponent = "Silver" if current_turn == "Gold" else "Gold"
+    
+    # layers[n] holds (score, line, board) for positions reached after n steps
+    seen = {position_hash(board)}
+    layers = [[] for _ in range(5)]
+    layers[steps_taken].append((0, [], board))
+    turn_ends = []
+    for steps in range(steps_taken, 4):
+        layers[steps].sort(key=lambda item: item[0], reverse=True)
+        for _, line, position in layers[steps][:TURN_BEAM_WIDTH]:
+            if search_stop is not None and search_stop.is_set():
+                raise SearchStopped
+            children = []
+            for move in staged_moves(position, current_turn, steps):
+                if move == PASS_MOVE:
+                    continue
+                new_board = make_move(position, move)
+                new_hash = position_hash(new_board)
+                if new_hash in seen:
+                    continue
+                seen.add(new_hash)
+                
+                # A turn that already wins (goal or last rabbit captured) needs no search
+                if terminal_result(new_board, opponent, check_immobilization=False).winner == current_turn:
+                    return [(float('inf'), line + [move], new_board)], len(seen) - 1
+                children.append((move, new_board))
+            
+            # score the children together so the value network gets one batch
+            scores = evaluate_boards([new_board for _, new_board in children])
+            search_nodes += len(children)
+            for (move, new_board), score in zip(children, scores):
+                score = sign * score
+                layers[steps + move_steps(move)].append((score, line + [move], new_board))
+                turn_ends.append((score, line + [move], new_board))
+    
+    turn_ends.sort(key=lambda item: item[0], reverse=True)
+    return turn_ends, len(seen) - 1
+
+def plan_turn(board, current_turn, steps_taken=0, depth=None):
+    # Choose the rest of the turn (up to 4 steps) in one search. The turn ends from
+    # collect_turn_ends are ranked by the heuristic, and the best few get a minimax
+    # search (depth plies, by default 1 or 2 by how many pieces are left) to see how
+    # the opponent answers
+    global search_depth
+    start_time = time.time()
+    sign = 1 if current_turn == "Silver" else -1
+    opponent = "Silver" if current_turn == "Gold" else "Gold"
+    turn_ends, positions = collect_turn_ends(board, current_turn, steps_taken)
+    if not turn_ends:
+        return []
+    if turn_ends[0][0] == float('inf'):
+        print(f"Winning turn found: {line_notation(board, turn_ends[0][1])}")
+        return turn_ends[0][1]
+    
+    # Look at the opponent's answers to the most promising turn ends
+    if depth is None:
+        piece_count = sum(1 for row in board for piece in row if piece != " ")
+        depth = 2 if piece_count < 10 else 1
+    search_depth = depth
+    age_search_tables()
+    best_score, best_line = None, None
+    for _, line, final_board in turn_ends[:TURN_REFINE_COUNT]:
+        score, _ = minimax(final_board, depth, float('-inf'), float('inf'), opponent == "Silver", opponent)
+        if best_line is None or sign * score > best_score:
+            best_score, best_line = sign * score, line
+    
+    end_time = time.time()
+    print(f"Planned {current_turn}'s turn from {positions} positions in {end_time - start_time:.2f} seconds, "
+          f"score: {sign * best_score}: {line_notation(board, best_line)}")
+    return best_line
+
+def ponder_worker(connection, stop, net):
+    # Runs in the ponder process. Each ("ponder", board, steps_taken) message starts
+    # planning Silver's reply to Gold's likely turn ends from that position, sending
+    # ("reply", hash, line) for each, and the hint for Gold, sending ("hint", hash,
+    # line, depth) each time it gets deeper; a newer message interrupts it. ("stop",)
+    # is answered with ("tt", entries): the transposition table entries found meanwhile
+    global search_stop, EVALUATOR, value_net
+    search_stop = stop
+    if net is not None:
+        EVALUATOR, value_net = "net", net
+    sys.stdout = open(os.devnull, "w")  # plan_turn logs every search
+    first_generation = search_generation + 1
+    answered = set()
+    while True:
+        message = connection.recv()
+        while connection.poll():
+            message = connection.recv()  # only the newest request matters
+        stop.clear()
+        if connection.poll():
+            continue  # sent before the clear, so its stop was lost
+        
+        if message[0] == "quit":
+            return
+        if message[0] == "stop":
+            entries = {key: entry for key, entry in transposition_table.items()
+                       if entry[4] >= first_generation and entry[0] >= 1}
+            connection.send(("tt", entries))
+            first_generation = search_generation + 1
+            answered.clear()
+            continue
+        
+        _, position, steps_taken = message
+        position_key = position_hash(position)
+        try:
+            # The heuristic's best turn end is the first hint, then one searched a ply
+            turn_ends, _ = collect_turn_ends(position, "Gold", steps_taken)
+            if not turn_ends:
+                continue
+            connection.send(("hint", position_key, turn_ends[0][1], 0))
+            hint = plan_turn(position, "Gold", steps_taken, depth=1)
+            connection.send(("hint", position_key, hint, 1))
+            
+            # Answer the hinted turn first, since the human may well play it
+            likely = [end_board for _, _, end_board in turn_ends[:PONDER_TURN_ENDS]]
+            if steps_taken >= 1:
+                likely.insert(0, position)  # the human may pass now
+            hint_board = position
+            for move in hint:
+                hint_board = make_move(hint_board, move)
+            likely.insert(0, hint_board)
+            for end_board in likely:
+                key = position_hash(end_board)
+                if key not in answered and terminal_result(end_board, "Silver") is GameResult.ONGOING:
+                    connection.send(("reply", key, plan_turn(end_board, "Silver")))
+                    answered.add(key)
+            
+            # Then keep deepening the hint until the human moves
+            for depth in range(2, HINT_MAX_DEPTH + 1):
+                connection.send(("hint", position_key, plan_turn(position, "Gold", steps_taken, depth), depth))
+        except SearchStopped:
+            pass
+
+def ponder(steps_taken=0):
+    # Have the ponder process work on the human's turn from the current position
+    global ponder_process, ponder_connection, ponder_signal
+    if not PONDER or AI_ENGINE == "mcts" or game_finished:
+        return
+    if ponder_process is None:
+        ponder_connection, child_connection = multiprocessing.Pipe()
+        ponder_signal = multiprocessing.Event()
+        ponder_process = multiprocessing.Process(target=ponder_worker, daemon=True,
+                                                 args=(child_connection, ponder_signal, value_net))
+        ponder_process.start()
+    # Send first, then stop the old search, so the ponder process can't miss either
+    ponder_connection.send(("ponder", [row[:] for row in board], steps_taken))
+    ponder_signal.set()
+
+def keep_ponder_message(message):
+    if message[0] == "reply":
+        reply_cache[message[1]] = message[2]
+    elif message[0] == "hint" and message[2]:
+        hints[message[1]] = (message[2], message[3])
+
+def collect_ponder_replies():
+    # Keep the replies and hints the ponder process has sent so far
+    while ponder_connection is not None and ponder_connection.poll():
+        keep_ponder_message(ponder_connection.recv())
+
+def stop_pondering():
+    # Stop the ponder process's search and merge its transposition table entries into
+    # ours. Entries keep the deeper search; merged ones count as this generation's
+    if ponder_process is None:
+        return
+    ponder_connection.send(("stop",))
+    ponder_signal.set()
+    while True:
+        message = ponder_connection.recv()
+        if message[0] == "tt":
+            break
+        keep_ponder_message(message)
+    for key, (depth, move, score, bound, _) in message[1].items():
+        entry = transposition_table.get(key)
+        if entry is None and len(transposition_table) < MAX_TT_SIZE or entry is not None and entry[0] < depth:
+            transposition_table[key] = (depth, move, score, bound, search_generation)
+    print(f"Pondering found {len(message[1])} search results and {len(reply_cache)} replies")
+
+def quit_pondering():
+    global ponder_process
+    if ponder_process is not None:
+        ponder_connection.send(("quit",))
+        ponder_signal.set()
+        ponder_process.join(timeout=2)
+        ponder_process = None
+
 def handle_ai_turn():
     global whose_turn, move_count, game_finished, board
     
-    remaining_moves = 4 - move_count
+    # Silver loses straight away if it has nothing to play
+    if check_winner(board, "Silver"):
+        return
     
-    for _ in range(remaining_moves):
-        if game_finished:
-            break
-            
-        ai_move = get_best_move(board, "Silver")
-        if ai_move is None:
-            print("AI couldn't find a valid move")
+    # Plan the whole turn in one search, then play it out. MCTS picks one step
+    # at a time instead, reusing its tree between steps. If the ponder process
+    # already answered this position, its plan is played straight away
+    planned_turn = None
+    if AI_ENGINE != "mcts":
+        start_time = time.time()
+        stop_pondering()
+        planned_turn = reply_cache.get(position_hash(board)) if move_count == 0 else None
+        if planned_turn is not None:
+            planned_turn = list(planned_turn)
+            print(f"Ponder hit: {line_notation(board, planned_turn)}")
+        else:
+            planned_turn = plan_turn(board, "Silver", move_count)
+        print(f"AI reply ready in {time.time() - start_time:.2f} seconds")
+        reply_cache.clear()
+        hints.clear()
+    
+    while not game_finished and move_count < 4:
+        if planned_turn is None:
+            ai_move = mcts.get_best_move(board, "Silver", move_count)
+        else:
+            ai_move = planned_turn.pop(0) if planned_turn else None
+        if ai_move is None or ai_move == PASS_MOVE:
+            if move_count == 0:
+                print("AI couldn't find a valid move")
             break
         
-        if ai_move[4] == "move":
-            start_row, start_col, end_row, end_col, _ = ai_move
-            piece = board[start_row][start_col]
-            print(f"AI moves {piece} from {start_row},{start_col} to {end_row},{end_col}")
-            
-            board[end_row][end_col] = piece
-            board[start_row][start_col] = ' '
-            move_count += 1
-            
-        elif ai_move[4] == "push":
-            start_row, start_col, end_row, end_col, _, dir_row, dir_col = ai_move
-            pusher = board[start_row][start_col]
-            pushed = board[end_row][end_col]
-            push_to_row, push_to_col = end_row + dir_row, end_col + dir_col
-            
-            print(f"AI pushes {pushed} at {end_row},{end_col} to {push_to_row},{push_to_col} with {pusher}")
-            
-            board[push_to_row][push_to_col] = pushed
-            board[end_row][end_col] = pusher
-            board[start_row][start_col] = ' '
-            move_count += 2
-            
-        elif ai_move[4] == "pull":
-            start_row, start_col, end_row, end_col, _, dir_row, dir_col = ai_move
-            puller = board[start_row][start_col]
-            pulled = board[end_row][end_col]
-            puller_to_row, puller_to_col = start_row + dir_row, start_col + dir_col
-            
-            print(f"AI pulls {pulled} from {end_row},{end_col} to {start_row},{start_col} while moving {puller} to {puller_to_row},{puller_to_col}")
-            
-            board[puller_to_row][puller_to_col] = puller
-            board[start_row][start_col] = pulled
-            board[end_row][end_col] = ' '
-            move_count += 2
+        print(f"AI plays {move_notation(board, ai_move)}")
+        apply_move(board, ai_move)
+        move_count += move_steps(ai_move)
         
         check_traps()
         
         if check_winner():
             break
-        
-        if move_count >= 4:
-            break
+    
+    if game_finished:
+        return
     
     print("AI turn complete")
     whose_turn = "Gold"
     move_count = 0
+    if not check_winner(board, "Gold"):
+        ponder()
+
+def ai_turn_worker():
+    try:
+        handle_ai_turn()
+    except SearchStopped:
+        print("AI search cancelled")
+
+def start_ai_turn():
+    # Play the AI's turn on a worker thread; main checks ai_thread to see when it's done
+    global ai_thread, search_nodes, search_depth
+    search_nodes = search_depth = 0
+    search_stop.clear()
+    ai_thread = threading.Thread(target=ai_turn_worker, daemon=True)
+    ai_thread.start()
+
+def cancel_ai_turn():
+    # Stop the AI's search (when the window is closed) and wait for its thread
+    global ai_thread
+    if ai_thread is not None:
+        search_stop.set()
+        ai_thread.join()
+        ai_thread = None
+
+def thinking_overlay():
+    # Shows that the AI is searching, and how far it has got
+    return renderer.text(f"AI thinking... depth {search_depth}, {search_nodes:,} nodes", 28, (255, 255, 255),
+                         background=(0, 0, 0), padding=(16, 8), center=(WINDOW_WIDTH // 2, 20))
+
+def hint_overlays():
+    # The rest of the turn the ponder process suggests for the human: an arrow for
+    # every piece each step moves, the next step's drawn thicker, and the line in notation
+    overlays = []
+    if not PONDER or AI_ENGINE == "mcts":
+        caption = "No hints without pondering"
+    elif position_hash(board) not in hints:
+        caption = "Hint: thinking..."
+    else:
+        line, depth = hints[position_hash(board)]
+        caption = f"Hint (depth {depth}): {line_notation(board, line)}"
+        lines = []
+        for index, move in enumerate(line):
+            kind, row, col, target_row, target_col, dir_row, dir_col = decode_move(move)
+            if kind == MOVE_PUSH:
+                arrows = [((target_row, target_col), (target_row + dir_row, target_col + dir_col)),
+                          ((row, col), (target_row, target_col))]
+            elif kind == MOVE_PULL:
+                arrows = [((row, col), (row + dir_row, col + dir_col)), ((target_row, target_col), (row, col))]
+            else:
+                arrows = [((row, col), (target_row, target_col))]
+            width = 8 if index == 0 else 3
+            for (from_row, from_col), (to_row, to_col) in arrows:
+                start = (from_col * CELL_SIZE + CELL_SIZE // 2, from_row * CELL_SIZE + CELL_SIZE // 2)
+                end = (to_col * CELL_SIZE + CELL_SIZE // 2, to_row * CELL_SIZE + CELL_SIZE // 2)
+                lines.append((start, end, width))
+        overlays.append(renderer.arrows(lines, HINT_COLOR))
+    overlays.append(renderer.text(caption, 28, (255, 255, 255), background=(0, 0, 0), padding=(16, 8),
+                                  center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 20)))
+    return overlays
 
 def handle_click(x, y, button, team):
     global selected, whose_turn, move_count, game_finished
@@ -700,7 +1407,9 @@ def handle_click(x, y, button, team):
                     if move_count >= 4:
                         whose_turn = "Silver"
                         move_count = 0
-                        handle_ai_turn()
+                        start_ai_turn()
+                    else:
+                        ponder(move_count)
                 else:
                     selected = None
             
@@ -721,7 +1430,9 @@ def handle_click(x, y, button, team):
                             if move_count >= 4:
                                 whose_turn = "Silver"
                                 move_count = 0
-                                handle_ai_turn()
+                                start_ai_turn()
+                            else:
+                                ponder(move_count)
                         else:
                             selected = None
                     else:
@@ -747,36 +1458,56 @@ def pass_turn():
         whose_turn = "Silver"
         move_count = 0
         selected = None
-        handle_ai_turn()
+        start_ai_turn()
 
 def main():
+    global search_stop, ai_thread, show_hint
+    search_stop = threading.Event()
+    ponder()  # the human moves first
+    clock = pygame.time.Clock()
     running = True
     while running:
-        # Clear the screen
-        screen.fill((0, 0, 0))
+        # The AI's thread is done once its turn is played
+        if ai_thread is not None and not ai_thread.is_alive():
+            ai_thread = None
+        
         draw_board()
-        pygame.display.flip()
         
         # Handle events (clicks, key presses)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
-            elif event.type == pygame.MOUSEBUTTONDOWN and not game_finished:
+            elif event.type in board_renderer.EXPOSE_EVENTS:
+                renderer.invalidate()
+            elif event.type == pygame.MOUSEBUTTONDOWN and not game_finished and ai_thread is None:
                 x, y = event.pos
                 button = event.button
                 if whose_turn == "Gold":
                     handle_click(x, y, button, "Gold")
-            elif event.type == pygame.KEYDOWN and not game_finished:
+            elif event.type == pygame.KEYDOWN and not game_finished and ai_thread is None:
                 if event.key == pygame.K_p:  # Press 'P' to pass
                     pass_turn()
+                elif event.key == pygame.K_h:  # Press 'H' to show or hide the hint
+                    show_hint = not show_hint
+        if ai_thread is None:
+            collect_ponder_replies()  # the AI's thread talks to the ponder process itself
         
         # If someone won, wait 2 seconds then quit
-        if game_finished:
-            pygame.display.flip()
+        if game_finished and ai_thread is None:
+            draw_board()
             pygame.time.wait(2000)
             running = False
+        clock.tick(60)
 
+    cancel_ai_turn()
+    quit_pondering()
     pygame.quit()
 
 if __name__ == "__main__":
+    if "--mcts" in sys.argv[1:]:
+        AI_ENGINE = "mcts"
+    if "--no-ponder" in sys.argv[1:]:
+        PONDER = False
+    if "--net" in sys.argv[1:-1]:
+        load_value_net(sys.argv[sys.argv.index("--net") + 1])
     main()
\ No newline at end of file
@@ -1,7 +1,12 @@
 import pygame
 import os
+import sys
 import random
 
+import analysis
+import board_renderer
+import god_heuristic as engine
+
 # Set up the game window
 WINDOW_WIDTH = 600
 WINDOW_HEIGHT = 600
@@ -13,6 +18,7 @@ LIGHT_COLOR = (240, 217, 181)  # Beige
 DARK_COLOR = (181, 136, 99)    # Brown
 TRAP_COLOR = (255, 180, 60)    # Amber
 HIGHLIGHT_COLOR = (200, 200, 100)  # Yellow
+HINT_COLOR = (40, 140, 230)    # Blue
 
 # Trap squares where pieces can be captured
 TRAPS = [(2, 2), (2, 5), (5, 2), (5, 5)]
@@ -59,60 +65,85 @@ def load_images():
         images[piece] = pygame.transform.scale(images[piece], (CELL_SIZE - 10, CELL_SIZE - 10)) #scale
     return images
 
-# Start the game
-pygame.init()
-piece_images = load_images()
-screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-pygame.display.set_caption("Arimaa")
+# Start the game. The analysis process doesn't need a window (where processes are
+# spawned rather than forked, it imports this file again under another name)
+if __name__ == "__main__":
+    pygame.init()
+    piece_images = load_images()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption("Arimaa")
+    renderer = board_renderer.BoardRenderer(screen, piece_images, TRAPS, BOARD_SIZE, CELL_SIZE,
+                                            LIGHT_COLOR, DARK_COLOR, TRAP_COLOR, HIGHLIGHT_COLOR)
 
 # Game variables
 selected = None  # What's clicked: None, (row, col), or ((r1, c1), (r2, c2))
 whose_turn = "Gold"  # Whose turn it is
 move_count = 0  # How many moves made this turn
 game_finished = False  # Is the game over?
+value_net = None  # ValueNet from valuenet.py used instead of the heuristic (--net weights.npz)
+
+# Hints: god_heuristic's turn planner analyses the human's position in the background
+# from the moment the turn begins, deepening until the human moves; 'H' shows its best
+# line so far. It names the cats GT/ST rather than GCT/SCT
+ENGINE_PIECES = {"GCT": "GT", "SCT": "ST"}
+hint_analysis = None  # analysis.BackgroundAnalysis, started by main
+show_hint = False  # 'H' toggles it
 
-# Draw the game board
+# Draw the game board. The renderer only redraws the squares and texts that changed
 def draw_board():
-    # Loop through each square
-    for row in range(BOARD_SIZE):
-        for col in range(BOARD_SIZE):
-            # Set color: light or dark checkerboard pattern
-            if (row + col) % 2 == 0:
-                color = LIGHT_COLOR
-            else:
-                color = DARK_COLOR
-            
-            # Traps get a special color
-            if (row, col) in TRAPS:
-                color = TRAP_COLOR
-
-            # Highlight selected squares if game isn't over
-            if selected and not game_finished:
-                # Single piece selected
-                if type(selected) == tuple and len(selected) == 2 and type(selected[0]) == int:
-                    if (row, col) == selected:
-                        color = HIGHLIGHT_COLOR
-                # Two pieces selected for push/pull
-                elif type(selected) == tuple and len(selected) == 2 and type(selected[0]) == tuple:
-                    if (row, col) == selected[0] or (row, col) == selected[1]:
-                        color = HIGHLIGHT_COLOR
-            
-            # Draw the square
-            pygame.draw.rect(screen, color, (col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-            
-            # Draw the piece (just text for simplicity)
-            piece = board[row][col]
-            if piece in piece_images:
-                img_rect = piece_images[piece].get_rect(center=(col * CELL_SIZE + CELL_SIZE / 2, row * CELL_SIZE + CELL_SIZE / 2))
-                screen.blit(piece_images[piece], img_rect)
+    # Highlight selected squares if game isn't over: one piece, or two for push/pull
+    highlighted = ()
+    if selected and not game_finished:
+        highlighted = (selected,) if type(selected[0]) == int else selected
+    
+    overlays = []
+    if show_hint and whose_turn == "Gold" and not game_finished:
+        overlays += hint_overlays()
     # Show win message if game is over
     if game_finished:
-        font = pygame.font.Font(None, 48)
-        win_message = f"{whose_turn} Wins!"
-        text = font.render(win_message, True, (255, 255, 255))
-        text_pos = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
-        pygame.draw.rect(screen, (0, 0, 0), text_pos.inflate(20, 20))  # Black background
-        screen.blit(text, text_pos)
+        overlays.append(renderer.text(f"{whose_turn} Wins!", 48, (255, 255, 255), background=(0, 0, 0),
+                                      padding=(20, 20), center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)))
+    renderer.draw(board, highlighted, overlays)
+
+# The board with god_heuristic's piece names
+def engine_board():
+    return [[ENGINE_PIECES.get(piece, piece) for piece in row] for row in board]
+
+# Start analysing the position if it's the human's move
+def analyse_position():
+    if hint_analysis is not None and whose_turn == "Gold" and not game_finished:
+        hint_analysis.analyse(engine_board(), "Gold", move_count)
+
+# The rest of the turn the analysis suggests, as overlays: an arrow for every piece
+# each step moves, the next step's drawn thicker, and the line in notation
+def hint_overlays():
+    overlays = []
+    position = engine_board()
+    hint = hint_analysis.hint(position)
+    if hint is None:
+        caption = "Hint: thinking..."
+    else:
+        line, depth = hint
+        caption = f"Hint (depth {depth}): {engine.line_notation(position, line)}"
+        lines = []
+        for index, move in enumerate(line):
+            kind, row, col, target_row, target_col, dir_row, dir_col = engine.decode_move(move)
+            if kind == engine.MOVE_PUSH:
+                arrows = [((target_row, target_col), (target_row + dir_row, target_col + dir_col)),
+                          ((row, col), (target_row, target_col))]
+            elif kind == engine.MOVE_PULL:
+                arrows = [((row, col), (row + dir_row, col + dir_col)), ((target_row, target_col), (row, col))]
+            else:
+                arrows = [((row, col), (target_row, target_col))]
+            width = 8 if index == 0 else 3
+            for (from_row, from_col), (to_row, to_col) in arrows:
+                start = (from_col * CELL_SIZE + CELL_SIZE // 2, from_row * CELL_SIZE + CELL_SIZE // 2)
+                end = (to_col * CELL_SIZE + CELL_SIZE // 2, to_row * CELL_SIZE + CELL_SIZE // 2)
+                lines.append((start, end, width))
+        overlays.append(renderer.arrows(lines, HINT_COLOR))
+    overlays.append(renderer.text(caption, 28, (255, 255, 255), background=(0, 0, 0), padding=(16, 8),
+                                  center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 20)))
+    return overlays
 
 # Check if a piece can't move (frozen by stronger enemy)
 def is_frozen(row, col, board):
@@ -316,6 +347,9 @@ def handle_push_pull(start, end, click, board = board):
 
 def heuristic(board):
     
+    if value_net is not None:
+        return value_net.evaluate(board)
+    
     h = 0
     
     # each piece type has a value
@@ -689,6 +723,7 @@ def handle_ai_turn():
     print("AI turn complete")
     whose_turn = "Gold"
     move_count = 0
+    analyse_position()
 
 def handle_click(x, y, button, team):
     global selected, whose_turn, move_count, game_finished
@@ -722,6 +757,8 @@ def handle_click(x, y, button, team):
                         move_count = 0
                         # AI's turn after player uses all 4 moves
                         handle_ai_turn()
+                    else:
+                        analyse_position()
                 else:
                     selected = None
             
@@ -744,6 +781,8 @@ def handle_click(x, y, button, team):
                                 move_count = 0
                                 # AI's turn after player uses all 4 moves
                                 handle_ai_turn()
+                            else:
+                                analyse_position()
                         else:
                             selected = None
                     else:
@@ -775,17 +814,20 @@ def pass_turn():
 
 # Main game loop
 def main():
+    global hint_analysis, show_hint
+    hint_analysis = analysis.BackgroundAnalysis()
+    analyse_position()  # the human moves first
+    clock = pygame.time.Clock()
     running = True
     while running:
-        # Clear the screen
-        screen.fill((0, 0, 0))
         draw_board()
-        pygame.display.flip()
         
         # Handle events (clicks, key presses)
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type in board_renderer.EXPOSE_EVENTS:
+                renderer.invalidate()
             elif event.type == pygame.MOUSEBUTTONDOWN and not game_finished:
                 x, y = event.pos
                 button = event.button
@@ -795,15 +837,22 @@ def main():
             elif event.type == pygame.KEYDOWN and not game_finished:
                 if event.key == pygame.K_p:  # Press 'P' to pass
                     pass_turn()
+                elif event.key == pygame.K_h:  # Press 'H' to show or hide the hint
+                    show_hint = not show_hint
         
         # If someone won, wait 2 seconds then quit
         if game_finished:
-            pygame.display.flip()
+            draw_board()
             pygame.time.wait(2000)
             #running = False
+        clock.tick(60)
 
+    hint_analysis.close()
     pygame.quit()
 
 # Start the game
 if __name__ == "__main__":
+    if "--net" in sys.argv[1:-1]:
+        import valuenet
+        value_net = valuenet.ValueNet.load(sys.argv[sys.argv.index("--net") + 1])
     main() # type: ignore
\ No newline at end of file
@@ -0,0 +1,198 @@
+import math
+import time
+
+import god_heuristic as engine
+
+# Search settings
+DEFAULT_BUDGET = 1.0  # Seconds per call to get_best_move (an int budget counts playouts instead)
+SELECTION = "puct"  # "puct" (priors from move ordering) or "uct"
+PUCT_C = 1.5  # Exploration weight for PUCT
+UCT_C = 1.4  # Exploration weight for UCT
+WIDENING_C = 2.0  # A node with n visits may have up to WIDENING_C * n ** WIDENING_ALPHA children
+WIDENING_ALPHA = 0.5
+EVAL_SCALE = 150.0  # Heuristic score that counts as a 73% chance of winning for Silver
+REUSE_DEPTH = 8  # How many steps below the old root to look for the new position
+LEAF_EVALUATION = "heuristic"  # "heuristic", or "rollout" for batches of random games (vectorized.py, needs NumPy)
+ROLLOUT_PLAYOUTS = 32  # Random games per leaf when LEAF_EVALUATION is "rollout"
+
+# Cat codes used by the boards in "human vs minimax.py", mapped to the engine's
+PIECE_ALIASES = {"GCT": "GT", "SCT": "ST"}
+
+class Node:
+    """A position in the search tree, one step after its parent.
+
+    value is the total result of the playouts through this node for the side
+    that made the step into it (the parent's side to move), 1 for a win.
+    """
+    __slots__ = ("board", "side", "steps", "turn_start", "key", "parent", "move", "rank",
+                 "visits", "value", "children", "moves", "terminal")
+
+    def __init__(self, board, side, steps, turn_start, parent=None, move=None, rank=0):
+        self.board = board
+        self.side = side  # Side to move
+        self.steps = steps  # Steps already taken this turn
+        self.turn_start = turn_start  # Hash of the position at the start of this turn
+        self.key = (engine.position_hash(board), side, steps)
+        self.parent = parent
+        self.move = move
+        self.rank = rank  # Position of move in the parent's move ordering
+        self.visits = 0
+        self.value = 0.0
+        self.children = []
+        self.moves = None  # Move generator, started the first time the node is widened
+        self.terminal = None  # Silver's result if the game is over here
+
+tree_root = None  # Kept between searches so the tree can be reused
+tree_history = None  # GameHistory the tree was built against
+
+def normalize_board(board):
+    """Copy a board, replacing piece codes from other files with the engine's."""
+    return [[PIECE_ALIASES.get(piece, piece) for piece in row] for row in board]
+
+def silver_value(board, maps=None):
+    """Map the evaluation score to Silver's chance of winning, between 0 and 1."""
+    score = engine.evaluate(board, maps=maps)
+    return 1.0 / (1.0 + math.exp(-max(-50.0, min(50.0, score / EVAL_SCALE))))
+
+def leaf_value(node):
+    """Silver's chance of winning from a new leaf, by heuristic or by random rollouts."""
+    if LEAF_EVALUATION == "rollout":
+        import vectorized  # NumPy is only needed for rollouts
+        return float(vectorized.rollout_win_rates([node.board], [node.side], [node.steps], ROLLOUT_PLAYOUTS)[0])
+    return silver_value(node.board)
+
+def widening_limit(node):
+    """How many children node may have after its current number of visits."""
+    return max(1, int(WIDENING_C * (node.visits + 1) ** WIDENING_ALPHA))
+
+def next_child(node, history):
+    """Expand the next move in node's ordering, or return None when there are none left."""
+    if node.moves is None:
+        node.moves = engine.staged_moves(node.board, node.side, node.steps)
+    for move in node.moves:
+        new_board = engine.make_move(node.board, move)
+        steps = node.steps + engine.move_steps(move)
+        if move != engine.PASS_MOVE and steps < 4:
+            child = Node(new_board, node.side, steps, node.turn_start, node, move, len(node.children))
+        else:
+            # The turn ends here: it has to change the position and may not repeat one a third time
+            new_hash = engine.position_hash(new_board)
+            next_side = "Silver" if node.side == "Gold" else "Gold"
+            if new_hash == node.turn_start or (history is not None and history.is_forbidden((new_hash, next_side))):
+                continue
+            child = Node(new_board, next_side, 0, new_hash, node, move, len(node.children))
+            result = engine.terminal_result(new_board, next_side)
+            if result.winner is not None:
+                child.terminal = 1.0 if result.winner == "Silver" else 0.0
+        node.children.append(child)
+        return child
+    node.moves = iter(())
+    return None
+
+def selection_score(node, child, prior_total):
+    """PUCT or UCT score of child for the side to move at node."""
+    if child.visits == 0:
+        q = 0.5
+    else:
+        q = child.value / child.visits
+    if SELECTION == "uct":
+        if child.visits == 0:
+            return float('inf')
+        return q + UCT_C * math.sqrt(math.log(node.visits) / child.visits)
+    prior = 1.0 / (child.rank + 1) / prior_total
+    return q + PUCT_C * prior * math.sqrt(node.visits) / (1 + child.visits)
+
+def select_child(node):
+    """Pick the child to follow from node."""
+    prior_total = sum(1.0 / (child.rank + 1) for child in node.children)
+    return max(node.children, key=lambda child: selection_score(node, child, prior_total))
+
+def playout(root, history):
+    """Run one selection, expansion, evaluation and backup from root."""
+    node = root
+    while node.terminal is None:
+        # Progressive widening: add a child once the visits allow another one
+        if len(node.children) < widening_limit(node):
+            child = next_child(node, history)
+            if child is not None:
+                node = child
+                break
+        if not node.children:
+            # Nothing left to play: the side to move loses
+            node.terminal = 0.0 if node.side == "Silver" else 1.0
+            break
+        node = select_child(node)
+
+    result = node.terminal if node.terminal is not None else leaf_value(node)
+
+    # Each node scores the result for the side that stepped into it
+    while node is not None:
+        node.visits += 1
+        if node.parent is not None:
+            node.value += result if node.parent.side == "Silver" else 1.0 - result
+        node = node.parent
+
+def find_reusable_root(key):
+    """Look for the position key a few steps below the old root."""
+    if tree_root is None:
+        return None
+    level = [tree_root]
+    for _ in range(REUSE_DEPTH + 1):
+        next_level = []
+        for node in level:
+            if node.key == key:
+                return node
+            next_level.extend(node.children)
+        level = next_level
+    return None
+
+def search(position, budget=DEFAULT_BUDGET, history=None):
+    """Search position = (board, side to move, steps taken this turn) and return the best move.
+
+    budget is a number of seconds (float) or playouts (int). history is the
+    game's GameHistory, used to skip turns that repeat a position for the
+    third time. Returns None if there is no move to play.
+    """
+    global tree_root, tree_history
+    board, side, steps = position
+    board = normalize_board(board)
+    key = (engine.position_hash(board), side, steps)
+
+    # Reuse the subtree for this position if the last search reached it
+    root = find_reusable_root(key) if history is tree_history else None
+    if root is None:
+        root = Node(board, side, steps, key[0])
+    root.parent = None
+    tree_root, tree_history = root, history
+
+    start_time = time.time()
+    reused = root.visits
+    playouts = 0
+    while True:
+        if isinstance(budget, int):
+            if playouts >= budget:
+                break
+        elif playouts > 0 and time.time() - start_time >= budget:
+            break
+        playout(root, history)
+        playouts += 1
+        if root.terminal is not None:
+            break
+
+    if not root.children:
+        return None
+    best = max(root.children, key=lambda child: child.visits)
+    print(f"MCTS ran {playouts} playouts ({reused} reused) in {time.time() - start_time:.2f} seconds, "
+          f"best: {engine.move_notation(board, best.move)} "
+          f"({best.visits} visits, {best.value / max(1, best.visits):.2f})")
+    return best.move
+
+def get_best_move(board, current_turn, move_count=0, budget=DEFAULT_BUDGET, history=None):
+    """Drop-in for get_best_move in the game files: the next step for current_turn."""
+    return search((board, current_turn, move_count), budget, history)
+
+def reset_tree():
+    """Forget the search tree, e.g. when a new game starts."""
+    global tree_root, tree_history
+    tree_root = None
+    tree_history = None
@@ -0,0 +1,154 @@
+import json
+import os
+
+import numpy as np
+
+import vectorized
+
+SHARD_SIZE = 1 << 20  # Records per shard file
+INDEX_FILE = "index.json"
+
+# One record per position. Boards are packed two squares per byte: each
+# square's vectorized.py code plus 6, so 0-12 fits in four bits
+RECORD_DTYPE = np.dtype([
+    ("board", np.uint8, (32,)),
+    ("side", np.int8),  # +1 Gold to move, -1 Silver
+    ("steps", np.int8),  # Steps already taken this turn
+    ("score", np.float32),  # Search score of the position (Silver-positive), NaN if none
+    ("result", np.float32),  # Silver's result in the game: 1 win, 0 loss, 0.5 draw
+    ("game", np.int64),  # Number of the game within the store
+])
+
+def pack_boards(boards):
+    """Pack a (K, 8, 8) int8 array from vectorized.py into (K, 32) bytes."""
+    codes = (boards.reshape(len(boards), 64) + 6).astype(np.uint8)
+    return codes[:, 0::2] << 4 | codes[:, 1::2]
+
+def unpack_boards(packed):
+    """Turn (K, 32) packed bytes back into a (K, 8, 8) int8 array."""
+    codes = np.empty((len(packed), 64), dtype=np.int8)
+    codes[:, 0::2] = packed >> 4
+    codes[:, 1::2] = packed & 15
+    return (codes - 6).reshape(len(packed), 8, 8)
+
+class PositionWriter:
+    """Appends positions to memory-mapped .npy shards in a directory.
+
+    Positions of a game are held back until end_game() gives its result, then
+    written in one go. The index file lists every shard and how many of its
+    records are filled; it is rewritten on flush(), so readers never see a
+    half-written game.
+    """
+
+    def __init__(self, path, shard_size=SHARD_SIZE):
+        self.path = path
+        self.shard_size = shard_size
+        os.makedirs(path, exist_ok=True)
+        self.index = read_index(path)
+        self.shard = None  # The memmap being filled
+        self.pending = []  # (board, side, steps, score) of the current game
+
+    def add(self, board, side, steps=0, score=float('nan')):
+        """Add a list-of-lists board with "Gold"/"Silver" to move to the current game."""
+        self.pending.append((vectorized.board_to_array(board), 1 if side == "Gold" else -1, steps, score))
+
+    def end_game(self, result):
+        """Write the current game's positions with Silver's result (1, 0 or 0.5)."""
+        if not self.pending:
+            return
+        boards, sides, steps, scores = zip(*self.pending)
+        self.pending = []
+        records = np.zeros(len(boards), dtype=RECORD_DTYPE)
+        records["board"] = pack_boards(np.array(boards))
+        records["side"], records["steps"], records["score"] = sides, steps, scores
+        records["result"] = result
+        records["game"] = self.index["games"]
+        self.index["games"] += 1
+        self.append(records)
+
+    def append(self, records):
+        """Append a structured array of RECORD_DTYPE records, starting new shards as needed."""
+        while len(records):
+            shards = self.index["shards"]
+            if not shards or shards[-1]["count"] >= self.shard_size:
+                self._open_shard(new=True)
+            elif self.shard is None:
+                self._open_shard(new=False)
+            entry = shards[-1]
+            room = self.shard_size - entry["count"]
+            self.shard[entry["count"]:entry["count"] + min(room, len(records))] = records[:room]
+            entry["count"] += min(room, len(records))
+            records = records[room:]
+
+    def _open_shard(self, new):
+        if self.shard is not None:
+            self.shard.flush()
+        shards = self.index["shards"]
+        if new:
+            shards.append({"file": f"shard_{len(shards):05d}.npy", "count": 0})
+            mode = "w+"
+        else:
+            mode = "r+"
+        self.shard = np.lib.format.open_memmap(os.path.join(self.path, shards[-1]["file"]), mode=mode,
+                                               dtype=RECORD_DTYPE, shape=(self.shard_size,) if new else None)
+
+    def flush(self):
+        """Make everything written so far visible to readers."""
+        if self.shard is not None:
+            self.shard.flush()
+        temporary = os.path.join(self.path, INDEX_FILE + ".tmp")
+        with open(temporary, "w") as index_file:
+            json.dump(self.index, index_file)
+        os.replace(temporary, os.path.join(self.path, INDEX_FILE))
+
+    def close(self):
+        self.flush()
+        self.shard = None
+
+def read_index(path):
+    """The store's index: {"games": count, "shards": [{"file", "count"}, ...]}."""
+    index_path = os.path.join(path, INDEX_FILE)
+    if not os.path.exists(index_path):
+        return {"games": 0, "shards": []}
+    with open(index_path) as index_file:
+        return json.load(index_file)
+
+class PositionStore:
+    """Read-only view of a store written by PositionWriter.
+
+    Shards are memory-mapped, so opening a store reads nothing but the index.
+    shards holds one memmap per shard, cut to its filled records.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index = read_index(path)
+        self.shards = [np.load(os.path.join(path, entry["file"]), mmap_mode="r")[:entry["count"]]
+                       for entry in self.index["shards"]]
+        self.offsets = np.cumsum([0] + [len(shard) for shard in self.shards])
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def records(self, indices):
+        """Records at the given store-wide indices (in that order)."""
+        indices = np.asarray(indices)
+        shard_numbers = np.searchsorted(self.offsets, indices, side="right") - 1
+        out = np.empty(len(indices), dtype=RECORD_DTYPE)
+        for number in np.unique(shard_numbers):
+            chosen = shard_numbers == number
+            out[chosen] = self.shards[number][indices[chosen] - self.offsets[number]]
+        return out
+
+    def minibatch(self, size, rng=None):
+        """size records picked uniformly at random; only the picked records are read."""
+        rng = rng if rng is not None else np.random.default_rng()
+        return self.records(np.sort(rng.integers(0, len(self), size)))
+
+    def block(self, size, rng=None):
+        """A random run of up to size consecutive records: a view into the shard, nothing copied."""
+        rng = rng if rng is not None else np.random.default_rng()
+        number = int(np.searchsorted(self.offsets, rng.integers(0, len(self)), side="right") - 1)
+        shard = self.shards[number]
+        start = int(rng.integers(0, max(1, len(shard) - size + 1)))
+        return shard[start:start + size]
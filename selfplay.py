@@ -0,0 +1,324 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import god_heuristic as engine
+import human_vs_heuristic
+
+MAX_TURNS = 200  # Games still going after this many turns (both sides) are draws
+MCTS_PLAYOUTS = 400  # Playouts per step for the mcts engine (a fixed count keeps games repeatable)
+
+# Each engine plays a whole turn: (board, side) -> (list of moves, score or None).
+# Scores are Silver-positive; None when the engine doesn't produce one
+def minimax_turn(board, side):
+    line = engine.plan_turn(board, side)
+    return line, engine.last_plan_score
+
+def greedy_turn(board, side):
+    line = []
+    steps = 0
+    while steps < 4:
+        move = engine.find_best_move_heuristic(board, side, steps)
+        if move is None or move == engine.PASS_MOVE:
+            break
+        line.append(move)
+        board = engine.make_move(board, move)
+        steps += engine.move_steps(move)
+    return line, None
+
+def mcts_turn(board, side):
+    import mcts
+    line = []
+    steps = 0
+    while steps < 4:
+        move = mcts.get_best_move(board, side, steps, budget=MCTS_PLAYOUTS, history=engine.game_history)
+        if move is None or move == engine.PASS_MOVE:
+            break
+        line.append(move)
+        board = engine.make_move(board, move)
+        steps += engine.move_steps(move)
+    return line, None
+
+def random_turn(board, side):
+    line = []
+    steps = 0
+    while steps < 4:
+        moves = [move for move in engine.generate_moves(board, side, steps)
+                 if move != engine.PASS_MOVE and not engine.repeats_position(board, side, move, steps)]
+        if not moves:
+            break
+        move = random.choice(moves)
+        line.append(move)
+        board = engine.make_move(board, move)
+        steps += engine.move_steps(move)
+    return line, None
+
+# The greedy player from human_vs_heuristic.py, which only plays Silver and
+# writes cats as GCT/SCT. Gold's turns are played on the mirrored board
+HUMAN_PIECES = {"GT": "GCT", "ST": "SCT"}
+
+def mirror_board(board):
+    """Flip a board top to bottom and swap the colours."""
+    swap = {"G": "S", "S": "G"}
+    return [[swap[piece[0]] + piece[1:] if piece != " " else piece for piece in row] for row in reversed(board)]
+
+def human_move_code(choice, mirrored):
+    """Turn a find_best_move result from human_vs_heuristic.py into an engine move code."""
+    row, col, target_row, target_col, kind = choice[:5]
+    directions = [(target_row - row, target_col - col)] + ([choice[5:7]] if kind != "move" else [])
+    if mirrored:
+        row = engine.BOARD_SIZE - 1 - row
+        directions = [(-dr, dc) for dr, dc in directions]
+    codes = [engine.DIRECTIONS.index(tuple(direction)) for direction in directions]
+    if kind == "move":
+        return engine.encode_move(row, col, codes[0])
+    return engine.encode_move(row, col, codes[0], engine.MOVE_PUSH if kind == "push" else engine.MOVE_PULL, codes[1])
+
+def human_greedy_turn(board, side):
+    line = []
+    steps = 0
+    while steps < 4:
+        view = mirror_board(board) if side == "Gold" else board
+        human_vs_heuristic.move_count = steps
+        choice = human_vs_heuristic.find_best_move([[HUMAN_PIECES.get(piece, piece) for piece in row] for row in view])
+        if choice is None:
+            break
+        move = human_move_code(choice, side == "Gold")
+        # Its rules differ from the engine's in places, so moves the engine doesn't allow end the turn
+        if move not in engine.generate_moves(board, side, steps) or engine.repeats_position(board, side, move, steps):
+            break
+        line.append(move)
+        board = engine.make_move(board, move)
+        steps += engine.move_steps(move)
+    return line, None
+
+# Engines that can be named on the command line; add new ones here
+ENGINES = {
+    "minimax": minimax_turn,
+    "greedy": greedy_turn,
+    "mcts": mcts_turn,
+    "random": random_turn,
+    "human_greedy": human_greedy_turn,
+}
+
+def engine_player(spec):
+    """The turn function for an engine spec: an ENGINES name, optionally with
+    "@weights.json" (heuristic weights from tune.py) or "@net.npz" (a value
+    network) to play with instead of the engine's own evaluation.
+    """
+    name, _, path = spec.partition("@")
+    if name not in ENGINES:
+        raise ValueError(f"unknown engine {name!r}, expected one of {', '.join(sorted(ENGINES))}")
+    play = ENGINES[name]
+    if not path:
+        return play
+    if path.endswith(".npz"):
+        import valuenet
+        net = valuenet.ValueNet.load(path)
+    else:
+        with open(path) as params_file:
+            saved = json.load(params_file)
+        params = [saved.get(param, default) for param, default in
+                  zip(engine.HEURISTIC_PARAM_NAMES, engine.DEFAULT_HEURISTIC_PARAMS)]
+
+    def play_with(board, side):
+        # Swap the evaluation in for this turn only; the other player may use its own
+        previous = engine.heuristic_param_vector(), engine.EVALUATOR, engine.value_net
+        if path.endswith(".npz"):
+            engine.EVALUATOR, engine.value_net = "net", net
+        else:
+            engine.set_heuristic_params(params)
+        try:
+            return play(board, side)
+        finally:
+            engine.set_heuristic_params(previous[0])
+            engine.EVALUATOR, engine.value_net = previous[1], previous[2]
+    return play_with
+
+def engine_spec(spec):
+    # argparse type for engine specs: check them up front
+    try:
+        engine_player(spec)
+    except (ValueError, OSError) as error:
+        raise argparse.ArgumentTypeError(str(error))
+    return spec
+
+def random_opening(rng):
+    """A random setup: each side's sixteen pieces shuffled over its two home rows."""
+    board = [row[:] for row in engine.board]
+    for rows in ((0, 1), (6, 7)):
+        pieces = [board[row][col] for row in rows for col in range(engine.BOARD_SIZE)]
+        rng.shuffle(pieces)
+        for i, piece in enumerate(pieces):
+            board[rows[i // engine.BOARD_SIZE]][i % engine.BOARD_SIZE] = piece
+    return board
+
+def play_game(gold, silver, seed, max_turns=MAX_TURNS, adjudication="off", adjudicator_settings=None):
+    """Play one game between two engine specs (see engine_player) from a random opening.
+
+    Returns a dict with the result (Silver's: 1, 0 or 0.5), winner, reason,
+    turn count, the turns in notation, and the position at the start of every
+    turn with the score the side to move gave its turn.
+
+    adjudication is "off", "on" (stop at the adjudicator's first verdict) or
+    "shadow" (play on, but record the verdict and the turn it came on).
+    adjudicator_settings are keyword arguments for engine.Adjudicator.
+    """
+    rng = random.Random(seed)
+    random.seed(seed)  # The engines' own randomness (evaluation noise, greedy ties)
+    board = random_opening(rng)
+    side = "Gold"
+    engine.game_history.clear()
+    engine.game_history.push((engine.position_hash(board), side))
+    engine.transposition_table.clear()
+    engine.killer_moves.clear()
+    engine.history_table.clear()
+    engine.previous_pv = []
+    if any(spec.partition("@")[0] == "mcts" for spec in (gold, silver)):
+        import mcts
+        mcts.reset_tree()
+    players = {"Gold": engine_player(gold), "Silver": engine_player(silver)}
+
+    adjudicator = engine.Adjudicator(**(adjudicator_settings or {})) if adjudication != "off" else None
+    verdict = None
+
+    start_time = time.time()
+    turns, positions = [], []
+    winner, reason, adjudicated = None, "turn limit", False
+    for _ in range(max_turns):
+        line, score = players[side](board, side)
+        positions.append((board, side, score))
+        new_board = board
+        for move in line:
+            new_board = engine.make_move(new_board, move)
+        turns.append(engine.line_notation(board, line))
+        opponent = "Silver" if side == "Gold" else "Gold"
+
+        # A turn has to change the position and may not repeat one a third time
+        new_hash = engine.position_hash(new_board)
+        if not line or new_hash == engine.position_hash(board) or \
+                engine.game_history.is_forbidden((new_hash, opponent)):
+            winner, reason = opponent, f"{side} has no legal turn"
+            break
+        board, side = new_board, opponent
+        engine.game_history.push((new_hash, side))
+
+        result = engine.terminal_result(board, side)
+        if result is not engine.GameResult.ONGOING:
+            winner, reason = result.winner, result.value
+            break
+
+        if adjudicator is not None and verdict is None:
+            decided = adjudicator.update(board, side, score)
+            if decided is not None:
+                verdict = {"winner": decided[0], "reason": decided[1], "turn": len(turns)}
+                if adjudication == "on":
+                    winner, reason, adjudicated = decided[0], decided[1], True
+                    break
+
+    return {
+        "gold": gold,
+        "silver": silver,
+        "seed": seed,
+        "result": 0.5 if winner is None else (1.0 if winner == "Silver" else 0.0),
+        "winner": winner,
+        "reason": reason,
+        "adjudicated": adjudicated,
+        "verdict": verdict,
+        "turns": len(turns),
+        "moves": turns,
+        "seconds": round(time.time() - start_time, 2),
+        "positions": positions,
+    }
+
+def init_worker():
+    # The engines print every step; workers keep quiet
+    sys.stdout = open(os.devnull, "w")
+
+def main():
+    parser = argparse.ArgumentParser(description="Play engines against each other without a display.")
+    parser.add_argument("--gold", type=engine_spec, default="minimax",
+                        help=f"one of {', '.join(sorted(ENGINES))}, optionally @weights.json or @net.npz")
+    parser.add_argument("--silver", type=engine_spec, default="greedy")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=1, help="game i uses seed + i for its opening and engines")
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS)
+    parser.add_argument("--swap", action="store_true", help="swap colours every other game")
+    parser.add_argument("--output", default="selfplay_games.jsonl", help="game records, one JSON line per game")
+    parser.add_argument("--store", help="also write every turn-start position to this position store")
+    parser.add_argument("--adjudicate", choices=["off", "on", "shadow"], default="on",
+                        help="shadow plays every game out and measures how often the verdict was wrong")
+    parser.add_argument("--adjudicate-score", type=float, default=engine.ADJUDICATE_SCORE)
+    parser.add_argument("--adjudicate-turns", type=int, default=engine.ADJUDICATE_TURNS)
+    parser.add_argument("--adjudicate-material", type=float, default=engine.ADJUDICATE_MATERIAL)
+    parser.add_argument("--no-goal-adjudication", action="store_true")
+    args = parser.parse_args()
+    settings = {"score": args.adjudicate_score, "turns": args.adjudicate_turns,
+                "material": args.adjudicate_material, "goal": not args.no_goal_adjudication}
+
+    writer = None
+    if args.store:
+        import position_store  # NumPy is only needed for the store
+        writer = position_store.PositionWriter(args.store)
+
+    print(f"Playing {args.games} games on {args.workers} workers: Gold {args.gold}, Silver {args.silver}"
+          f"{' (swapping colours)' if args.swap else ''}")
+    wins = {}
+    verdicts = {}  # Reason -> [verdicts, wrong verdicts, turns that would have been saved]
+    start_time = time.time()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_worker) as pool, \
+            open(args.output, "a") as output:
+        futures = []
+        for i in range(args.games):
+            gold, silver = (args.silver, args.gold) if args.swap and i % 2 else (args.gold, args.silver)
+            futures.append(pool.submit(play_game, gold, silver, args.seed + i, args.max_turns,
+                                       args.adjudicate, settings))
+        for done, future in enumerate(as_completed(futures), 1):
+            game = future.result()
+            positions = game.pop("positions")
+            output.write(json.dumps(game) + "\n")
+            output.flush()
+            if writer is not None:
+                for board, side, score in positions:
+                    writer.add(board, side, 0, float('nan') if score is None else score)
+                writer.end_game(game["result"])
+                writer.flush()
+
+            winner_engine = game[game["winner"].lower()] if game["winner"] else "draw"
+            wins[winner_engine] = wins.get(winner_engine, 0) + 1
+            verdict = game["verdict"]
+            if args.adjudicate == "shadow" and verdict is not None:
+                counts = verdicts.setdefault(verdict["reason"], [0, 0, 0])
+                counts[0] += 1
+                counts[1] += verdict["winner"] != game["winner"]
+                counts[2] += game["turns"] - verdict["turn"]
+            elapsed = time.time() - start_time
+            print(f"[{done}/{args.games}] seed {game['seed']}: {game['winner'] or 'nobody'} wins "
+                  f"({'adjudicated: ' if game['adjudicated'] else ''}{game['reason']}, {game['turns']} turns, "
+                  f"{game['seconds']:.1f} s), {done / elapsed:.3f} games/s")
+
+    if writer is not None:
+        writer.close()
+    elapsed = time.time() - start_time
+    print(f"\n{args.games} games in {elapsed:.1f} seconds ({args.games / elapsed:.3f} games/s)")
+    for name, count in sorted(wins.items()):
+        print(f"  {name}: {count}")
+
+    # Verdicts checked against the games played out
+    if args.adjudicate == "shadow":
+        print(f"\n{'verdict':<18}{'games':>7}{'wrong':>7}{'false rate':>12}{'turns saved':>13}")
+        for reason, (count, wrong, saved) in sorted(verdicts.items()):
+            print(f"{reason:<18}{count:>7}{wrong:>7}{wrong / count:>12.1%}{saved:>13}")
+        total = sum(counts[0] for counts in verdicts.values())
+        wrong = sum(counts[1] for counts in verdicts.values())
+        if total:
+            print(f"{'all':<18}{total:>7}{wrong:>7}{wrong / total:>12.1%}"
+                  f"{sum(counts[2] for counts in verdicts.values()):>13}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import broadcast
+import god_heuristic as engine
+import selfplay
+
+DEFAULT_BUDGET = 2.0  # Seconds the engine may think per turn unless the game asks for less
+MAX_BUDGET = 30.0
+MIN_BUDGET = 0.2  # Time left for the search however long the turn waited for a worker
+MAX_DEPTH = 8  # Deepest plan_turn refine depth; the budget usually stops the search first
+METRIC_WINDOW = 10000  # Recent turns kept for the latency percentiles
+METRICS_INTERVAL = 10.0  # Seconds between metrics lines in the log
+
+START_BOARD = [row[:] for row in engine.board]
+
+# Clients send one JSON object per line and get one back per line:
+#   {"cmd": "new", "side": "Gold", "budget": 2.0}  -> {"type": "game", ...}, Gold being the human's side
+#   {"cmd": "move", "game": 1, "move": "Ed2n Ed3n"}  -> {"type": "move", ...} with the engine's answer
+#   {"cmd": "state", "game": 1}  -> {"type": "game", ...}
+#   {"cmd": "close", "game": 1}  -> {"type": "closed", "game": 1}
+#   {"cmd": "stats"}  -> {"type": "stats", ...}
+#   {"cmd": "watch", "game": 1}  -> the connection becomes a spectator stream (see broadcast.py)
+# Anything wrong gets {"type": "error", "error": ...}; "busy" means every
+# worker and waiting slot is taken, so the move was not played
+
+class ServerBusy(Exception):
+    """Raised when the engine pool can't take another turn."""
+
+def board_text(board):
+    """The board as 64 characters, rank 8 first, like AEI's setposition."""
+    return "".join(engine.piece_letter(piece) if piece != " " else " " for row in board for piece in row)
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+def engine_turn(board, side, history_keys, budget, max_depth):
+    """Play the engine's turn in a worker process: (moves, score, depth) within budget seconds."""
+    engine.game_history.clear()
+    for key in history_keys:
+        engine.game_history.push(key)
+    engine.search_stop = threading.Event()
+    timer = threading.Timer(budget, engine.search_stop.set)
+    timer.start()
+    # A greedy turn first, so there is always something to play
+    fallback, _ = selfplay.greedy_turn(board, side)
+    line, score, depth = engine.deepen_turn(board, side, max_depth)
+    timer.cancel()
+    return line or fallback, score, depth
+
+class GameSession:
+    """One human-vs-engine game: everything the GUIs keep in module globals."""
+
+    def __init__(self, game_id, human_side, budget, channel):
+        self.id = game_id
+        self.human_side = human_side
+        self.engine_side = "Silver" if human_side == "Gold" else "Gold"
+        self.budget = budget
+        self.board = [row[:] for row in START_BOARD]
+        self.side = "Gold"
+        self.history = engine.GameHistory()
+        self.history.push((engine.position_hash(self.board), self.side))
+        self.turns = []  # Every turn so far in step notation
+        self.result = None  # GameResult once the game is over
+        self.busy = False  # The engine is thinking
+        self.channel = channel  # broadcast.GameChannel for spectators
+
+    def play(self, moves):
+        """Play a turn of move codes for the side to move."""
+        self.turns.append(engine.line_notation(self.board, moves))
+        self.channel.publish_turn(self.board, moves)
+        for move in moves:
+            self.board = engine.make_move(self.board, move)
+        self.side = "Silver" if self.side == "Gold" else "Gold"
+        self.history.push((engine.position_hash(self.board), self.side))
+        result = engine.terminal_result(self.board, self.side)
+        if result is not engine.GameResult.ONGOING:
+            self.finish(result)
+
+    def finish(self, result):
+        self.result = result
+        self.channel.close(result.value)
+
+    def state(self):
+        return {
+            "type": "game",
+            "game": self.id,
+            "board": board_text(self.board),
+            "side": self.side,
+            "human": self.human_side,
+            "turns": len(self.turns),
+            "last": self.turns[-1] if self.turns else None,
+            "result": self.result.value if self.result else None,
+            "winner": self.result.winner if self.result else None,
+        }
+
+class EnginePool:
+    """Runs engine turns in a bounded process pool.
+
+    At most workers turns search at once. Up to max_waiting more wait for a
+    worker; past that the pool refuses turns with ServerBusy, so a burst of
+    moves is pushed back to the clients instead of queueing without limit.
+    A turn's time budget is cut by however long it waited.
+    """
+
+    def __init__(self, workers, max_waiting):
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=selfplay.init_worker)
+        self.slots = asyncio.Semaphore(workers)
+        self.capacity = workers + max_waiting
+        self.pending = 0  # Turns searching or waiting
+        self.latencies = deque(maxlen=METRIC_WINDOW)  # Seconds from asking to answer
+        self.waits = deque(maxlen=METRIC_WINDOW)  # Seconds spent waiting for a worker
+
+    def check(self):
+        if self.pending >= self.capacity:
+            raise ServerBusy
+
+    async def engine_turn(self, session):
+        """The engine's turn for session: (moves, score, depth)."""
+        self.check()
+        self.pending += 1
+        start_time = time.perf_counter()
+        try:
+            async with self.slots:
+                waited = time.perf_counter() - start_time
+                budget = max(session.budget - waited, MIN_BUDGET)
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self.executor, engine_turn, session.board, session.side,
+                                                    list(session.history.keys), budget, MAX_DEPTH)
+        finally:
+            self.pending -= 1
+        self.waits.append(waited)
+        self.latencies.append(time.perf_counter() - start_time)
+        return result
+
+    def stats(self):
+        latencies, waits = list(self.latencies), list(self.waits)
+        return {
+            "pending": self.pending,
+            "capacity": self.capacity,
+            "turns": len(latencies),
+            "latency_p50": percentile(latencies, 0.5),
+            "latency_p99": percentile(latencies, 0.99),
+            "wait_p50": percentile(waits, 0.5),
+            "wait_p99": percentile(waits, 0.99),
+        }
+
+    def shutdown(self):
+        self.executor.shutdown(cancel_futures=True)
+
+class GameServer:
+    """Hosts any number of games over line-delimited JSON on TCP."""
+
+    def __init__(self, workers, max_waiting):
+        self.pool = EnginePool(workers, max_waiting)
+        self.broadcaster = broadcast.Broadcaster()
+        self.games = {}
+        self.next_id = 1
+
+    async def handle_client(self, reader, writer):
+        # Commands from one connection are answered in order, so a client
+        # waiting for the engine isn't read from until its answer is sent.
+        # Games a connection started are closed when it goes away
+        owned = set()
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("request must be a JSON object")
+                    if request.get("cmd") == "watch":
+                        await self.watch(request, writer)
+                        break
+                    reply = await self.handle(request, owned)
+                except ServerBusy:
+                    reply = {"type": "error", "error": "busy"}
+                except (ValueError, KeyError, TypeError) as error:
+                    reply = {"type": "error", "error": str(error)}
+                writer.write((json.dumps(reply) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for game_id in owned:
+                if game_id in self.games:  # Another connection may have closed it
+                    self.close_game(self.games[game_id])
+            writer.close()
+
+    async def handle(self, request, owned):
+        """Answer one command; owned holds the ids of the games this connection started."""
+        command = request["cmd"]
+        if command == "new":
+            side = request.get("side", "Gold")
+            if side not in ("Gold", "Silver"):
+                raise ValueError("side must be Gold or Silver")
+            budget = min(max(float(request.get("budget", DEFAULT_BUDGET)), MIN_BUDGET), MAX_BUDGET)
+            if side == "Silver":
+                self.pool.check()  # The engine moves first
+            session = GameSession(self.next_id, side, budget, self.broadcaster.open(self.next_id, START_BOARD))
+            self.games[session.id] = session
+            owned.add(session.id)
+            self.next_id += 1
+            if session.engine_side == "Gold":
+                await self.engine_move(session)
+            return session.state()
+        if command == "stats":
+            return {"type": "stats", "games": len(self.games), **self.pool.stats(),
+                    **self.broadcaster.stats.as_dict()}
+        session = self.games.get(request.get("game"))
+        if session is None:
+            raise ValueError("no such game")
+        if command == "state":
+            return session.state()
+        if command == "close":
+            self.close_game(session)
+            owned.discard(session.id)
+            return {"type": "closed", "game": session.id}
+        if command == "move":
+            if session.result is not None:
+                raise ValueError("the game is over")
+            if session.busy or session.side != session.human_side:
+                raise ValueError("not your turn")
+            self.pool.check()
+            session.play(engine.parse_turn(session.board, session.side, request["move"], session.history))
+            if session.result is None:
+                await self.engine_move(session)
+            return dict(session.state(), type="move")
+        raise ValueError(f"unknown command {command}")
+
+    def close_game(self, session):
+        """Forget a game and end its spectator stream."""
+        del self.games[session.id]
+        self.broadcaster.close(session.id, session.result.value if session.result else None)
+
+    async def engine_move(self, session):
+        session.busy = True
+        try:
+            moves, _, _ = await self.pool.engine_turn(session)
+        finally:
+            session.busy = False
+        if moves:
+            session.play(moves)
+        else:
+            session.finish(engine.GameResult.SILVER_IMMOBILIZATION if session.side == "Gold"
+                           else engine.GameResult.GOLD_IMMOBILIZATION)
+
+    async def watch(self, request, writer):
+        channel = self.broadcaster.channels.get(request.get("game"))
+        if channel is None:
+            raise ValueError("no such game")
+        await channel.watch(writer)
+
+    async def report_metrics(self):
+        while True:
+            await asyncio.sleep(METRICS_INTERVAL)
+            stats = self.pool.stats()
+            if stats["turns"]:
+                print(f"{len(self.games)} games, {self.broadcaster.stats.spectators} spectators, "
+                      f"{stats['pending']} turns in the pool, "
+                      f"latency p50 {stats['latency_p50']:.2f}s p99 {stats['latency_p99']:.2f}s, "
+                      f"wait p99 {stats['wait_p99']:.2f}s")
+
+async def serve(host, port, workers, max_waiting):
+    game_server = GameServer(workers, max_waiting)
+    server = await asyncio.start_server(game_server.handle_client, host, port)
+    print(f"Serving games on {host}:{port} with {workers} engine workers")
+    metrics = asyncio.create_task(game_server.report_metrics())
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        metrics.cancel()
+        game_server.pool.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="Host human-vs-engine games over TCP (one JSON object per line).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7878)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="engine processes")
+    parser.add_argument("--max-waiting", type=int, default=None,
+                        help="engine turns that may wait for a worker before moves are refused (default 4 per worker)")
+    args = parser.parse_args()
+    max_waiting = args.max_waiting if args.max_waiting is not None else 4 * args.workers
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, max_waiting))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+import argparse
+import math
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+import selfplay
+
+Z_95 = 1.96  # Error bars are 95% confidence intervals
+MIN_SPRT_PAIRS = 20  # Game pairs an SPRT plays before it may stop; the normal approximation needs them
+PRIOR_PAIRS = (0.25, 0.75)  # Pseudo pair scores added to the SPRT's, so identical pairs still have a variance
+
+def elo_from_score(score):
+    """Elo difference that gives an expected score (0 to 1)."""
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / score - 1)
+
+def score_from_elo(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+def score_statistics(results):
+    """(count, mean score, variance per result) of one player's scores (each from 0 to 1)."""
+    count = len(results)
+    mean = sum(results) / count
+    return count, mean, sum((result - mean) ** 2 for result in results) / count
+
+def elo_estimate(results):
+    """(Elo difference, error) from one player's game or game pair scores."""
+    count, mean, variance = score_statistics(results)
+    error = Z_95 * math.sqrt(variance / count)
+    low, high = elo_from_score(mean - error), elo_from_score(mean + error)
+    return elo_from_score(mean), (high - low) / 2
+
+def sprt_llr(pair_scores, elo0, elo1):
+    """Log-likelihood ratio of elo1 against elo0 for one player's game pair scores.
+
+    A pair's score is the mean of its two colour-swapped games (0, 0.25, 0.5,
+    0.75 or 1), so the pairs are independent even though the games in them
+    share an opening, as in fishtest's pentanomial GSPRT. Uses the normal
+    approximation, which is only good once a few dozen pairs have been
+    played: see MIN_SPRT_PAIRS. The PRIOR_PAIRS are counted too, so a run
+    of identical pairs (all drawn, say) has some variance and a finite LLR;
+    their weight fades as pairs are played.
+    """
+    count, mean, variance = score_statistics(list(pair_scores) + list(PRIOR_PAIRS))
+    score0, score1 = score_from_elo(elo0), score_from_elo(elo1)
+    return count * (score1 - score0) * (2 * mean - score0 - score1) / (2 * variance)
+
+def sprt_bounds(alpha, beta):
+    """Lower and upper LLR bounds: below accepts elo0, above accepts elo1."""
+    return math.log(beta / (1 - alpha)), math.log((1 - beta) / alpha)
+
+def game_pairs(first, second, seeds):
+    """The games of a match: each seed's opening played twice, with colours swapped."""
+    for seed in seeds:
+        yield first, second, seed
+        yield second, first, seed
+
+def pair_scores(games, player):
+    """player's score in each complete game pair (the two games of a seed), by seed."""
+    by_seed = {}
+    for game in games:
+        by_seed.setdefault(game["seed"], []).append(game)
+    return [sum(player_scores(pair, player)) / 2 for _, pair in sorted(by_seed.items()) if len(pair) == 2]
+
+def player_scores(games, player):
+    """player's scores from every game it played in."""
+    scores = []
+    for game in games:
+        if game["gold"] == player:
+            scores.append(1 - game["result"])
+        elif game["silver"] == player:
+            scores.append(game["result"])
+    return scores
+
+def run_round_robin(pool, engines, pairs, seed, max_turns, adjudication):
+    """Play pairs paired games between every two engines and return the game records.
+
+    Records come back in schedule order (by pairing, then seed, then colours),
+    whatever order the games finished in. A game that fails is reported and
+    left out rather than losing the rest.
+    """
+    futures = {}  # Future -> its place in the schedule
+    for i, first in enumerate(engines):
+        for second in engines[i + 1:]:
+            for gold, silver, game_seed in game_pairs(first, second, range(seed, seed + pairs)):
+                future = pool.submit(selfplay.play_game, gold, silver, game_seed, max_turns, adjudication)
+                futures[future] = len(futures)
+    games = []
+    start_time = time.time()
+    for done, future in enumerate(as_completed(futures), 1):
+        try:
+            game = _strip(future.result())
+        except Exception as error:
+            print(f"[{done}/{len(futures)}] game failed: {error!r}")
+            continue
+        games.append((futures[future], game))
+        print(f"[{done}/{len(futures)}] {game['gold']} vs {game['silver']}, seed {game['seed']}: "
+              f"{game['winner'] or 'nobody'} wins ({game['reason']}, {game['turns']} turns), "
+              f"{done / (time.time() - start_time):.3f} games/s")
+    print(f"{len(games)} games in {time.time() - start_time:.1f} seconds")
+    games.sort(key=lambda item: item[0])
+    return [game for _, game in games]
+
+def run_sprt(pool, test, base, seed, max_turns, adjudication, elo0, elo1, alpha, beta, max_pairs, workers,
+             min_pairs=MIN_SPRT_PAIRS):
+    """Play paired games of test against base until the SPRT accepts a hypothesis.
+
+    The test is run on complete game pairs only, and can't stop before
+    min_pairs of them. A game that fails is reported and its whole pair is
+    dropped, so every pair counted has both colours.
+    """
+    lower, upper = sprt_bounds(alpha, beta)
+    print(f"SPRT {test} vs {base}: elo0 {elo0}, elo1 {elo1}, alpha {alpha}, beta {beta} "
+          f"(LLR bounds {lower:.2f}, {upper:.2f}, at least {min_pairs} pairs)")
+    schedule = game_pairs(test, base, range(seed, seed + max_pairs))
+    pending, games, verdict = {}, [], None  # pending: future -> its game's seed
+    failed = set()  # Seeds of pairs with a game that failed
+    start_time = time.time()
+
+    # Keep every worker busy, and check the test after every finished pair
+    while verdict is None:
+        while len(pending) < 2 * workers:
+            game = next(schedule, None)
+            if game is None:
+                break
+            pending[pool.submit(selfplay.play_game, *game, max_turns, adjudication)] = game[2]
+        if not pending:
+            break
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        pairs_before = len(pair_scores(games, test))
+        for future in done:
+            game_seed = pending.pop(future)
+            try:
+                games.append(_strip(future.result()))
+            except Exception as error:
+                print(f"Game with seed {game_seed} failed, dropping its pair: {error!r}")
+                failed.add(game_seed)
+        games = [game for game in games if game["seed"] not in failed]
+        scores = pair_scores(games, test)
+        if len(scores) == pairs_before or not scores:
+            continue
+        llr = sprt_llr(scores, elo0, elo1)
+        elo, error = elo_estimate(scores)
+        print(f"{len(scores):>5} pairs: score {2 * sum(scores):.1f}/{2 * len(scores)}, "
+              f"Elo {elo:+.0f} +/- {error:.0f}, LLR {llr:.2f}, "
+              f"{2 * len(scores) / (time.time() - start_time):.2f} games/s")
+        if len(scores) < min_pairs:
+            continue
+        if llr >= upper:
+            verdict = f"H1 accepted: {test} is at least {elo1} Elo better"
+        elif llr <= lower:
+            verdict = f"H0 accepted: {test} is not {elo1} Elo better"
+
+    for future in pending:
+        future.cancel()
+    # Only complete pairs count, in the ratings too
+    seeds = [game["seed"] for game in games]
+    games = [game for game in games if seeds.count(game["seed"]) == 2]
+    print(verdict or f"No decision after {len(games) // 2} pairs")
+    return games
+
+def _strip(game):
+    # Positions are only needed for the position store
+    game.pop("positions", None)
+    return game
+
+def print_ratings(engines, games):
+    """Elo of every pair, and of every engine against the rest of the field."""
+    print(f"\n{'engine':<24}{'games':>7}{'score':>8}{'Elo vs field':>14}")
+    for player in engines:
+        scores = player_scores(games, player)
+        if scores:
+            elo, error = elo_estimate(scores)
+            print(f"{player:<24}{len(scores):>7}{sum(scores) / len(scores):>8.1%}{elo:>+9.0f} +/- {error:.0f}")
+
+    print(f"\n{'pair':<40}{'games':>7}{'score':>8}{'Elo':>14}")
+    for i, first in enumerate(engines):
+        for second in engines[i + 1:]:
+            pair_games = [game for game in games if {game["gold"], game["silver"]} == {first, second}]
+            scores = player_scores(pair_games, first)
+            if scores:
+                elo, error = elo_estimate(scores)
+                print(f"{first + ' vs ' + second:<40}{len(scores):>7}{sum(scores) / len(scores):>8.1%}"
+                      f"{elo:>+9.0f} +/- {error:.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine tournaments with Elo estimates, or an SPRT between two engines.")
+    parser.add_argument("engines", nargs="+", type=selfplay.engine_spec,
+                        help="engine specs as for selfplay.py; with --sprt, the engine under test and then the base")
+    parser.add_argument("--pairs", type=int, default=10, help="game pairs per match in a round robin")
+    parser.add_argument("--sprt", action="store_true", help="run an SPRT between the first two engines")
+    parser.add_argument("--elo0", type=float, default=0.0)
+    parser.add_argument("--elo1", type=float, default=50.0)
+    parser.add_argument("--alpha", type=float, default=0.05)
+    parser.add_argument("--beta", type=float, default=0.05)
+    parser.add_argument("--max-pairs", type=int, default=2000, help="SPRT gives up after this many game pairs")
+    parser.add_argument("--min-pairs", type=int, default=MIN_SPRT_PAIRS, help="SPRT plays at least this many pairs")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--max-turns", type=int, default=selfplay.MAX_TURNS)
+    parser.add_argument("--adjudicate", choices=["off", "on"], default="on")
+    args = parser.parse_args()
+
+    if len(set(args.engines)) != len(args.engines) or len(args.engines) < 2:
+        parser.error("give at least two different engines")
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=selfplay.init_worker) as pool:
+        if args.sprt:
+            games = run_sprt(pool, args.engines[0], args.engines[1], args.seed, args.max_turns, args.adjudicate,
+                             args.elo0, args.elo1, args.alpha, args.beta, args.max_pairs, args.workers,
+                             args.min_pairs)
+            print_ratings(args.engines[:2], games)
+        else:
+            games = run_round_robin(pool, args.engines, args.pairs, args.seed, args.max_turns, args.adjudicate)
+            print_ratings(args.engines, games)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+import argparse
+import time
+
+import numpy as np
+
+import god_heuristic as engine
+import position_store
+import vectorized
+
+FEATURE_CHUNK = 50000  # Boards per heuristic_features call, to bound memory
+GENERATE_TURNS = 80  # Random games still going after this many turns count as draws
+
+def random_game_positions(count, batch=1024, seed=None):
+    """Positions from random games (pushes and pulls included) with the games' results.
+
+    Returns (boards, results): a (count, 8, 8) int8 array of turn-start
+    positions and Silver's result in the game each came from.
+    """
+    rng = np.random.default_rng(seed)
+    env = vectorized.VecEnv(batch, max_turns=GENERATE_TURNS)
+    _, masks = env.reset()
+    game_positions = [[] for _ in range(batch)]
+    boards, results = [], []
+    total = 0
+    while total < count:
+        boards_now = env.boards
+        for game in np.flatnonzero(env.steps == 0):
+            game_positions[game].append(boards_now[game].copy())
+        _, _, dones, masks, info = env.step(vectorized.random_actions(masks, rng))
+        for game in np.flatnonzero(dones):
+            boards.extend(game_positions[game])
+            results.extend([info["results"][game]] * len(game_positions[game]))
+            total += len(game_positions[game])
+            game_positions[game] = []
+    return np.array(boards[:count], dtype=np.int8), np.array(results[:count])
+
+def position_features(boards):
+    """heuristic_features for any number of boards, a chunk at a time."""
+    return np.concatenate([vectorized.heuristic_features(boards[start:start + FEATURE_CHUNK])
+                           for start in range(0, len(boards), FEATURE_CHUNK)])
+
+def texel_loss(features, results, params, scale):
+    """Mean squared error between the game results and the scores mapped to win chances."""
+    predicted = 1.0 / (1.0 + np.exp(-np.clip(features @ params / scale, -50, 50)))
+    return float(np.mean((predicted - results) ** 2))
+
+def fit_scale(features, results, params):
+    """The score scale that best maps the starting weights to results (Texel's K)."""
+    scales = np.geomspace(10, 10000, 61)
+    losses = [texel_loss(features, results, params, scale) for scale in scales]
+    return float(scales[int(np.argmin(losses))])
+
+def tune(features, results, params, scale, epochs=200, learning_rate=1.0):
+    """Fit the weights to the results with Adam on the Texel loss, one full pass per epoch."""
+    params = np.array(params, dtype=float)
+    first, second = np.zeros_like(params), np.zeros_like(params)
+    beta1, beta2 = 0.9, 0.999
+    for epoch in range(1, epochs + 1):
+        start_time = time.time()
+        predicted = 1.0 / (1.0 + np.exp(-np.clip(features @ params / scale, -50, 50)))
+        error = 2 * (predicted - results) * predicted * (1 - predicted) / scale
+        gradient = features.T @ error / len(results)
+        first = beta1 * first + (1 - beta1) * gradient
+        second = beta2 * second + (1 - beta2) * gradient ** 2
+        params -= learning_rate * (first / (1 - beta1 ** epoch)) / (np.sqrt(second / (1 - beta2 ** epoch)) + 1e-12)
+        if epoch == 1 or epoch % 25 == 0 or epoch == epochs:
+            print(f"epoch {epoch:>4}: loss {texel_loss(features, results, params, scale):.6f} "
+                  f"({time.time() - start_time:.3f} s)")
+    return params
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune the heuristic weights to game results (Texel method).")
+    parser.add_argument("--positions", help=".npz with boards (N, 8, 8 int8) and results (Silver's, 0 to 1)")
+    parser.add_argument("--store", help="position store directory (position_store.py) to tune on")
+    parser.add_argument("--generate", type=int, default=200000,
+                        help="positions from random games if neither --positions nor --store is given")
+    parser.add_argument("--save-positions", help="write the generated positions to this .npz file")
+    parser.add_argument("--epochs", type=int, default=200)
+    parser.add_argument("--learning-rate", type=float, default=1.0)
+    parser.add_argument("--output", default=engine.HEURISTIC_PARAMS_FILE,
+                        help="where to write the tuned weights (the engine loads the default file at startup)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    start_time = time.time()
+    if args.positions:
+        with np.load(args.positions) as data:
+            boards, results = data["boards"], data["results"]
+    elif args.store:
+        store = position_store.PositionStore(args.store)
+        records = np.concatenate(store.shards) if store.shards else np.zeros(0, position_store.RECORD_DTYPE)
+        boards, results = position_store.unpack_boards(records["board"]), records["result"].astype(float)
+    else:
+        boards, results = random_game_positions(args.generate, seed=args.seed)
+        if args.save_positions:
+            np.savez_compressed(args.save_positions, boards=boards, results=results)
+    print(f"{len(boards)} positions in {time.time() - start_time:.1f} seconds")
+
+    # Positions with a rabbit already home score as infinite and carry no information
+    keep = ~vectorized.on_goal_row(boards)
+    boards, results = boards[keep], results[keep]
+    start_time = time.time()
+    features = position_features(boards)
+    print(f"Features for {len(boards)} positions in {time.time() - start_time:.1f} seconds")
+
+    params = np.array(engine.heuristic_param_vector(), dtype=float)
+    scale = fit_scale(features, results, params)
+    print(f"Scale {scale:.1f}, loss with the current weights {texel_loss(features, results, params, scale):.6f}")
+    tuned = tune(features, results, params, scale, args.epochs, args.learning_rate)
+
+    print(f"\n{'parameter':<16}{'before':>10}{'after':>10}")
+    for name, before, after in zip(engine.HEURISTIC_PARAM_NAMES, params, tuned):
+        print(f"{name:<16}{before:>10.2f}{after:>10.2f}")
+    engine.save_heuristic_params([round(float(value), 2) for value in tuned], args.output)
+    print(f"Saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
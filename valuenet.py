@@ -0,0 +1,158 @@
+import argparse
+import time
+
+import numpy as np
+
+import god_heuristic as engine
+import vectorized
+
+BOARD_SIZE = engine.BOARD_SIZE
+PLANES = 12  # One plane per piece type and colour: Gold rabbit..elephant, then Silver
+SCORE_SCALE = 150.0  # Heuristic points per unit of the network's output (Silver's win logit)
+
+# Layer sizes for random_network
+CONV_CHANNELS = (16, 16)
+HIDDEN_UNITS = (64,)
+
+def board_planes(boards):
+    """Turn a (K, 8, 8) int8 array from vectorized.py into (K, 12, 8, 8) float32 input planes."""
+    codes = np.where(boards > 0, boards - 1, -boards + 5)  # Gold 0-5, Silver 6-11
+    planes = np.zeros((len(boards), PLANES, BOARD_SIZE, BOARD_SIZE), dtype=np.float32)
+    index, rows, cols = np.nonzero(boards)
+    planes[index, codes[index, rows, cols], rows, cols] = 1.0
+    return planes
+
+def conv3x3(inputs, weights, bias):
+    """3x3 convolution with zero padding: (K, C, 8, 8) to (K, out, 8, 8)."""
+    count, channels = inputs.shape[:2]
+    padded = np.pad(inputs, ((0, 0), (0, 0), (1, 1), (1, 1)))
+    # Each output square sees a 3x3 patch of every input channel
+    patches = np.stack([padded[:, :, dr:dr + BOARD_SIZE, dc:dc + BOARD_SIZE]
+                        for dr in range(3) for dc in range(3)], axis=2)
+    patches = patches.reshape(count, channels * 9, BOARD_SIZE * BOARD_SIZE)
+    outputs = np.matmul(weights.reshape(len(weights), -1), patches) + bias[:, None]
+    return outputs.reshape(count, len(weights), BOARD_SIZE, BOARD_SIZE)
+
+class ValueNet:
+    """A small convolutional value network evaluated with NumPy only.
+
+    conv holds (weights (out, in, 3, 3), bias) pairs and dense holds
+    (weights (in, out), bias) pairs. Every layer but the last is followed by
+    a ReLU; the last one has a single output, Silver's win logit.
+    """
+
+    def __init__(self, conv, dense):
+        self.conv = [(np.asarray(w, dtype=np.float32), np.asarray(b, dtype=np.float32)) for w, b in conv]
+        self.dense = [(np.asarray(w, dtype=np.float32), np.asarray(b, dtype=np.float32)) for w, b in dense]
+
+    @classmethod
+    def load(cls, path):
+        """Read a network saved by save(): arrays conv0_w, conv0_b, ..., dense0_w, dense0_b, ..."""
+        with np.load(path) as data:
+            conv = [(data[f"conv{i}_w"], data[f"conv{i}_b"]) for i in range(_layer_count(data, "conv"))]
+            dense = [(data[f"dense{i}_w"], data[f"dense{i}_b"]) for i in range(_layer_count(data, "dense"))]
+        return cls(conv, dense)
+
+    def save(self, path):
+        arrays = {}
+        for i, (w, b) in enumerate(self.conv):
+            arrays[f"conv{i}_w"], arrays[f"conv{i}_b"] = w, b
+        for i, (w, b) in enumerate(self.dense):
+            arrays[f"dense{i}_w"], arrays[f"dense{i}_b"] = w, b
+        np.savez(path, **arrays)
+
+    def forward(self, planes):
+        """Silver's win logit for each of a batch of (K, 12, 8, 8) input planes."""
+        x = planes
+        for w, b in self.conv:
+            x = np.maximum(conv3x3(x, w, b), 0.0)
+        x = x.reshape(len(x), -1)
+        for i, (w, b) in enumerate(self.dense):
+            x = x @ w + b
+            if i < len(self.dense) - 1:
+                x = np.maximum(x, 0.0)
+        return x[:, 0]
+
+    def evaluate_arrays(self, boards):
+        """Scores in heuristic units (Silver-positive) for a (K, 8, 8) int8 array."""
+        return self.forward(board_planes(boards)) * SCORE_SCALE
+
+    def evaluate_boards(self, boards):
+        """Scores in heuristic units for a list of list-of-lists boards, in one batch."""
+        if not boards:
+            return np.zeros(0, dtype=np.float32)
+        return self.evaluate_arrays(vectorized.boards_to_array(boards))
+
+    def evaluate(self, board):
+        """Score of a single board, as a float like heuristic() returns."""
+        return float(self.evaluate_boards([board])[0])
+
+def _layer_count(data, prefix):
+    count = 0
+    while f"{prefix}{count}_w" in data:
+        count += 1
+    return count
+
+def random_network(seed=None, conv_channels=CONV_CHANNELS, hidden_units=HIDDEN_UNITS):
+    """An untrained network with He-initialised weights, for timing or as a training start."""
+    rng = np.random.default_rng(seed)
+    conv = []
+    channels = PLANES
+    for out in conv_channels:
+        w = rng.normal(0.0, np.sqrt(2.0 / (channels * 9)), (out, channels, 3, 3))
+        conv.append((w, np.zeros(out)))
+        channels = out
+    dense = []
+    width = channels * BOARD_SIZE * BOARD_SIZE
+    for out in list(hidden_units) + [1]:
+        dense.append((rng.normal(0.0, np.sqrt(2.0 / width), (width, out)), np.zeros(out)))
+        width = out
+    return ValueNet(conv, dense)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure value network throughput per batch size.")
+    parser.add_argument("--weights", help=".npz file to load (default: an untrained network of the default size)")
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 8, 64, 256, 1024, 4096])
+    parser.add_argument("--seconds", type=float, default=1.0, help="time to spend on each batch size")
+    parser.add_argument("--save", help="write the untrained network to this .npz file and exit")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.save:
+        random_network(args.seed).save(args.save)
+        print(f"Saved an untrained network to {args.save}")
+        return
+    net = ValueNet.load(args.weights) if args.weights else random_network(args.seed)
+
+    # Positions from random play, so the boards are not all the opening
+    rng = np.random.default_rng(args.seed)
+    env = vectorized.VecEnv(256)
+    _, masks = env.reset()
+    for _ in range(40):
+        _, _, _, masks, _ = env.step(vectorized.random_actions(masks, rng))
+    positions = env.boards.copy()
+    boards = [vectorized.array_to_board(position) for position in positions]
+
+    # The hand-written evaluation, one board at a time, for comparison
+    count = 0
+    start_time = time.time()
+    while time.time() - start_time < args.seconds:
+        engine.heuristic(boards[count % len(boards)])
+        count += 1
+    heuristic_rate = count / (time.time() - start_time)
+    print(f"heuristic: {heuristic_rate:.0f} positions/s")
+
+    print(f"{'batch':>6}{'ms/batch':>10}{'positions/s':>13}{'vs heuristic':>14}")
+    for batch in args.batches:
+        arrays = positions[np.arange(batch) % len(positions)]
+        calls = 0
+        start_time = time.time()
+        while calls == 0 or time.time() - start_time < args.seconds:
+            net.evaluate_arrays(arrays)
+            calls += 1
+        elapsed = time.time() - start_time
+        rate = calls * batch / elapsed
+        print(f"{batch:>6}{elapsed / calls * 1000:>10.2f}{rate:>13.0f}{rate / heuristic_rate:>13.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,501 @@
+import argparse
+import time
+
+import numpy as np
+
+import god_heuristic as engine
+
+BOARD_SIZE = engine.BOARD_SIZE
+
+# Boards as int8 arrays: positive for Gold, negative for Silver, absolute value
+# = strength + 1 (rabbit 1, cat 2, dog 3, horse 4, camel 5, elephant 6)
+PIECE_CODES = {
+    "GR": 1, "GT": 2, "GD": 3, "GH": 4, "GC": 5, "GE": 6,
+    "SR": -1, "ST": -2, "SD": -3, "SH": -4, "SC": -5, "SE": -6,
+}
+CODE_PIECES = {code: piece for piece, code in PIECE_CODES.items()}
+PIECE_CODES.update({"GCT": 2, "SCT": -2})  # Cat codes used by "human vs minimax.py"
+
+ROLLOUT_TURNS = 30  # Unfinished rollouts are scored as a draw after this many turns
+rollout_steps = 0  # Steps played by the last rollout call, for throughput figures
+
+# Step offsets in the engine's direction order (n, s, w, e)
+STEP_ROWS = np.array([dr for dr, dc in engine.DIRECTIONS])
+STEP_COLS = np.array([dc for dr, dc in engine.DIRECTIONS])
+NORTH, SOUTH = 0, 1
+
+# IN_BOUNDS[d, row, col]: the square one step in direction d from (row, col) is on the board
+IN_BOUNDS = np.zeros((4, BOARD_SIZE, BOARD_SIZE), dtype=bool)
+for _d, (_dr, _dc) in enumerate(engine.DIRECTIONS):
+    IN_BOUNDS[_d, max(0, -_dr):BOARD_SIZE - max(0, _dr), max(0, -_dc):BOARD_SIZE - max(0, _dc)] = True
+
+# IN_BOUNDS_2[d1, d2, row, col]: the square reached by going d1 then d2 from (row, col) is on the board
+IN_BOUNDS_2 = np.zeros((4, 4, BOARD_SIZE, BOARD_SIZE), dtype=bool)
+for _d1, (_dr1, _dc1) in enumerate(engine.DIRECTIONS):
+    for _d2, (_dr2, _dc2) in enumerate(engine.DIRECTIONS):
+        _dr, _dc = _dr1 + _dr2, _dc1 + _dc2
+        IN_BOUNDS_2[_d1, _d2, max(0, -_dr):BOARD_SIZE - max(0, _dr), max(0, -_dc):BOARD_SIZE - max(0, _dc)] = True
+
+# Move codes (as in engine.encode_move) for every step [d, row, col] and push/pull [d1, d2, row, col]
+MOVE_CODES = 1 << 12
+_squares = np.arange(BOARD_SIZE * BOARD_SIZE).reshape(BOARD_SIZE, BOARD_SIZE)
+_first = np.arange(4)[:, None, None, None]
+_second = np.arange(4)[None, :, None, None]
+STEP_CODES = _squares[None] | np.arange(4)[:, None, None] << 6
+PUSH_CODES = _squares[None, None] | _first << 6 | engine.MOVE_PUSH << 8 | _second << 10
+PULL_CODES = _squares[None, None] | _first << 6 | engine.MOVE_PULL << 8 | _second << 10
+MOVE_DECODE = np.array(engine.MOVE_TABLE)  # (kind, row, col, target_row, target_col, dir_row, dir_col) per code
+MOVE_STEP_COUNTS = np.array([engine.move_steps(move) for move in range(MOVE_CODES)], dtype=np.int8)
+
+# Why a game ended, as reported by VecEnv.step
+ONGOING, GOAL, ELIMINATION, IMMOBILIZATION, TURN_LIMIT = 0, 1, 2, 3, 4
+
+# Trap squares and the four squares around each (traps are never on an edge)
+TRAP_ROWS = np.array([row for row, col in engine.TRAPS])
+TRAP_COLS = np.array([col for row, col in engine.TRAPS])
+TRAP_NEIGHBOUR_ROWS = TRAP_ROWS[:, None] + STEP_ROWS[None, :]
+TRAP_NEIGHBOUR_COLS = TRAP_COLS[:, None] + STEP_COLS[None, :]
+
+def board_to_array(board):
+    """Convert a list-of-lists board to an (8, 8) int8 array."""
+    return np.array([[PIECE_CODES.get(piece, 0) for piece in row] for row in board], dtype=np.int8)
+
+def boards_to_array(boards):
+    """Stack several list-of-lists boards into a (K, 8, 8) int8 array."""
+    return np.stack([board_to_array(board) for board in boards])
+
+def array_to_board(array):
+    """Convert an (8, 8) array back to a list-of-lists board with the engine's piece codes."""
+    return [[CODE_PIECES.get(int(code), " ") for code in row] for row in array]
+
+def side_signs(sides):
+    """Turn "Gold"/"Silver" names into +1/-1."""
+    return np.array([1 if side == "Gold" else -1 for side in sides], dtype=np.int8)
+
+def neighbours(boards):
+    """Return a (4, K, 8, 8) array of the piece one step away in each direction (0 off the board)."""
+    padded = np.pad(boards, ((0, 0), (1, 1), (1, 1)))
+    return np.stack([padded[:, :-2, 1:-1], padded[:, 2:, 1:-1], padded[:, 1:-1, :-2], padded[:, 1:-1, 2:]])
+
+def movable_pieces(boards, signs):
+    """Find the side to move's pieces that are free to move.
+
+    Returns (movable, owned, adjacent): the (K, 8, 8) mask of unfrozen pieces,
+    the boards with the mover's pieces positive, and neighbours() of that.
+    """
+    owned = boards * signs[:, None, None]  # Positive for the mover's pieces
+    adjacent = neighbours(owned)
+    has_friend = (adjacent > 0).any(axis=0)
+    has_stronger_enemy = ((adjacent < 0) & (-adjacent > np.abs(boards)[None])).any(axis=0)
+    movable = (owned > 0) & ~(has_stronger_enemy & ~has_friend)
+    return movable, owned, adjacent
+
+def step_masks(boards, signs):
+    """Return a (K, 4, 8, 8) mask of legal single steps for the side to move on each board.
+
+    signs holds +1 where Gold is to move and -1 for Silver. A piece can step
+    if it is not frozen, the square is empty, and it isn't a rabbit going
+    backward.
+    """
+    movable, owned, adjacent = movable_pieces(boards, signs)
+    masks = movable[:, None] & (adjacent == 0).transpose(1, 0, 2, 3) & IN_BOUNDS[None]
+    # Rabbits can't step backward
+    rabbits = owned == 1
+    masks[:, SOUTH] &= ~(rabbits & (signs[:, None, None] > 0))
+    masks[:, NORTH] &= ~(rabbits & (signs[:, None, None] < 0))
+    return masks
+
+def capture_traps(boards):
+    """Remove pieces standing on a trap with no friendly piece next to them, in place."""
+    trapped = boards[:, TRAP_ROWS, TRAP_COLS]  # (K, 4)
+    around = boards[:, TRAP_NEIGHBOUR_ROWS, TRAP_NEIGHBOUR_COLS]  # (K, 4 traps, 4 neighbours)
+    supported = (around * np.sign(trapped)[:, :, None] > 0).any(axis=2)
+    boards[:, TRAP_ROWS, TRAP_COLS] = np.where(supported, trapped, 0)
+
+def turn_results(boards, movers):
+    """Silver's result (1, 0) for each board after movers ended their turn, or NaN if the game goes on.
+
+    Goals come before elimination, and the side that just moved wins if both
+    sides qualify, as in terminal_result.
+    """
+    gold_goal = (boards[:, 0, :] == 1).any(axis=1)
+    silver_goal = (boards[:, BOARD_SIZE - 1, :] == -1).any(axis=1)
+    gold_rabbits = (boards == 1).any(axis=(1, 2))
+    silver_rabbits = (boards == -1).any(axis=(1, 2))
+    gold_moved = movers > 0
+
+    results = np.full(len(boards), np.nan)
+    undecided = np.ones(len(boards), dtype=bool)
+    for gold_wins, silver_wins in (
+        (gold_goal & (gold_moved | ~silver_goal), silver_goal),
+        (~silver_rabbits & (gold_moved | gold_rabbits), ~gold_rabbits),
+    ):
+        results[undecided & gold_wins] = 0.0
+        undecided &= ~gold_wins
+        results[undecided & silver_wins] = 1.0
+        undecided &= ~silver_wins
+    return results
+
+def rollout(boards, signs, steps=None, max_turns=ROLLOUT_TURNS, rng=None):
+    """Play random steps on a (K, 8, 8) batch of boards until each game ends.
+
+    signs is +1/-1 for the side to move and steps the steps it has already
+    taken this turn. The boards are modified in place. Every turn is four
+    random single steps (pushes and pulls are left out to keep the kernel
+    simple) and ends early if the side has no step left. Returns Silver's
+    result per board: 1 for a win, 0 for a loss, 0.5 if max_turns ran out.
+    """
+    global rollout_steps
+    rng = rng if rng is not None else np.random.default_rng()
+    rollout_steps = 0
+    count = len(boards)
+    signs = signs.copy()
+    steps = np.zeros(count, dtype=np.int8) if steps is None else steps.copy()
+    turns = np.zeros(count, dtype=np.int32)
+    results = np.full(count, np.nan)
+    active = np.ones(count, dtype=bool)
+    rows = np.arange(count)
+
+    while active.any():
+        masks = step_masks(boards, signs).reshape(count, -1)
+        has_step = masks.any(axis=1)
+
+        # A side with nothing to play at the start of its turn loses
+        stuck = active & ~has_step & (steps == 0)
+        results[stuck] = np.where(signs[stuck] > 0, 1.0, 0.0)
+        active &= ~stuck
+
+        # Pick one legal step per board uniformly at random
+        moving = active & has_step
+        keys = np.where(masks, rng.random(masks.shape), -1.0)
+        choice = keys.argmax(axis=1)[moving]
+        index = rows[moving]
+        direction, square = choice // 64, choice % 64
+        row, col = square // BOARD_SIZE, square % BOARD_SIZE
+        pieces = boards[index, row, col]
+        boards[index, row, col] = 0
+        boards[index, row + STEP_ROWS[direction], col + STEP_COLS[direction]] = pieces
+        capture_traps(boards)
+        steps[moving] += 1
+        rollout_steps += len(index)
+
+        # End turns that used four steps or ran out of steps
+        ending = active & ((steps >= 4) | ~has_step)
+        ended = turn_results(boards, signs)
+        decided = ending & ~np.isnan(ended)
+        results[decided] = ended[decided]
+        active &= ~decided
+        ending &= active
+        signs[ending] *= -1
+        steps[ending] = 0
+        turns[ending] += 1
+
+        out_of_time = active & (turns >= max_turns)
+        results[out_of_time] = 0.5
+        active &= ~out_of_time
+
+    return results
+
+def rollout_win_rates(boards, sides, steps=None, playouts=64, max_turns=ROLLOUT_TURNS, seed=None):
+    """Silver's win rate from each list-of-lists board, over playouts random games each.
+
+    sides names the side to move on each board and steps (optional) the steps
+    it has already taken this turn. All positions run as one batch.
+    """
+    rng = np.random.default_rng(seed)
+    batch = np.repeat(boards_to_array(boards), playouts, axis=0)
+    signs = np.repeat(side_signs(sides), playouts)
+    steps = np.repeat(np.array(steps if steps is not None else [0] * len(boards), dtype=np.int8), playouts)
+    results = rollout(batch, signs, steps, max_turns, rng)
+    return results.reshape(len(boards), playouts).mean(axis=1)
+
+def action_masks(boards, signs, steps):
+    """Return a (K, 4096) mask of legal move codes: steps, pushes and pulls, and pass.
+
+    steps is the number of steps each side has already taken this turn; pushes
+    and pulls need two left and pass needs at least one taken.
+    """
+    count = len(boards)
+    masks = np.zeros((count, MOVE_CODES), dtype=bool)
+    masks[:, STEP_CODES.ravel()] = step_masks(boards, signs).reshape(count, -1)
+
+    movable, owned, adjacent = movable_pieces(boards, signs)
+    # weaker[d1]: a weaker enemy piece next to one of ours in direction d1
+    weaker = movable[None] & (adjacent < 0) & (-adjacent < owned[None])
+    # beyond[d1, d2]: the square reached by going d1 then d2 (0 off the board)
+    padded = np.pad(owned, ((0, 0), (2, 2), (2, 2)))
+    beyond = np.stack([np.stack([padded[:, 2 + dr1 + dr2:2 + dr1 + dr2 + BOARD_SIZE, 2 + dc1 + dc2:2 + dc1 + dc2 + BOARD_SIZE]
+                                 for dr2, dc2 in engine.DIRECTIONS]) for dr1, dc1 in engine.DIRECTIONS])
+    push = weaker[:, None] & (beyond == 0) & IN_BOUNDS_2[:, :, None]
+    pull = weaker[:, None] & (adjacent == 0)[None] & IN_BOUNDS[None, :, None]
+    can_push_pull = steps <= 2
+    masks[:, PUSH_CODES.ravel()] = (push.transpose(2, 0, 1, 3, 4).reshape(count, -1) & can_push_pull[:, None])
+    masks[:, PULL_CODES.ravel()] = (pull.transpose(2, 0, 1, 3, 4).reshape(count, -1) & can_push_pull[:, None])
+    masks[:, engine.PASS_MOVE] = steps >= 1
+    return masks
+
+def apply_actions(boards, actions):
+    """Play one move code per board, in place, including trap captures."""
+    kind, row, col, target_row, target_col, dir_row, dir_col = MOVE_DECODE[actions].T
+    index = np.arange(len(boards))
+
+    step = kind == engine.MOVE_STEP
+    i, r, c, tr, tc = index[step], row[step], col[step], target_row[step], target_col[step]
+    boards[i, tr, tc] = boards[i, r, c]
+    boards[i, r, c] = 0
+
+    # Push: the enemy moves on from the target square, then our piece takes its place
+    push = kind == engine.MOVE_PUSH
+    i, r, c, tr, tc = index[push], row[push], col[push], target_row[push], target_col[push]
+    boards[i, tr + dir_row[push], tc + dir_col[push]] = boards[i, tr, tc]
+    boards[i, tr, tc] = boards[i, r, c]
+    boards[i, r, c] = 0
+
+    # Pull: our piece steps away and the enemy follows into its square
+    pull = kind == engine.MOVE_PULL
+    i, r, c, tr, tc = index[pull], row[pull], col[pull], target_row[pull], target_col[pull]
+    boards[i, r + dir_row[pull], c + dir_col[pull]] = boards[i, r, c]
+    boards[i, r, c] = boards[i, tr, tc]
+    boards[i, tr, tc] = 0
+
+    capture_traps(boards)
+
+class VecEnv:
+    """N independent games held as one (N, 8, 8) array, stepped together.
+
+    Actions are the engine's move codes, one per game per step. Games that end
+    are reset to the starting position straight away, so every game always
+    has a legal move. Repetition is not tracked.
+    """
+
+    def __init__(self, num_games, max_turns=200):
+        self.num_games = num_games
+        self.max_turns = max_turns
+        self.start = board_to_array(engine.board)
+        self.boards = np.repeat(self.start[None], num_games, axis=0)
+        self.signs = np.ones(num_games, dtype=np.int8)  # +1 when Gold is to move
+        self.steps = np.zeros(num_games, dtype=np.int8)
+        self.turns = np.zeros(num_games, dtype=np.int32)
+        self.masks = action_masks(self.boards, self.signs, self.steps)
+
+    def reset(self):
+        """Start every game over. Returns (boards, legal action masks)."""
+        return self._reset(np.ones(self.num_games, dtype=bool))
+
+    def _reset(self, games):
+        self.boards[games] = self.start
+        self.signs[games] = 1
+        self.steps[games] = 0
+        self.turns[games] = 0
+        self.masks[games] = action_masks(self.boards[games], self.signs[games], self.steps[games])
+        return self.boards.copy(), self.masks.copy()
+
+    def step(self, actions):
+        """Play one move code in every game.
+
+        Returns (boards, rewards, dones, masks, info). rewards are +1/-1 for
+        the side that just moved when its game ends with a win/loss and 0
+        otherwise. info holds the final boards of finished games, Silver's
+        result (1, 0, 0.5 for the turn limit, NaN while going on) and the
+        reason each game ended (GOAL, ELIMINATION, IMMOBILIZATION, TURN_LIMIT).
+        """
+        actions = np.asarray(actions)
+        if not self.masks[np.arange(self.num_games), actions].all():
+            raise ValueError("illegal action for at least one game")
+
+        movers = self.signs.copy()
+        apply_actions(self.boards, actions)
+        self.steps += MOVE_STEP_COUNTS[actions]
+
+        # Turns end after four steps or a pass; check goals and elimination then
+        ending = (self.steps >= 4) | (actions == engine.PASS_MOVE)
+        results = np.where(ending, turn_results(self.boards, movers), np.nan)
+        reasons = np.zeros(self.num_games, dtype=np.int8)
+        goal = ending & ((self.boards[:, 0, :] == 1).any(axis=1) | (self.boards[:, BOARD_SIZE - 1, :] == -1).any(axis=1))
+        reasons[~np.isnan(results)] = np.where(goal, GOAL, ELIMINATION)[~np.isnan(results)]
+
+        continuing = ending & np.isnan(results)
+        self.signs[continuing] *= -1
+        self.steps[continuing] = 0
+        self.turns[continuing] += 1
+        self.masks = action_masks(self.boards, self.signs, self.steps)
+
+        # The side whose turn starts loses if it has nothing to play
+        stuck = continuing & ~self.masks.any(axis=1)
+        results[stuck] = np.where(self.signs[stuck] > 0, 1.0, 0.0)
+        reasons[stuck] = IMMOBILIZATION
+
+        out_of_time = np.isnan(results) & (self.turns >= self.max_turns)
+        results[out_of_time] = 0.5
+        reasons[out_of_time] = TURN_LIMIT
+
+        dones = ~np.isnan(results)
+        silver_won = results == 1.0
+        rewards = np.where(dones & (results != 0.5), np.where(silver_won == (movers < 0), 1.0, -1.0), 0.0)
+        info = {"final_boards": self.boards[dones].copy(), "results": results, "reasons": reasons}
+        if dones.any():
+            self._reset(dones)
+        return self.boards.copy(), rewards, dones, self.masks.copy(), info
+
+def random_actions(masks, rng):
+    """Pick a legal move code uniformly at random for every game."""
+    return np.where(masks, rng.random(masks.shape), -1.0).argmax(axis=1)
+
+def frozen_pieces(boards):
+    """(K, 8, 8) mask of pieces of either colour that are frozen."""
+    adjacent = neighbours(boards)
+    same = adjacent * np.sign(boards)[None]  # Positive for friends, negative for enemies
+    has_friend = (same > 0).any(axis=0)
+    has_stronger_enemy = ((same < 0) & (np.abs(adjacent) > np.abs(boards)[None])).any(axis=0)
+    return (boards != 0) & has_stronger_enemy & ~has_friend
+
+def goal_distances(boards):
+    """Gold's and Silver's smallest rabbit goal distance on each board, as engine.goal_distance.
+
+    Every rabbit gets its own cost grid (boards are flipped for Silver so all
+    rabbits head for row 0) and the costs are relaxed GOAL_DISTANCE_LIMIT times,
+    which covers every path the engine's search would accept.
+    """
+    limit = engine.GOAL_DISTANCE_LIMIT
+    unreachable = limit + 1
+    count = len(boards)
+    gold = np.full(count, unreachable)
+    silver = np.full(count, unreachable)
+    index, rows, cols = np.nonzero(np.abs(boards) == 1)
+    if len(index) == 0:
+        return gold, silver
+
+    # One board per rabbit, seen from the rabbit's side and flipped so its goal is row 0
+    signs = np.sign(boards[index, rows, cols])
+    owned = boards[index] * signs[:, None, None]
+    frozen = frozen_pieces(boards)[index]
+    owned = np.where(signs[:, None, None] > 0, owned, owned[:, ::-1])
+    frozen = np.where(signs[:, None, None] > 0, frozen, frozen[:, ::-1])
+    rows = np.where(signs > 0, rows, BOARD_SIZE - 1 - rows)
+    rabbit = np.arange(len(index))
+
+    # The rabbit's own square doesn't count as support anywhere
+    start = np.zeros(owned.shape, dtype=bool)
+    start[rabbit, rows, cols] = True
+    adjacent = neighbours(owned)
+    friends = (adjacent > 0).sum(axis=0) - neighbours(start.astype(np.int8)).sum(axis=0)
+    supported = friends > 0
+    stronger_enemy = (adjacent < -1).any(axis=0)
+    can_step_aside = (owned > 0) & ~frozen & ((adjacent == 0) & IN_BOUNDS[:, None]).any(axis=0)
+
+    cost = np.where((owned == 0) | start, 1.0, np.where(can_step_aside & ~start, 2.0, np.inf)).astype(np.float32)
+    cost[:, TRAP_ROWS, TRAP_COLS] = np.where(supported[:, TRAP_ROWS, TRAP_COLS], cost[:, TRAP_ROWS, TRAP_COLS], np.inf)
+    cost[:, 1:] += ~supported[:, 1:] & stronger_enemy[:, 1:]
+
+    # Rabbits step forward (north after the flip), west or east. padded keeps
+    # an infinite border so the shifted views need no bounds checks
+    padded = np.full((len(index), BOARD_SIZE + 2, BOARD_SIZE + 2), np.inf, dtype=np.float32)
+    distance = padded[:, 1:-1, 1:-1]
+    distance[rabbit, rows, cols] = frozen[rabbit, rows, cols]
+    arrive = np.empty(owned.shape, dtype=np.float32)
+    for _ in range(limit):
+        np.minimum(padded[:, 2:, 1:-1], padded[:, 1:-1, :-2], out=arrive)
+        np.minimum(arrive, padded[:, 1:-1, 2:], out=arrive)
+        arrive += cost
+        np.minimum(distance, arrive, out=distance)
+
+    reached = distance[:, 0].min(axis=1)
+    reached = np.where(rows == 0, 0, np.where(reached <= limit, reached, unreachable)).astype(int)
+    np.minimum.at(gold, index[signs > 0], reached[signs > 0])
+    np.minimum.at(silver, index[signs < 0], reached[signs < 0])
+    return gold, silver
+
+CENTER_VALUE = np.array(engine.CENTER_VALUE)
+
+def heuristic_features(boards):
+    """(K, len(engine.HEURISTIC_PARAM_NAMES)) features of each board, Silver minus Gold.
+
+    heuristic_features(boards) @ engine.heuristic_param_vector() is
+    engine.heuristic for the same boards, as long as no rabbit stands on its
+    goal row (the engine scores those as infinite).
+    """
+    count = len(boards)
+    features = np.zeros((count, len(engine.HEURISTIC_PARAM_NAMES)))
+    silver, gold = boards < 0, boards > 0
+    strengths = np.abs(boards)
+
+    for i, code in enumerate(range(6, 0, -1)):  # Elephant down to rabbit
+        features[:, i] = (boards == -code).sum(axis=(1, 2)) - (boards == code).sum(axis=(1, 2))
+
+    rows = np.arange(BOARD_SIZE)[None, :, None]
+    features[:, 6] = ((boards == -1) * (rows + 1) ** 2).sum(axis=(1, 2)) - ((boards == 1) * (8 - rows) ** 2).sum(axis=(1, 2))
+
+    gold_distance, silver_distance = goal_distances(boards)
+    for d in range(1, engine.GOAL_DISTANCE_LIMIT + 1):
+        features[:, 6 + d] = (silver_distance == d).astype(float) - (gold_distance == d)
+
+    features[:, 15] = (silver * CENTER_VALUE).sum(axis=(1, 2)) - (gold * CENTER_VALUE).sum(axis=(1, 2))
+
+    adjacent = neighbours(boards)
+    silver_support = (adjacent < 0).sum(axis=0)[:, TRAP_ROWS, TRAP_COLS]
+    gold_support = (adjacent > 0).sum(axis=0)[:, TRAP_ROWS, TRAP_COLS]
+    trapped = boards[:, TRAP_ROWS, TRAP_COLS]
+    features[:, 16] = (silver_support - gold_support).sum(axis=1)
+    features[:, 17] = ((trapped > 0) & (gold_support == 0)).sum(axis=1) - ((trapped < 0) & (silver_support == 0)).sum(axis=1)
+
+    features[:, 18] = silver.sum(axis=(1, 2)) - gold.sum(axis=(1, 2))
+
+    empty_around = ((adjacent == 0) & IN_BOUNDS[:, None]).sum(axis=0)
+    mobile = ~frozen_pieces(boards) * empty_around * (strengths > 0)
+    features[:, 19] = (mobile * silver).sum(axis=(1, 2)) - (mobile * gold).sum(axis=(1, 2))
+    return features
+
+def on_goal_row(boards):
+    """Boards where a rabbit already stands on its goal row (scored as infinite by the engine)."""
+    return (boards[:, 0, :] == 1).any(axis=1) | (boards[:, BOARD_SIZE - 1, :] == -1).any(axis=1)
+
+def python_steps_per_second(seconds=1.0, seed=1):
+    """Random steps per second through generate_moves and make_move, for comparison."""
+    rng = engine.random.Random(seed)
+    board, side, steps, played = engine.board, "Gold", 0, 0
+    start_time = time.time()
+    while time.time() - start_time < seconds:
+        moves = [move for move in engine.generate_moves(board, side, steps) if engine.move_kind(move) == engine.MOVE_STEP]
+        if not moves or engine.terminal_result(board, side, check_immobilization=False).winner:
+            board, side, steps = engine.board, "Gold", 0
+            continue
+        board = engine.make_move(board, rng.choice(moves))
+        played += 1
+        steps += 1
+        if steps == 4:
+            side, steps = ("Silver" if side == "Gold" else "Gold"), 0
+    return played / (time.time() - start_time)
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure vectorized rollout throughput.")
+    parser.add_argument("--batches", type=int, nargs="+", default=[1, 64, 1024, 4096])
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--env-steps", type=int, default=200, help="moves per game for the VecEnv timing")
+    args = parser.parse_args()
+
+    print(f"generate_moves/make_move: {python_steps_per_second(seed=args.seed):.0f} steps/s")
+    rng = np.random.default_rng(args.seed)
+    start = board_to_array(engine.board)
+    print(f"{'batch':>6}{'seconds':>10}{'steps/s':>12}{'games/s':>10}{'silver':>8}")
+    for batch in args.batches:
+        boards = np.repeat(start[None], batch, axis=0)
+        start_time = time.time()
+        results = rollout(boards, np.ones(batch, dtype=np.int8), rng=rng)
+        elapsed = time.time() - start_time
+        print(f"{batch:>6}{elapsed:>10.2f}{rollout_steps / elapsed:>12.0f}{batch / elapsed:>10.1f}{results.mean():>8.2f}")
+
+    print("\nVecEnv with random moves (pushes and pulls included)")
+    print(f"{'games':>6}{'seconds':>10}{'moves/s':>12}{'finished':>10}")
+    for batch in args.batches:
+        env = VecEnv(batch)
+        _, masks = env.reset()
+        finished = 0
+        start_time = time.time()
+        for _ in range(args.env_steps):
+            _, _, dones, masks, _ = env.step(random_actions(masks, rng))
+            finished += int(dones.sum())
+        elapsed = time.time() - start_time
+        print(f"{batch:>6}{elapsed:>10.2f}{batch * args.env_steps / elapsed:>12.0f}{finished:>10}")
+
+if __name__ == "__main__":
+    main()